@@ -0,0 +1,284 @@
+"""
+Headless command line interface: python -m app <command> ...
+
+Each command imports only the modules it needs (no Tk, matplotlib or models at import time).
+Results are written to stdout as JSON Lines, one object per input; logs go to stderr.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg")
+
+
+def _emit(record):
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def _expand_audio(paths):
+    """Expand directories to the audio files they contain."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(f for f in glob.glob(os.path.join(path, "**", "*"), recursive=True)
+                                if f.lower().endswith(AUDIO_EXTENSIONS)))
+        else:
+            files.append(path)
+    return files
+
+
+def _read_transcript(path):
+    """Return (text, segments) from a transcript .txt or a JSON record written by `transcribe`/`batch`."""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    if path.lower().endswith((".json", ".jsonl")):
+        record = json.loads(content.splitlines()[0] if path.lower().endswith(".jsonl") else content)
+        return record["text"], record.get("segments", [])
+    return content.strip(), []
+
+
+def _read_transcripts(paths):
+    """(source, text, segments) for every transcript; a .jsonl file (e.g. `batch` output) holds one per line."""
+    transcripts = []
+    for path in paths:
+        if path.lower().endswith(".jsonl"):
+            with open(path, "r", encoding="utf-8") as f:
+                records = [json.loads(line) for line in f if line.strip()]
+            transcripts.extend((record.get("source", path), record["text"], record.get("segments", []))
+                               for record in records if "text" in record)
+        else:
+            text, segments = _read_transcript(path)
+            transcripts.append((os.path.abspath(path), text, segments))
+    return transcripts
+
+
+def cmd_transcribe(args):
+    from .core.transcriber import AudioTranscriber
+    transcriber = AudioTranscriber()
+    status = 0
+    for path in _expand_audio(args.files):
+        try:
+            record = transcriber.transcribe_file(path)
+            if args.output_dir:
+                transcriber.save_segments(record['segments'], args.output_dir, source=path,
+                                          audio_seconds=record['audio_seconds'])
+            _emit(record)
+        except Exception as e:
+            logging.error(f"Transcription of {path} failed: {e}")
+            _emit({'source': os.path.abspath(path), 'error': str(e)})
+            status = 1
+    return status
+
+
+def cmd_batch(args):
+    from .core.batch import BatchTranscriptionEngine
+
+    def on_progress(progress):
+        logging.info(f"{progress['done'] + progress['failed']}/{progress['total']} finished "
+                     f"({progress['files_per_minute']:.1f} files/min)")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    engine = BatchTranscriptionEngine(args.output_dir, workers=args.workers, progress_callback=on_progress)
+    summary = engine.run(_expand_audio(args.files))
+    for path, status, result_path, error in summary['results']:
+        if status == "done":
+            with open(result_path, "r", encoding="utf-8") as f:
+                _emit(json.load(f))
+        else:
+            _emit({'source': path, 'error': error or status})
+    return 0 if summary['failed'] == 0 else 1
+
+
+def cmd_translate(args):
+    from .core.translator import Translator
+    text, _ = _read_transcript(args.file)
+    translator = Translator()
+    translated = translator.translate_text(text, args.src, args.tgt)
+    if translated.startswith("Translation failed"):
+        _emit({'source': os.path.abspath(args.file), 'error': translated})
+        return 1
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(translated)
+    _emit({'source': os.path.abspath(args.file), 'src_lang': args.src, 'tgt_lang': args.tgt,
+           'text': translated, 'stats': translator.last_stats})
+    return 0
+
+
+def cmd_analyze(args):
+    transcripts = _read_transcripts(args.files)
+    if args.audio and len(transcripts) != 1:
+        logging.error("--audio needs exactly one transcript")
+        return 2
+    text_analyses = None
+    if args.text:
+        # All transcripts share one spaCy stream, so large batches can use several processes
+        from .core.text_analyzer import TextAnalyzer
+        text_analyses = TextAnalyzer().analyze_texts([text for _, text, _ in transcripts],
+                                                     [segments for _, _, segments in transcripts],
+                                                     n_process=args.processes)
+    analyzer = None
+    for i, (source, text, segments) in enumerate(transcripts):
+        record = {'source': source}
+        if text_analyses:
+            record['text_analysis'] = text_analyses[i]
+        if args.emotion:
+            from .core.emotion_analyzer import EmotionAnalyzer
+            from .utils.helpers import split_sentences
+            emotion_segments = segments or [{'text': sentence} for sentence in split_sentences(text)]
+            analyzer = analyzer or EmotionAnalyzer()
+            record['emotions'] = analyzer.analyze_segments(emotion_segments)
+            if args.audio:
+                record['voice'] = analyzer.extract_audio_features(args.audio, segments)
+        _emit(record)
+    return 0
+
+
+def cmd_summarize(args):
+    from .core.text_processor import TextProcessor
+    processor = TextProcessor()
+    if not processor.model:
+        logging.error("Set GEMINI_API_KEY to summarize")
+        return 1
+    status = 0
+    for source, text, segments in _read_transcripts(args.files):
+        summary = processor.summarize_text(text, segments)
+        if summary.startswith("Error"):
+            _emit({'source': source, 'error': summary})
+            status = 1
+            continue
+        _emit({'source': source, 'summary': summary, 'stats': processor.last_summary_stats})
+    return status
+
+
+def cmd_ask(args):
+    from .core.text_processor import TextProcessor
+    processor = TextProcessor()
+    if not processor.model:
+        logging.error("Set GEMINI_API_KEY to ask questions")
+        return 1
+    status = 0
+    for source, text, segments in _read_transcripts(args.files):
+        answer = processor.query_text(text, args.question, segments)
+        if answer.startswith("Error"):
+            _emit({'source': source, 'error': answer})
+            status = 1
+            continue
+        _emit({'source': source, 'question': args.question, 'answer': answer, 'stats': processor.last_query_stats})
+    return status
+
+
+def cmd_export(args):
+    from .core.transcriber import AudioTranscriber
+    from .utils.helpers import export_segments
+    _, segments = _read_transcript(args.file)
+    if not segments:
+        logging.error(f"{args.file} has no segments to export")
+        return 1
+    export_segments(AudioTranscriber().segment_rows(segments), args.output, args.format)
+    _emit({'source': os.path.abspath(args.file), 'output': os.path.abspath(args.output), 'format': args.format})
+    return 0
+
+
+def cmd_benchmark(args):
+    from .core import benchmark
+    options = benchmark.parse_args(args.benchmark_args, prog="python -m app benchmark")
+    results = benchmark.run_benchmark(options.reference_dir, options.models, options.backends, options.target_lang)
+    # The table is for people watching the run; stdout stays one JSON object per result
+    sys.stderr.write(benchmark.format_results(results) + "\n")
+    if options.output:
+        benchmark.write_results(results, options.output)
+    for result in results:
+        _emit(result)
+    return 1 if any("error" in result for result in results) else 0
+
+
+def cmd_search(args):
+    from .core.history_store import HistoryStore
+    from .utils.config import get_settings
+    store = HistoryStore(get_settings()['history']['path'])
+    hits = store.search(args.query, limit=args.limit, source=args.source)
+    for hit in hits:
+        _emit(hit)
+    return 0 if hits else 1
+
+
+def cmd_serve(args):
+    from .service import TranscriptionService
+    TranscriptionService().serve_forever(args.host, args.port)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m app", description="AI voice recorder, headless.")
+    parser.add_argument("--log-level", default="INFO", help="stderr log level (default INFO)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("transcribe", help="transcribe audio files (or directories)")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--output-dir", help="also save output_transcription.txt and the confidence file here")
+    p.set_defaults(func=cmd_transcribe)
+
+    p = commands.add_parser("batch", help="transcribe many files in parallel worker processes")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--output-dir", required=True, help="job database and per-file JSON results")
+    p.add_argument("--workers", type=int)
+    p.set_defaults(func=cmd_batch)
+
+    p = commands.add_parser("translate", help="translate a transcript (.txt or .json record)")
+    p.add_argument("file")
+    p.add_argument("--src", default="English")
+    p.add_argument("--tgt", default="Hindi")
+    p.add_argument("--output", help="also write the translation to this file")
+    p.set_defaults(func=cmd_translate)
+
+    p = commands.add_parser("analyze", help="text and emotion analysis of transcripts")
+    p.add_argument("files", nargs="+", help="transcripts (.txt, .json, or .jsonl with one record per line)")
+    p.add_argument("--no-text", dest="text", action="store_false", help="skip the spaCy text analysis")
+    p.add_argument("--no-emotion", dest="emotion", action="store_false", help="skip emotion analysis")
+    p.add_argument("--audio", help="recording the transcript came from, for voice characteristics")
+    p.add_argument("--processes", type=int, help="spaCy worker processes (-1 for every core)")
+    p.set_defaults(func=cmd_analyze)
+
+    p = commands.add_parser("summarize", help="summarize transcripts with Gemini, in chunks when they are long")
+    p.add_argument("files", nargs="+", help="transcripts (.txt, .json, or .jsonl with one record per line)")
+    p.set_defaults(func=cmd_summarize)
+
+    p = commands.add_parser("ask", help="answer a question from the most relevant excerpts of each transcript")
+    p.add_argument("question")
+    p.add_argument("files", nargs="+", help="transcripts (.txt, .json, or .jsonl with one record per line)")
+    p.set_defaults(func=cmd_ask)
+
+    p = commands.add_parser("export", help="export a transcription record to JSON or CSV rows")
+    p.add_argument("file", help="JSON record written by `transcribe` or `batch`")
+    p.add_argument("--format", choices=["json", "csv"], default="json")
+    p.add_argument("--output", required=True)
+    p.set_defaults(func=cmd_export)
+
+    p = commands.add_parser("search", help="full-text search of every past transcription, one hit per segment")
+    p.add_argument("query", help="words that must all occur in the segment; end a word with * for a prefix")
+    p.add_argument("--limit", type=int, default=50)
+    p.add_argument("--source", help="only search the transcription(s) of this audio file")
+    p.set_defaults(func=cmd_search)
+
+    p = commands.add_parser("serve", help="run the local HTTP transcription service (see app.service)")
+    p.add_argument("--host")
+    p.add_argument("--port", type=int)
+    p.set_defaults(func=cmd_serve)
+
+    p = commands.add_parser("benchmark", help="compare inference backends (see app.core.benchmark)")
+    p.add_argument("benchmark_args", nargs=argparse.REMAINDER)
+    p.set_defaults(func=cmd_benchmark)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Configure logging before any core module does, so their basicConfig calls are no-ops
+    logging.basicConfig(level=args.log_level.upper(), stream=sys.stderr, force=True,
+                        format="%(asctime)s - %(levelname)s - %(message)s")
+    return args.func(args)
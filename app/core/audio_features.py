@@ -0,0 +1,183 @@
+import logging
+import time
+
+import librosa
+import numpy as np
+import soundfile
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class AudioFeatureExtractor:
+    """
+    Frame-level pitch, loudness and onset features for a whole recording.
+
+    The file is streamed in blocks of `block_frames` analysis frames, so memory stays
+    bounded by the block size plus a few floats per frame, even for multi-hour files.
+    Every feature is computed per block with vectorized NumPy/librosa calls and the
+    frames of consecutive blocks line up exactly (no centering or padding). Formats
+    soundfile cannot stream (mp3, m4a, aac, ...) are decoded whole by librosa.load and
+    then processed in the same blocks.
+    """
+
+    def __init__(self, frame_length=2048, hop_length=512, block_frames=512, n_mels=40):
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.block_frames = block_frames
+        self.n_mels = n_mels
+        self.fmin = librosa.note_to_hz('C2')
+        self.fmax = librosa.note_to_hz('C7')
+
+    def extract(self, audio_path):
+        """Return per-frame arrays: times, rms_db, pitch (Hz), voiced mask and onset times."""
+        started = time.perf_counter()
+        sr, samples, stream = self._blocks(audio_path)
+        rms_blocks, pitch_blocks, flux_blocks = [], [], []
+        previous_mel = None
+        for block in stream:
+            frames = librosa.util.frame(block, frame_length=self.frame_length, hop_length=self.hop_length)
+            rms = np.sqrt(np.mean(frames ** 2, axis=0))
+            rms_blocks.append(20 * np.log10(np.maximum(rms, 1e-5)).astype(np.float32))
+            pitch_blocks.append(librosa.yin(block, fmin=self.fmin, fmax=self.fmax, sr=sr,
+                                            frame_length=self.frame_length, hop_length=self.hop_length,
+                                            center=False).astype(np.float32))
+            # Spectral flux on a log-mel spectrogram; the last frame of the previous block
+            # is carried over so the difference is continuous across block boundaries
+            mel = librosa.power_to_db(librosa.feature.melspectrogram(
+                y=block, sr=sr, n_fft=self.frame_length, hop_length=self.hop_length,
+                n_mels=self.n_mels, center=False))
+            reference = mel[:, :1] if previous_mel is None else previous_mel
+            flux = np.maximum(np.diff(np.hstack([reference, mel]), axis=1), 0).mean(axis=0)
+            flux_blocks.append(flux.astype(np.float32))
+            previous_mel = mel[:, -1:]
+
+        rms_db = np.concatenate(rms_blocks) if rms_blocks else np.zeros(0, dtype=np.float32)
+        pitch = np.concatenate(pitch_blocks) if pitch_blocks else np.zeros(0, dtype=np.float32)
+        flux = np.concatenate(flux_blocks) if flux_blocks else np.zeros(0, dtype=np.float32)
+        # The last block is zero-padded to a full block; drop the frames past the end of the file
+        count = min(len(rms_db), len(pitch), len(flux), max(0, 1 + (samples - self.frame_length) // self.hop_length))
+        rms_db, pitch, flux = rms_db[:count], pitch[:count], flux[:count]
+        times = librosa.frames_to_time(np.arange(count), sr=sr, hop_length=self.hop_length) \
+            + self.frame_length / (2 * sr)
+
+        # Voiced frames: clearly above the recording's own noise floor
+        voiced = rms_db > (np.percentile(rms_db, 10) + 10.0) if count else np.zeros(0, dtype=bool)
+        onsets = np.zeros(0)
+        if count > 7:
+            peaks = librosa.util.peak_pick(flux, pre_max=3, post_max=3, pre_avg=10, post_avg=10,
+                                           delta=float(np.std(flux)) * 0.5, wait=4)
+            onsets = times[peaks[voiced[peaks]]]
+
+        elapsed = time.perf_counter() - started
+        duration = times[-1] if count else 0.0
+        logging.info(f"Extracted {count} feature frames ({duration:.1f}s of audio) from {audio_path} "
+                     f"in {elapsed:.2f}s")
+        return {
+            'sample_rate': sr,
+            'times': times,
+            'rms_db': rms_db,
+            'pitch': pitch,
+            'voiced': voiced,
+            'onsets': onsets,
+        }
+
+    def _blocks(self, audio_path):
+        """(sample rate, sample count, blocks of block_frames overlapping frames) for the file."""
+        try:
+            info = soundfile.info(audio_path)
+        except RuntimeError as e:
+            logging.info(f"Cannot stream {audio_path} ({e}); decoding it whole instead")
+            y, sr = librosa.load(audio_path, sr=None, mono=True)
+            return sr, len(y), self._array_blocks(y)
+        stream = librosa.stream(audio_path, block_length=self.block_frames, frame_length=self.frame_length,
+                                hop_length=self.hop_length, mono=True, fill_value=0)
+        return info.samplerate, info.frames, stream
+
+    def _array_blocks(self, y):
+        """The blocks librosa.stream would yield for `y`: the last one zero-padded to full length."""
+        block_samples = self.frame_length + (self.block_frames - 1) * self.hop_length
+        step = self.block_frames * self.hop_length
+        for start in range(0, max(1, len(y) - self.frame_length + 1), step):
+            block = y[start:start + block_samples]
+            if len(block) < block_samples:
+                block = np.pad(block, (0, block_samples - len(block)))
+            yield block
+
+    @staticmethod
+    def summarize(features, start=None, end=None):
+        """Summary statistics of the frames between `start` and `end` seconds (the whole file by default)."""
+        times = features['times']
+        mask = np.ones(len(times), dtype=bool)
+        if start is not None:
+            mask &= times >= start
+        if end is not None:
+            mask &= times < end
+        voiced = mask & features['voiced']
+        if not voiced.any():
+            return None
+
+        # Pitch spread in semitones around the speaker's median, so it does not depend on voice register
+        pitch = features['pitch'][voiced]
+        semitones = 12 * np.log2(pitch / np.median(pitch))
+        span_start = times[mask][0]
+        span_end = times[mask][-1]
+        voiced_seconds = voiced.sum() * (times[1] - times[0] if len(times) > 1 else 0.0)
+        onsets = features['onsets']
+        onset_count = np.count_nonzero((onsets >= span_start) & (onsets <= span_end))
+        return {
+            'start': float(span_start),
+            'end': float(span_end),
+            'pitch_median': float(np.median(pitch)),
+            'pitch_std_semitones': float(np.std(semitones)),
+            'energy_db': float(np.mean(features['rms_db'][voiced])),
+            'voiced_fraction': float(voiced.sum() / mask.sum()),
+            'speaking_rate': float(onset_count / voiced_seconds) if voiced_seconds else 0.0,
+        }
+
+    def summarize_segments(self, features, segments):
+        """Summaries for each transcript segment ('start'/'end' in seconds), aligned with `segments`."""
+        return [self.summarize(features, segment['start'], segment['end']) for segment in segments]
+
+    @staticmethod
+    def describe(overall, segment_summaries=None, segments=None):
+        """
+        Plain-language observations. Thresholds are relative to this recording: a segment
+        stands out when it is clearly louder, faster or higher than the speaker's own norm.
+        """
+        lines = []
+        if overall['pitch_std_semitones'] > 4.0:
+            lines.append("- High voice variation detected (possible excitement/stress)")
+        else:
+            lines.append("- Steady voice detected (possible calmness/control)")
+        lines.append(f"- Typical pitch {overall['pitch_median']:.0f} Hz, "
+                     f"speaking rate {overall['speaking_rate']:.1f} onsets/s, "
+                     f"speech in {overall['voiced_fraction']:.0%} of the recording")
+
+        if not segment_summaries:
+            return lines
+        valid = [(segment, summary) for segment, summary in zip(segments, segment_summaries) if summary]
+        if len(valid) < 2:
+            return lines
+        rates = np.array([summary['speaking_rate'] for _, summary in valid])
+        median_rate = float(np.median(rates))
+        highlights = []
+        for segment, summary in valid:
+            notes = []
+            if summary['energy_db'] > overall['energy_db'] + 4.0:
+                notes.append("louder (possible excitement/anger)")
+            elif summary['energy_db'] < overall['energy_db'] - 6.0:
+                notes.append("quieter (possible calmness/sadness)")
+            if median_rate and summary['speaking_rate'] > 1.3 * median_rate:
+                notes.append("faster (possible excitement/anxiety)")
+            if summary['pitch_median'] > overall['pitch_median'] * 2 ** (3 / 12):
+                notes.append("higher pitch")
+            if notes:
+                highlights.append((segment, notes))
+        if highlights:
+            lines.append("- Segments that stand out from the rest of the recording:")
+            for segment, notes in highlights:
+                lines.append(f"  {segment['timestamp']} {', '.join(notes)}" if 'timestamp' in segment
+                             else f"  [{segment['start']:.1f}s] {', '.join(notes)}")
+        return lines
@@ -0,0 +1,175 @@
+import functools
+import logging
+import os
+import time
+
+from ..utils.config import get_settings
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# fp32: the stock PyTorch model. int8: dynamic int8 quantization of the Linear layers (CPU).
+# onnx: ONNX Runtime export through optimum (transformers models only).
+BACKENDS = ("fp32", "int8", "onnx")
+
+
+def backend_for(name):
+    """The configured backend for model `name` ('whisper', 'nllb' or 'emotion')."""
+    backend = get_settings()["models"]["backends"].get(name, "fp32")
+    if backend not in BACKENDS:
+        logging.warning(f"Unknown backend '{backend}' for {name}, using fp32")
+        return "fp32"
+    return backend
+
+
+def resolve_backend(name, backend=None):
+    """
+    The backend model `name` actually runs on for the requested (or configured) one: ONNX is
+    not supported for Whisper (int8 instead), and needs optimum installed (fp32 otherwise).
+    """
+    backend = backend or backend_for(name)
+    if backend == "onnx" and name == "whisper":
+        return "int8"
+    if backend == "onnx" and not _onnx_available():
+        return "fp32"
+    return backend
+
+
+def _effective_backend(name, backend):
+    effective = resolve_backend(name, backend)
+    if effective != (backend or backend_for(name)):
+        logging.warning(f"The {backend or backend_for(name)} backend is not available for {name}; using {effective}")
+    return effective
+
+
+def model_tag(name, backend=None):
+    """Model name plus effective backend, for cache keys: results from different backends can differ."""
+    model = get_settings()["models"][f"{name}_model"]
+    backend = resolve_backend(name, backend)
+    return model if backend == "fp32" else f"{model}@{backend}"
+
+
+def _cache_path(model, backend, suffix=""):
+    directory = get_settings()["models"]["converted_directory"]
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{model.replace('/', '--')}-{backend}{suffix}")
+
+
+def quantize_int8(model, linear_types=()):
+    """
+    Dynamic int8 quantization of the Linear layers. quantize_dynamic only swaps modules whose
+    type is exactly nn.Linear, so subclasses that add no state (`linear_types`, e.g. Whisper's
+    dtype-casting Linear) are retyped to nn.Linear first. Raises if no layer was quantized.
+    """
+    import torch
+    for module in model.modules():
+        if type(module) in linear_types:
+            module.__class__ = torch.nn.Linear
+    quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    replaced = _quantized_layers(quantized)
+    if not replaced:
+        raise RuntimeError(f"int8 quantization found no Linear layers to replace in {type(model).__name__}")
+    logging.info(f"Quantized {replaced} Linear layer(s) of {type(model).__name__} to int8")
+    return quantized
+
+
+def _quantized_layers(model):
+    from torch.ao.nn.quantized.dynamic import Linear as DynamicLinear
+    return sum(isinstance(module, DynamicLinear) for module in model.modules())
+
+
+def _load_or_convert(model, backend, convert):
+    """
+    Load a converted PyTorch model from the on-disk cache, or build it with `convert()`
+    and cache it. The cached module is loaded directly, without the fp32 weights.
+    """
+    import torch
+    path = _cache_path(model, backend, ".pt")
+    if os.path.exists(path):
+        try:
+            converted = torch.load(path, weights_only=False)
+            # Older versions cached Whisper "int8" models that had no quantized layers
+            if backend != "int8" or _quantized_layers(converted):
+                return converted
+            logging.warning(f"Cached {backend} model {path} is not quantized, converting again")
+        except Exception as e:
+            logging.warning(f"Cached {backend} model {path} could not be loaded, converting again: {e}")
+    started = time.perf_counter()
+    converted = convert()
+    torch.save(converted, path + ".part")
+    os.replace(path + ".part", path)
+    logging.info(f"Converted {model} to {backend} in {time.perf_counter() - started:.1f}s, cached at {path}")
+    return converted
+
+
+@functools.lru_cache(maxsize=None)
+def _onnx_available():
+    try:
+        import optimum.onnxruntime  # noqa: F401
+        return True
+    except ImportError:
+        logging.warning("ONNX backend needs `pip install optimum[onnxruntime]`")
+        return False
+
+
+# The loaders return (model, effective backend), so callers label results with the backend that produced them
+
+
+def load_whisper(backend=None):
+    import whisper
+    name = get_settings()["models"]["whisper_model"]
+    # openai-whisper decodes with its own PyTorch loop, which an ONNX export cannot replace
+    backend = _effective_backend("whisper", backend)
+    if backend == "int8":
+        return _load_or_convert(name, backend, lambda: quantize_int8(
+            whisper.load_model(name, device="cpu"), linear_types=(whisper.model.Linear,))), backend
+    return whisper.load_model(name), backend
+
+
+def load_nllb(backend=None):
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+    name = get_settings()["models"]["nllb_model"]
+    backend = _effective_backend("nllb", backend)
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    if backend == "onnx":
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        path = _cache_path(name, backend)
+        if os.path.isdir(path):
+            model = ORTModelForSeq2SeqLM.from_pretrained(path)
+        else:
+            model = ORTModelForSeq2SeqLM.from_pretrained(name, export=True)
+            model.save_pretrained(path)
+        return {"tokenizer": tokenizer, "model": model, "device": "cpu"}, backend
+    if backend == "int8":
+        model = _load_or_convert(name, backend,
+                                 lambda: quantize_int8(AutoModelForSeq2SeqLM.from_pretrained(name).eval()))
+        return {"tokenizer": tokenizer, "model": model, "device": "cpu"}, backend
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = AutoModelForSeq2SeqLM.from_pretrained(name).to(device)
+    return {"tokenizer": tokenizer, "model": model, "device": device}, backend
+
+
+def load_emotion_classifier(backend=None):
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
+    name = get_settings()["models"]["emotion_model"]
+    backend = _effective_backend("emotion", backend)
+    model = name
+    if backend == "onnx":
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        path = _cache_path(name, backend)
+        if os.path.isdir(path):
+            model = ORTModelForSequenceClassification.from_pretrained(path)
+        else:
+            model = ORTModelForSequenceClassification.from_pretrained(name, export=True)
+            model.save_pretrained(path)
+    elif backend == "int8":
+        model = _load_or_convert(name, backend, lambda: quantize_int8(
+            AutoModelForSequenceClassification.from_pretrained(name).eval()))
+    return pipeline(
+        "text-classification",
+        model=model,
+        tokenizer=AutoTokenizer.from_pretrained(name),
+        top_k=3  # Return top 3 emotions
+    ), backend
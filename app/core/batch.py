@@ -0,0 +1,339 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from contextlib import closing
+
+from ..utils.config import get_settings
+from ..utils.helpers import write_json_atomic
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _process_alive(pid):
+    """Whether a process with this PID is still running on this machine."""
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    if os.name == "nt":
+        # os.kill(pid, 0) would send CTRL_C_EVENT on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class BatchJobQueue:
+    """
+    Persistent job queue for batch transcription, stored in SQLite so several worker
+    processes can claim jobs concurrently and an interrupted batch can be resumed.
+    A job is 'pending', 'running', 'done' or 'failed'.
+    """
+
+    def __init__(self, db_path, results_dir):
+        self.db_path = db_path
+        self.results_dir = results_dir
+        os.makedirs(results_dir, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    size INTEGER,
+                    mtime REAL,
+                    batch TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result_path TEXT,
+                    audio_seconds REAL,
+                    elapsed REAL,
+                    error TEXT,
+                    started_at REAL,
+                    completed_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+                CREATE INDEX IF NOT EXISTS idx_jobs_batch ON jobs(batch);
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def result_path_for(self, path):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        digest = hashlib.sha1(path.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.results_dir, f"{stem}-{digest}.json")
+
+    def add(self, filepaths, batch):
+        """
+        Queue files for `batch`. Files already transcribed (same size and mtime, result
+        file still present) are kept as done so a re-run does not redo them.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for filepath in filepaths:
+                path = os.path.abspath(filepath)
+                try:
+                    stat = os.stat(path)
+                except OSError as e:
+                    logging.error(f"Cannot queue {path}: {e}")
+                    continue
+                result_path = self.result_path_for(path)
+                row = conn.execute("SELECT status, size, mtime FROM jobs WHERE path = ?", (path,)).fetchone()
+                unchanged = row and row[1] == stat.st_size and row[2] == stat.st_mtime
+                if row and row[0] == "done" and unchanged and os.path.exists(result_path):
+                    conn.execute("UPDATE jobs SET batch = ? WHERE path = ?", (batch, path))
+                elif row and row[0] in ("pending", "running") and unchanged:
+                    conn.execute("UPDATE jobs SET batch = ? WHERE path = ?", (batch, path))
+                else:
+                    conn.execute("""
+                        INSERT INTO jobs (path, size, mtime, batch, status, result_path)
+                        VALUES (?, ?, ?, ?, 'pending', ?)
+                        ON CONFLICT(path) DO UPDATE SET
+                            size = excluded.size, mtime = excluded.mtime, batch = excluded.batch,
+                            status = 'pending', worker = NULL, attempts = 0, error = NULL,
+                            result_path = excluded.result_path
+                    """, (path, stat.st_size, stat.st_mtime, batch, result_path))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def claim(self, worker):
+        """Atomically move the oldest pending job to 'running' and return (id, path, result_path)."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, path, result_path FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, started_at = ? "
+                    "WHERE id = ?", (str(worker), time.time(), row[0])
+                )
+            conn.execute("COMMIT")
+            return row
+        finally:
+            conn.close()
+
+    def complete(self, job_id, audio_seconds, elapsed):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', audio_seconds = ?, elapsed = ?, error = NULL, completed_at = ? "
+                "WHERE id = ?", (audio_seconds, elapsed, time.time(), job_id)
+            )
+
+    def fail(self, job_id, error):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, completed_at = ? WHERE id = ?",
+                (error, time.time(), job_id)
+            )
+
+    def requeue_running(self, max_attempts, worker=None):
+        """
+        Return jobs left 'running' by a crashed worker (or a crashed previous run) to the
+        queue, failing the ones that have already used up their attempts.
+        """
+        query = """
+            UPDATE jobs SET
+                status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                error = CASE WHEN attempts >= ? THEN 'Worker process crashed' ELSE error END,
+                worker = NULL
+            WHERE status = 'running'
+        """
+        params = [max_attempts, max_attempts]
+        if worker is not None:
+            query += " AND worker = ?"
+            params.append(str(worker))
+        with closing(self._connect()) as conn:
+            return conn.execute(query, params).rowcount
+
+    def requeue_orphaned(self, max_attempts):
+        """
+        Requeue the 'running' jobs whose worker process has exited. Jobs held by live workers,
+        for example those of another run on the same queue, are left alone.
+        """
+        with closing(self._connect()) as conn:
+            workers = [row[0] for row in conn.execute(
+                "SELECT DISTINCT worker FROM jobs WHERE status = 'running' AND worker IS NOT NULL")]
+        requeued = 0
+        for worker in workers:
+            if not worker.isdigit() or not _process_alive(int(worker)):
+                requeued += self.requeue_running(max_attempts, worker=worker)
+        return requeued
+
+    def count(self, status, batch=None):
+        query = "SELECT COUNT(*) FROM jobs WHERE status = ?"
+        params = [status]
+        if batch is not None:
+            query += " AND batch = ?"
+            params.append(batch)
+        with closing(self._connect()) as conn:
+            return conn.execute(query, params).fetchone()[0]
+
+    def completed_since(self, since):
+        """Return (files, audio_seconds) finished since the given timestamp."""
+        with closing(self._connect()) as conn:
+            files, audio = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(audio_seconds), 0) FROM jobs "
+                "WHERE status = 'done' AND completed_at >= ?", (since,)
+            ).fetchone()
+        return files, audio
+
+    def results(self, batch):
+        """Return (path, status, result_path, error) for every job of `batch`, in queue order."""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT path, status, result_path, error FROM jobs WHERE batch = ? ORDER BY id", (batch,)
+            ).fetchall()
+
+
+class BatchTranscriptionEngine:
+    """
+    Transcribes many files in parallel. Each worker is a separate Python process that
+    loads its own Whisper model and pulls jobs from the shared BatchJobQueue, writing one
+    JSON result per file. Progress and throughput are reported through `progress_callback`.
+    """
+
+    def __init__(self, output_dir, workers=None, progress_callback=None, poll_interval=0.5):
+        settings = get_settings()['batch']
+        self.output_dir = output_dir
+        self.workers = max(1, workers or settings['workers'])
+        self.max_attempts = settings['max_attempts']
+        self.progress_callback = progress_callback
+        self.poll_interval = poll_interval
+        self.queue = BatchJobQueue(
+            os.path.join(output_dir, "batch_jobs.db"),
+            os.path.join(output_dir, "batch_results"),
+        )
+
+    def _spawn_worker(self):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+        # Split the cores between workers instead of letting every worker use all of them
+        threads = str(max(1, (os.cpu_count() or 1) // self.workers))
+        env.setdefault("OMP_NUM_THREADS", threads)
+        env["BATCH_WORKER_THREADS"] = threads
+        return subprocess.Popen(
+            [sys.executable, "-m", "app.core.batch", self.queue.db_path, self.queue.results_dir],
+            env=env,
+        )
+
+    def run(self, filepaths):
+        """Transcribe `filepaths`, resuming any unfinished work, and return a summary dict."""
+        batch = f"{time.time():.6f}"
+        self.queue.add(filepaths, batch)
+        requeued = self.queue.requeue_orphaned(self.max_attempts)
+        if requeued:
+            logging.info(f"Resuming {requeued} job(s) interrupted in a previous run")
+
+        start = time.time()
+        pending = self.queue.count("pending")
+        total = len(filepaths)
+        logging.info(f"Batch of {total} file(s): {pending} to transcribe with up to {self.workers} worker(s)")
+
+        procs = [self._spawn_worker() for _ in range(min(self.workers, pending))]
+        while procs:
+            time.sleep(self.poll_interval)
+            for proc in list(procs):
+                if proc.poll() is None:
+                    continue
+                procs.remove(proc)
+                if proc.returncode != 0:
+                    logging.error(f"Batch worker {proc.pid} exited with code {proc.returncode}")
+                    self.queue.requeue_running(self.max_attempts, worker=proc.pid)
+                    if self.queue.count("pending"):
+                        procs.append(self._spawn_worker())
+            self._report(batch, total, start)
+
+        summary = self._report(batch, total, start)
+        logging.info(
+            f"Batch finished: {summary['done']} done, {summary['failed']} failed in "
+            f"{summary['elapsed']:.1f}s ({summary['files_per_minute']:.1f} files/min, "
+            f"{summary['audio_seconds_per_second']:.1f} audio-s per wall-s)"
+        )
+        summary['results'] = self.queue.results(batch)
+        return summary
+
+    def _report(self, batch, total, start):
+        elapsed = max(time.time() - start, 1e-6)
+        files, audio_seconds = self.queue.completed_since(start)
+        progress = {
+            'total': total,
+            'done': self.queue.count("done", batch),
+            'failed': self.queue.count("failed", batch),
+            'elapsed': elapsed,
+            'files_per_minute': files / elapsed * 60,
+            'audio_seconds_per_second': audio_seconds / elapsed,
+        }
+        if self.progress_callback:
+            self.progress_callback(progress)
+        return progress
+
+
+def run_worker(db_path, results_dir):
+    """Worker process: claim jobs until the queue is empty, one Whisper model for all of them."""
+    threads = int(os.getenv("BATCH_WORKER_THREADS", "0"))
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+
+    from .transcriber import AudioTranscriber
+    transcriber = AudioTranscriber()
+    queue = BatchJobQueue(db_path, results_dir)
+    worker = os.getpid()
+
+    while True:
+        job = queue.claim(worker)
+        if job is None:
+            return
+        job_id, path, result_path = job
+        start = time.perf_counter()
+        try:
+            record = transcriber.transcribe_file(path)
+            if not record['segments']:
+                queue.fail(job_id, "No speech detected in the audio file")
+                continue
+            write_json_atomic(result_path, record)
+            transcriber.update_transcription_history(record['text'], record['segments'], source=path,
+                                                     audio_seconds=record['audio_seconds'])
+            queue.complete(job_id, record['audio_seconds'], time.perf_counter() - start)
+            logging.info(f"Worker {worker} transcribed {os.path.basename(path)}")
+        except Exception as e:
+            logging.error(f"Worker {worker} failed on {path}: {e}")
+            queue.fail(job_id, str(e))
+
+
+if __name__ == "__main__":
+    run_worker(sys.argv[1], sys.argv[2])
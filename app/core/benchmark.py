@@ -0,0 +1,228 @@
+"""
+Accuracy/speed comparison of the inference backends against a local reference set.
+
+Reference set layout:
+    <reference_dir>/audio/*.wav       recordings, each with a <stem>.txt reference transcript
+    <reference_dir>/sentences.txt     English sentences, one per line (translation and emotion)
+
+Whisper is scored by word error rate against the reference transcripts. NLLB and the
+emotion model have no references, so they are scored by agreement with the fp32 output:
+1 - WER against the fp32 text (floored at 0, since insertions can push WER past 1) for
+Whisper and NLLB, and the fraction of sentences with the same top emotion for the emotion model.
+
+    python -m app.core.benchmark <reference_dir> [--models whisper nllb emotion] [--backends fp32 int8 onnx]
+"""
+import argparse
+import gc
+import glob
+import json
+import logging
+import os
+import re
+import time
+
+from ..utils.config import get_settings
+from . import backends
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def _words(text):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance between two texts, and the number of reference words."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def word_error_rate(references, hypotheses):
+    """Corpus-level WER: total word errors over total reference words."""
+    errors = total = 0
+    for reference, hypothesis in zip(references, hypotheses):
+        e, n = word_errors(reference, hypothesis)
+        errors += e
+        total += n
+    return errors / total if total else 0.0
+
+
+def load_reference_set(reference_dir):
+    audio = []
+    for path in sorted(glob.glob(os.path.join(reference_dir, "audio", "*.wav"))):
+        transcript = os.path.splitext(path)[0] + ".txt"
+        if os.path.exists(transcript):
+            with open(transcript, encoding="utf-8") as f:
+                audio.append((path, f.read().strip()))
+    sentences = []
+    sentences_path = os.path.join(reference_dir, "sentences.txt")
+    if os.path.exists(sentences_path):
+        with open(sentences_path, encoding="utf-8") as f:
+            sentences = [line.strip() for line in f if line.strip()]
+    return audio, sentences
+
+
+def _timed_load(loader, backend):
+    """Returns (model, effective backend, load seconds); the loader may fall back to another backend."""
+    started = time.perf_counter()
+    model, effective = loader(backend)
+    return model, effective, time.perf_counter() - started
+
+
+def bench_whisper(backend, audio):
+    import librosa
+    model, effective, load_seconds = _timed_load(backends.load_whisper, backend)
+    references, hypotheses = [], []
+    audio_seconds = 0.0
+    started = time.perf_counter()
+    for path, reference in audio:
+        samples, _ = librosa.load(path, sr=16000, mono=True)
+        audio_seconds += len(samples) / 16000
+        result = model.transcribe(samples.astype("float32"), language="en")
+        references.append(reference)
+        hypotheses.append(result["text"])
+    elapsed = time.perf_counter() - started
+    del model
+    gc.collect()
+    return {
+        "backend": effective,
+        "load_seconds": load_seconds,
+        "seconds": elapsed,
+        "real_time_factor": elapsed / audio_seconds if audio_seconds else 0.0,
+        "wer": word_error_rate(references, hypotheses),
+    }, hypotheses
+
+
+def bench_nllb(backend, sentences, tgt_lang="Hindi"):
+    from .translator import LANGUAGES, Translator
+    nllb, effective, load_seconds = _timed_load(backends.load_nllb, backend)
+    tokenizer = nllb["tokenizer"]
+    tokenizer.src_lang = "eng_Latn"
+    tgt_lang_id = tokenizer.convert_tokens_to_ids(LANGUAGES[tgt_lang])
+    started = time.perf_counter()
+    outputs, _, output_tokens = Translator._generate(sentences, nllb, tgt_lang_id, get_settings()["translation"])
+    elapsed = time.perf_counter() - started
+    del nllb
+    gc.collect()
+    return {
+        "backend": effective,
+        "load_seconds": load_seconds,
+        "seconds": elapsed,
+        "tokens_per_second": output_tokens / elapsed if elapsed else 0.0,
+    }, outputs
+
+
+def bench_emotion(backend, sentences):
+    classifier, effective, load_seconds = _timed_load(backends.load_emotion_classifier, backend)
+    started = time.perf_counter()
+    outputs = classifier(sentences, batch_size=get_settings()["emotion"]["batch_size"], truncation=True, top_k=None)
+    elapsed = time.perf_counter() - started
+    del classifier
+    gc.collect()
+    scores = [{result["label"]: result["score"] for result in output} for output in outputs]
+    return {
+        "backend": effective,
+        "load_seconds": load_seconds,
+        "seconds": elapsed,
+        "sentences_per_second": len(sentences) / elapsed if elapsed else 0.0,
+    }, scores
+
+
+def run_benchmark(reference_dir, models=("whisper", "nllb", "emotion"), backend_names=backends.BACKENDS,
+                  tgt_lang="Hindi"):
+    """Run every model on every backend and return one result dict per (model, backend)."""
+    audio, sentences = load_reference_set(reference_dir)
+    # fp32 goes first: it is the baseline the other backends are compared with
+    backend_names = ["fp32"] + [name for name in backend_names if name != "fp32"]
+    results = []
+    for model in models:
+        if model == "whisper" and not audio:
+            logging.warning("No reference audio found, skipping Whisper")
+            continue
+        if model in ("nllb", "emotion") and not sentences:
+            logging.warning(f"No sentences.txt found, skipping {model}")
+            continue
+        baseline = None
+        done = set()
+        for backend in backend_names:
+            # Rows are labelled with the backend that actually ran; skip requests that fall back to one already run
+            effective = backends.resolve_backend(model, backend)
+            if effective in done:
+                logging.warning(f"{backend} falls back to {effective} for {model}, which was already benchmarked")
+                continue
+            done.add(effective)
+            logging.info(f"Benchmarking {model} on {effective}...")
+            try:
+                if model == "whisper":
+                    result, outputs = bench_whisper(backend, audio)
+                    if baseline is not None:
+                        result["agreement"] = max(0.0, 1 - word_error_rate(baseline, outputs))
+                elif model == "nllb":
+                    result, outputs = bench_nllb(backend, sentences, tgt_lang)
+                    if baseline is not None:
+                        result["agreement"] = max(0.0, 1 - word_error_rate(baseline, outputs))
+                else:
+                    result, outputs = bench_emotion(backend, sentences)
+                    if baseline is not None:
+                        top = [max(scores, key=scores.get) for scores in outputs]
+                        base_top = [max(scores, key=scores.get) for scores in baseline]
+                        result["agreement"] = sum(a == b for a, b in zip(top, base_top)) / len(top)
+            except Exception as e:
+                logging.error(f"Benchmark of {model} on {effective} failed: {e}")
+                results.append({"model": model, "backend": effective, "requested": backend, "error": str(e)})
+                continue
+            if baseline is None:
+                baseline = outputs
+                result["agreement"] = 1.0
+            results.append({"model": model, "requested": backend, **result})
+    return results
+
+
+def format_results(results):
+    lines = [f"{'model':<8} {'backend':<8} {'load s':>7} {'run s':>7} {'speedup':>8} {'agree':>6} {'WER':>6}"]
+    baseline = {r["model"]: r["seconds"] for r in results if r["backend"] == "fp32" and "seconds" in r}
+    for r in results:
+        if "error" in r:
+            lines.append(f"{r['model']:<8} {r['backend']:<8} failed: {r['error']}")
+            continue
+        speedup = baseline.get(r["model"], 0.0) / r["seconds"] if r["seconds"] else 0.0
+        wer = f"{r['wer']:.1%}" if "wer" in r else "-"
+        lines.append(f"{r['model']:<8} {r['backend']:<8} {r['load_seconds']:>7.1f} {r['seconds']:>7.1f} "
+                     f"{speedup:>7.2f}x {r['agreement']:>6.1%} {wer:>6}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Compare inference backends on a local reference set.")
+    parser.add_argument("reference_dir")
+    parser.add_argument("--models", nargs="+", default=["whisper", "nllb", "emotion"],
+                        choices=["whisper", "nllb", "emotion"])
+    parser.add_argument("--backends", nargs="+", default=list(backends.BACKENDS), choices=backends.BACKENDS)
+    parser.add_argument("--target-lang", default="Hindi")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def write_results(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_benchmark(args.reference_dir, args.models, args.backends, args.target_lang)
+    print(format_results(results))
+    if args.output:
+        write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import collections
+import logging
+import threading
+
+import numpy as np
+import pyaudio
+
+from .resampler import StreamResampler
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class Subscription:
+    """
+    Queue of chunks for one consumer of an AudioCaptureSource. Each item is a
+    (raw, speech) pair of int16 bytes: raw at the device rate, speech at 16 kHz.
+    When the consumer falls behind, the oldest chunk is dropped and counted as an overrun.
+    A lossless subscription never drops: it keeps growing past `maxsize`, warns each time
+    its backlog doubles, and records the largest backlog it reached.
+    """
+
+    def __init__(self, name, maxsize, lossless=False):
+        self.name = name
+        self.maxsize = maxsize
+        self.lossless = lossless
+        self.delivered = 0
+        self.overruns = 0
+        self.max_backlog = 0
+        self._warn_backlog = maxsize
+        self._items = collections.deque()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        with self._cond:
+            if self._closed:
+                return
+            if self.lossless:
+                if len(self._items) >= self._warn_backlog:
+                    logging.warning(f"Audio consumer '{self.name}' is falling behind "
+                                    f"({len(self._items)} chunk(s) waiting)")
+                    self._warn_backlog *= 2
+            elif len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.overruns += 1
+                if self.overruns == 1 or self.overruns % 100 == 0:
+                    logging.warning(f"Audio consumer '{self.name}' is falling behind "
+                                    f"({self.overruns} chunk(s) dropped)")
+            self._items.append(item)
+            self.max_backlog = max(self.max_backlog, len(self._items))
+            self.delivered += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the next chunk, or None once the subscription is closed and drained (or on timeout)."""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            return self._items.popleft() if self._items else None
+
+    def get_all(self, timeout=None):
+        """Return every queued chunk (waiting for at least one), or None once closed and drained."""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None if self._closed else []
+            items = list(self._items)
+            self._items.clear()
+            return items
+
+    def pending(self):
+        return len(self._items)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class AudioCaptureSource:
+    """
+    The single input stream of the app. A capture thread reads the device, converts each
+    chunk to 16 kHz once, and fans the pair out to every subscriber (file writer, waveform
+    visualizer, level meter, live transcription) through its own Subscription. Only the
+    file writer subscribes losslessly; the other consumers drop old chunks when behind.
+    """
+
+    def __init__(self, audio, rate, speech_rate=16000, chunk_size=1024):
+        self.audio = audio
+        self.rate = rate
+        self.speech_rate = speech_rate
+        self.chunk_size = chunk_size
+        self.resampler = StreamResampler(rate, speech_rate) if rate != speech_rate else None
+        self.subscriptions = []
+        self.stream = None
+        self.thread = None
+        self.running = False
+        self._lock = threading.Lock()
+
+    def subscribe(self, name, max_seconds=5.0, lossless=False):
+        """
+        Create a subscription that buffers up to `max_seconds` of audio, or that never drops
+        audio (and warns past `max_seconds` of backlog) when `lossless`.
+        """
+        maxsize = max(1, int(max_seconds * self.rate / self.chunk_size))
+        subscription = Subscription(name, maxsize, lossless)
+        with self._lock:
+            self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        # Closed subscriptions stay listed so their counts still appear in stats()
+        subscription.close()
+
+    def start(self):
+        self.stream = self.audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.rate,
+            input=True,
+            frames_per_buffer=self.chunk_size,
+        )
+        self.running = True
+        self.thread = threading.Thread(target=self._capture, name="audio-capture", daemon=True)
+        self.thread.start()
+
+    def _capture(self):
+        while self.running:
+            try:
+                data = self.stream.read(self.chunk_size, exception_on_overflow=False)
+            except Exception as e:
+                logging.error(f"Error reading audio stream: {e}")
+                break
+            speech = self.resampler.process_int16(data) if self.resampler else data
+            with self._lock:
+                subscriptions = [s for s in self.subscriptions if not s.closed]
+            for subscription in subscriptions:
+                subscription.put((data, speech))
+
+    def stop(self):
+        """Stop reading, close the device stream and close every subscription."""
+        self.running = False
+        if self.thread:
+            self.thread.join()
+        if self.stream:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        with self._lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            subscription.close()
+        self.log_stats()
+
+    def stats(self):
+        """Chunks delivered, dropped and still queued for every consumer."""
+        with self._lock:
+            subscriptions = list(self.subscriptions)
+        return {
+            s.name: {"delivered": s.delivered, "overruns": s.overruns, "queued": s.pending(),
+                     "max_backlog": s.max_backlog}
+            for s in subscriptions
+        }
+
+    def log_stats(self):
+        for name, stats in self.stats().items():
+            log = logging.warning if stats["overruns"] else logging.info
+            log(f"Audio consumer '{name}': {stats['delivered']} chunk(s) delivered, "
+                f"{stats['overruns']} overrun(s), largest backlog {stats['max_backlog']} chunk(s)")
+
+
+class LevelMeter:
+    """Consumer that tracks the RMS and peak level of the input in dBFS."""
+
+    def __init__(self, capture):
+        self.subscription = capture.subscribe("level-meter", max_seconds=1.0)
+        self.rms_db = -96.0
+        self.peak_db = -96.0
+        self.thread = threading.Thread(target=self._run, name="level-meter", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.subscription.get()
+            if item is None:
+                if self.subscription.closed:
+                    return
+                continue
+            samples = np.frombuffer(item[0], dtype=np.int16).astype(np.float32) / 32768.0
+            if len(samples):
+                self.rms_db = 20 * np.log10(max(np.sqrt(np.mean(samples ** 2)), 1e-5))
+                self.peak_db = 20 * np.log10(max(np.abs(samples).max(), 1e-5))
@@ -1,89 +1,159 @@
 import logging
-from transformers import pipeline
-import librosa
-import numpy as np
+import time
+from ..utils.config import get_settings
+from ..utils.helpers import format_time, split_sentences
+from .audio_features import AudioFeatureExtractor
+from .model_registry import registry
 
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
 class EmotionAnalyzer:
-    def __init__(self):
+    @property
+    def text_classifier(self):
+        """The shared text emotion classifier, loaded on first use."""
         try:
-            # Initialize text emotion analyzer
-            self.text_classifier = pipeline(
-                "text-classification",
-                model="j-hartmann/emotion-english-distilroberta-base",
-                top_k=3  # Return top 3 emotions
-            )
-            logging.info("Emotion analyzer initialized successfully")
+            return registry.get("emotion")
         except Exception as e:
             logging.error(f"Error initializing emotion analyzer: {e}")
-            self.text_classifier = None
+            return None
 
-    def extract_audio_features(self, audio_path):
-        """Extract audio features using librosa"""
+    def extract_audio_features(self, audio_path, segments=None):
+        """
+        Summarize pitch, energy and speaking rate over the whole recording, and per
+        segment when transcript segments with 'start'/'end' times are given.
+        """
         try:
-            # Load audio
-            y, sr = librosa.load(audio_path, duration=3)
-            
-            # Extract features
-            pitch = librosa.yin(y, fmin=librosa.note_to_hz('C2'), 
-                              fmax=librosa.note_to_hz('C7'))
-            energy = librosa.feature.rms(y=y)
-            tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-            
+            extractor = AudioFeatureExtractor()
+            features = extractor.extract(audio_path)
+            overall = extractor.summarize(features)
+            if overall is None:
+                logging.warning(f"No voiced audio found in {audio_path}")
+                return None
+            timed = [segment for segment in segments or [] if segment.get('start') is not None]
             return {
-                'pitch_mean': np.mean(pitch),
-                'pitch_std': np.std(pitch),
-                'energy_mean': np.mean(energy),
-                'tempo': tempo
+                'overall': overall,
+                'segments': timed,
+                'segment_summaries': extractor.summarize_segments(features, timed),
             }
         except Exception as e:
             logging.error(f"Error extracting audio features: {e}")
             return None
 
-    def analyze(self, text, audio_path=None):
-        """Analyze emotions from both text and audio if available"""
+    def analyze_segments(self, segments, batch_size=None):
+        """
+        Score every transcript segment (dicts with 'text' and, when known, 'start'/'end' in seconds).
+
+        Segments are sorted by length and sent through the pipeline in batches, so each batch is
+        padded only to its own longest segment and long segments are truncated individually
+        instead of the whole transcript. Returns the time-aligned track in the original order,
+        an aggregate weighted by segment duration (or length when there are no timings) and
+        throughput figures.
+        """
+        if not self.text_classifier:
+            raise RuntimeError("Emotion analyzer not initialized")
+        batch_size = batch_size or get_settings()['emotion']['batch_size']
+
+        segments = [segment for segment in segments if segment['text'].strip()]
+        order = sorted(range(len(segments)), key=lambda i: len(segments[i]['text']))
+        started = time.perf_counter()
+        # Leased, so the idle monitor cannot unload the classifier during a long transcript
+        with registry.lease("emotion") as text_classifier:
+            outputs = text_classifier([segments[i]['text'] for i in order], batch_size=batch_size,
+                                      truncation=True, top_k=None) if segments else []
+        elapsed = time.perf_counter() - started
+
+        scores = [None] * len(segments)
+        for i, output in zip(order, outputs):
+            # A single result may come back as a dict rather than a list of labels
+            output = [output] if isinstance(output, dict) else output
+            scores[i] = {result['label']: float(result['score']) for result in output}
+
+        track = []
+        totals = {}
+        total_weight = 0.0
+        for segment, segment_scores in zip(segments, scores):
+            label = max(segment_scores, key=segment_scores.get)
+            track.append({
+                'start': segment.get('start'),
+                'end': segment.get('end'),
+                'text': segment['text'],
+                'label': label,
+                'score': segment_scores[label],
+                'scores': segment_scores,
+            })
+            if segment.get('start') is not None and segment.get('end') is not None:
+                weight = max(segment['end'] - segment['start'], 0.0)
+            else:
+                weight = float(len(segment['text']))
+            total_weight += weight
+            for emotion, score in segment_scores.items():
+                totals[emotion] = totals.get(emotion, 0.0) + weight * score
+
+        aggregate = {emotion: total / total_weight for emotion, total in totals.items()} if total_weight else {}
+        rate = len(segments) / elapsed if elapsed > 0 else 0.0
+        logging.info(f"Emotion analysis: {len(segments)} segment(s) in {elapsed:.2f}s "
+                     f"({rate:.1f} segments/s, batch size {batch_size})")
+        return {
+            'track': track,
+            'aggregate': dict(sorted(aggregate.items(), key=lambda item: item[1], reverse=True)),
+            'segments': len(segments),
+            'seconds': elapsed,
+            'segments_per_second': rate,
+        }
+
+    def format_track(self, track):
+        """Collapse consecutive segments with the same dominant emotion into timeline lines."""
+        lines = []
+        runs = []
+        for entry in track:
+            if runs and runs[-1]['label'] == entry['label']:
+                runs[-1]['end'] = entry['end']
+                runs[-1]['scores'].append(entry['score'])
+            else:
+                runs.append({'label': entry['label'], 'start': entry['start'], 'end': entry['end'],
+                             'scores': [entry['score']]})
+        for run in runs:
+            confidence = round(sum(run['scores']) / len(run['scores']) * 100, 1)
+            if run['start'] is not None and run['end'] is not None:
+                lines.append(f"- [{format_time(run['start'])} - {format_time(run['end'])}] "
+                             f"{run['label']}: {confidence}%")
+            else:
+                lines.append(f"- {run['label']} ({len(run['scores'])} sentence(s)): {confidence}%")
+        return lines
+
+    def analyze(self, text, audio_path=None, segments=None):
+        """
+        Analyze emotions from both text and audio if available.
+        Scores each transcript segment when `segments` are given, otherwise each sentence of `text`.
+        """
         try:
             if not self.text_classifier:
                 return "Error: Emotion analyzer not initialized."
 
             analysis = []  # Store analysis results
-            
+
             # Text analysis
-            text_results = self.text_classifier(text)[0]
+            if not segments:
+                segments = [{'text': sentence} for sentence in split_sentences(text)]
+            emotions = self.analyze_segments(segments)
             analysis.append("\nText-based Emotions:")
-            for result in text_results:
-                emotion = result['label']
-                confidence = result['score']
+            for emotion, confidence in list(emotions['aggregate'].items())[:3]:
                 percentage = round(confidence * 100, 1)
                 analysis.append(f"- {emotion}: {percentage}%")
+            if emotions['track']:
+                analysis.append("\nEmotion Timeline:")
+                analysis.extend(self.format_track(emotions['track']))
             
             # Audio analysis if available
             if audio_path:
-                audio_features = self.extract_audio_features(audio_path)
+                audio_features = self.extract_audio_features(audio_path, segments)
                 if audio_features:
                     analysis.append("\nVoice Characteristics:")
-                    
-                    # Analyze pitch variation
-                    if audio_features['pitch_std'] > 0.5:
-                        analysis.append("- High voice variation detected (possible excitement/stress)")
-                    else:
-                        analysis.append("- Steady voice detected (possible calmness/control)")
-                    
-                    # Analyze energy
-                    if audio_features['energy_mean'] > 0.7:
-                        analysis.append("- High energy level detected (possible excitement/anger)")
-                    else:
-                        analysis.append("- Low energy level detected (possible calmness/sadness)")
-                    
-                    # Analyze speaking rate
-                    if audio_features['tempo'] > 120:
-                        analysis.append("- Fast speaking rate detected (possible excitement/anxiety)")
-                    else:
-                        analysis.append("- Normal/slow speaking rate detected (possible confidence/sadness)")
-            
+                    analysis.extend(AudioFeatureExtractor.describe(
+                        audio_features['overall'], audio_features['segment_summaries'], audio_features['segments']))
+
             return "\n".join(analysis)
             
         except Exception as e:
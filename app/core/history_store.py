@@ -0,0 +1,305 @@
+import logging
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Word-count histogram bucket width used by the dashboard's length distribution
+LENGTH_BUCKET_WORDS = 10
+# Bumped when the schema gains tables that need filling from existing rows (see _migrate)
+SCHEMA_VERSION = 3
+
+
+def count_words(text):
+    """Lowercased whitespace-separated words, as the history dashboard has always counted them."""
+    return text.lower().split()
+
+
+def fts_query(query):
+    """
+    Turn free text into an FTS5 query that matches segments containing every term.
+    Terms are quoted so punctuation is never read as query syntax; a trailing * keeps prefix matching.
+    """
+    terms = []
+    for term in query.split():
+        prefix = term.endswith("*")
+        term = re.sub(r"^\W+|\W+$", "", term)
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class HistoryStore:
+    """
+    Transcription history in SQLite: one row per transcription, plus aggregates (totals,
+    word frequencies, a length histogram) updated in the same transaction as each insert,
+    so reading the dashboard statistics never scans the history. Every segment is also
+    added to an FTS5 full-text index, so search() finds where something was said.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS transcriptions (
+                    id INTEGER PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    source TEXT,
+                    model TEXT,
+                    audio_seconds REAL,
+                    word_count INTEGER NOT NULL,
+                    segment_count INTEGER,
+                    confidence REAL,
+                    text TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_transcriptions_created_at ON transcriptions(created_at);
+                CREATE INDEX IF NOT EXISTS idx_transcriptions_source ON transcriptions(source);
+                CREATE TABLE IF NOT EXISTS totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    transcriptions INTEGER NOT NULL DEFAULT 0,
+                    words INTEGER NOT NULL DEFAULT 0,
+                    audio_seconds REAL NOT NULL DEFAULT 0,
+                    confidence_sum REAL NOT NULL DEFAULT 0,
+                    confidence_count INTEGER NOT NULL DEFAULT 0
+                );
+                INSERT OR IGNORE INTO totals (id) VALUES (1);
+                CREATE TABLE IF NOT EXISTS word_freq (
+                    word TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_word_freq_count ON word_freq(count);
+                CREATE TABLE IF NOT EXISTS length_histogram (
+                    bucket INTEGER PRIMARY KEY,
+                    count INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS imports (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER,
+                    imported_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS segments (
+                    id INTEGER PRIMARY KEY,
+                    transcription_id INTEGER NOT NULL REFERENCES transcriptions(id),
+                    start REAL,
+                    end REAL,
+                    confidence REAL,
+                    text TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_segments_transcription ON segments(transcription_id);
+                CREATE TABLE IF NOT EXISTS daily_usage (
+                    day TEXT PRIMARY KEY,
+                    transcriptions INTEGER NOT NULL,
+                    words INTEGER NOT NULL,
+                    audio_seconds REAL NOT NULL
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+                    text, content='segments', content_rowid='id', tokenize='porter unicode61'
+                );
+            """)
+            self._migrate(conn)
+
+    @staticmethod
+    def _migrate(conn):
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        # Read again under the write lock: another process may have migrated in the meantime
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 2:
+            # Transcriptions stored before the segment index existed become one searchable segment each
+            conn.execute("INSERT INTO segments (transcription_id, confidence, text) "
+                         "SELECT id, confidence, text FROM transcriptions "
+                         "WHERE id NOT IN (SELECT transcription_id FROM segments)")
+            conn.execute("INSERT INTO segments_fts (segments_fts) VALUES ('rebuild')")
+        if version < 3:
+            conn.execute("INSERT OR REPLACE INTO daily_usage (day, transcriptions, words, audio_seconds) "
+                         "SELECT date(created_at, 'unixepoch', 'localtime'), COUNT(*), SUM(word_count), "
+                         "TOTAL(audio_seconds) FROM transcriptions GROUP BY 1")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _insert(conn, text, source, model, audio_seconds, segments, confidence, created_at):
+        words = count_words(text)
+        cursor = conn.execute(
+            "INSERT INTO transcriptions (created_at, source, model, audio_seconds, word_count, segment_count, "
+            "confidence, text) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (created_at, source, model, audio_seconds, len(words), len(segments) if segments else None,
+             confidence, text))
+        transcription_id = cursor.lastrowid
+        # Without segment timings the whole text is indexed as one segment
+        for segment in segments or [{'text': text, 'confidence': confidence}]:
+            cursor = conn.execute(
+                "INSERT INTO segments (transcription_id, start, end, confidence, text) VALUES (?, ?, ?, ?, ?)",
+                (transcription_id, segment.get('start'), segment.get('end'), segment.get('confidence'),
+                 segment['text'].strip()))
+            conn.execute("INSERT INTO segments_fts (rowid, text) VALUES (?, ?)",
+                         (cursor.lastrowid, segment['text'].strip()))
+        conn.execute(
+            "UPDATE totals SET transcriptions = transcriptions + 1, words = words + ?, "
+            "audio_seconds = audio_seconds + ?, confidence_sum = confidence_sum + ?, "
+            "confidence_count = confidence_count + ? WHERE id = 1",
+            (len(words), audio_seconds or 0.0, confidence or 0.0, int(confidence is not None)))
+        counts = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        conn.executemany(
+            "INSERT INTO word_freq (word, count) VALUES (?, ?) "
+            "ON CONFLICT(word) DO UPDATE SET count = count + excluded.count", counts.items())
+        conn.execute(
+            "INSERT INTO length_histogram (bucket, count) VALUES (?, 1) "
+            "ON CONFLICT(bucket) DO UPDATE SET count = count + 1", (len(words) // LENGTH_BUCKET_WORDS,))
+        conn.execute(
+            "INSERT INTO daily_usage (day, transcriptions, words, audio_seconds) "
+            "VALUES (date(?, 'unixepoch', 'localtime'), 1, ?, ?) "
+            "ON CONFLICT(day) DO UPDATE SET transcriptions = transcriptions + 1, words = words + excluded.words, "
+            "audio_seconds = audio_seconds + excluded.audio_seconds",
+            (created_at, len(words), audio_seconds or 0.0))
+        return transcription_id
+
+    def add(self, text, source=None, model=None, audio_seconds=None, segments=None, confidence=None,
+            created_at=None):
+        """
+        Record one transcription, index its segments ({'start', 'end', 'text', 'confidence'} dicts)
+        and update the aggregates. Returns the new row id.
+        """
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row_id = self._insert(conn, text, source, model, audio_seconds, segments, confidence,
+                                  created_at or time.time())
+            conn.execute("COMMIT")
+        return row_id
+
+    def import_text_history(self, path):
+        """
+        Import a legacy history.txt (one transcription per line) once. The file's mtime is used
+        as the timestamp of its lines. Returns the number of transcriptions imported.
+        """
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        created_at = os.path.getmtime(path)
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM imports WHERE path = ?", (path,)).fetchone():
+                conn.execute("ROLLBACK")
+                return 0
+            for line in lines:
+                self._insert(conn, line, path, None, None, None, None, created_at)
+            conn.execute("INSERT INTO imports (path, size, imported_at) VALUES (?, ?, ?)",
+                         (path, os.path.getsize(path), time.time()))
+            conn.execute("COMMIT")
+        logging.info(f"Imported {len(lines)} transcription(s) from {path} into the history store")
+        return len(lines)
+
+    def search(self, query, limit=50, source=None):
+        """
+        Segments matching every term of `query`, best match first, as dicts with the source file,
+        segment start/end in seconds, confidence, text and a snippet with the matches in [brackets].
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+        with closing(self._connect()) as conn:
+            # Rank first and build snippets only for the returned segments: snippet() is far more
+            # expensive than bm25 ranking when a common word matches a large part of the history
+            if source:
+                # Restrict by rowid so FTS5 only ranks that file's segments
+                ids = [row[0] for row in conn.execute(
+                    "SELECT rowid FROM segments_fts WHERE segments_fts MATCH ? AND rowid IN "
+                    "(SELECT s.id FROM segments s JOIN transcriptions t ON t.id = s.transcription_id "
+                    "WHERE t.source = ?) ORDER BY rank LIMIT ?", (match, os.path.abspath(source), limit))]
+            else:
+                ids = [row[0] for row in conn.execute(
+                    "SELECT rowid FROM segments_fts WHERE segments_fts MATCH ? ORDER BY rank LIMIT ?", (match, limit))]
+            if not ids:
+                return []
+            placeholders = ",".join("?" * len(ids))
+            rows = conn.execute(
+                "SELECT s.id, t.id, t.source, t.created_at, s.start, s.end, s.confidence, s.text, "
+                "snippet(segments_fts, 0, '[', ']', '...', 16) "
+                "FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid "
+                "JOIN transcriptions t ON t.id = s.transcription_id "
+                f"WHERE segments_fts MATCH ? AND segments_fts.rowid IN ({placeholders})", [match] + ids).fetchall()
+        order = {segment_id: position for position, segment_id in enumerate(ids)}
+        rows.sort(key=lambda row: order[row[0]])
+        return [{
+            'segment_id': row[0],
+            'transcription_id': row[1],
+            'source': row[2],
+            'created_at': row[3],
+            'start': row[4],
+            'end': row[5],
+            'confidence': row[6],
+            'text': row[7],
+            'snippet': row[8],
+        } for row in rows]
+
+    def revision(self):
+        """Number of transcriptions recorded; a cheap way for readers to tell whether anything changed."""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT transcriptions FROM totals WHERE id = 1").fetchone()[0]
+
+    def summary(self, top_words=5):
+        """Totals, the latest transcription and the most frequent words, read from the aggregates."""
+        with closing(self._connect()) as conn:
+            count, words, audio_seconds, confidence_sum, confidence_count = conn.execute(
+                "SELECT transcriptions, words, audio_seconds, confidence_sum, confidence_count "
+                "FROM totals WHERE id = 1").fetchone()
+            last = conn.execute(
+                "SELECT created_at, source, text FROM transcriptions ORDER BY id DESC LIMIT 1").fetchone()
+            common = conn.execute(
+                "SELECT word, count FROM word_freq ORDER BY count DESC LIMIT ?", (top_words,)).fetchall()
+        return {
+            'transcriptions': count,
+            'words': words,
+            'average_words': words / count if count else 0.0,
+            'audio_seconds': audio_seconds,
+            'average_confidence': confidence_sum / confidence_count if confidence_count else None,
+            'last': {'created_at': last[0], 'source': last[1], 'text': last[2]} if last else None,
+            'common_words': common,
+        }
+
+    def recent(self, limit=100):
+        """The latest `limit` transcriptions as (id, created_at, word_count, confidence), oldest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, created_at, word_count, confidence FROM transcriptions ORDER BY id DESC LIMIT ?",
+                (limit,)).fetchall()
+        return rows[::-1]
+
+    def length_histogram(self):
+        """[(lowest word count in bucket, transcriptions)] for the whole history."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT bucket, count FROM length_histogram ORDER BY bucket").fetchall()
+        return [(bucket * LENGTH_BUCKET_WORDS, count) for bucket, count in rows]
+
+    def usage(self, period="day", limit=30):
+        """
+        The latest `limit` days or weeks (starting Monday) with any transcriptions, oldest first,
+        as (ISO date, transcriptions, words, audio seconds).
+        """
+        if period == "week":
+            sql = ("SELECT date(day, 'weekday 0', '-6 days') AS week, SUM(transcriptions), SUM(words), "
+                   "SUM(audio_seconds) FROM daily_usage GROUP BY week ORDER BY week DESC LIMIT ?")
+        elif period == "day":
+            sql = ("SELECT day, transcriptions, words, audio_seconds FROM daily_usage "
+                   "ORDER BY day DESC LIMIT ?")
+        else:
+            raise ValueError(f"Unknown usage period '{period}'")
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, (limit,)).fetchall()
+        return rows[::-1]
@@ -0,0 +1,314 @@
+"""
+Client for the language model behind summaries and questions (app.core.text_processor).
+
+AsyncLLMClient sends prompts to a backend with at most `max_concurrency` requests in flight,
+no more than `requests_per_minute` on average (a token bucket, so short bursts are allowed),
+and retries rate-limit and server errors with exponential backoff. Responses are cached in
+SQLite by backend, model and prompt hash, so a prompt that was answered before is not sent again.
+
+Backends are small classes with a `model_name`, a `cache_id` (which backend and endpoint
+answers, so responses from a local server are never served as Gemini's, or the reverse), and
+an async generate(prompt) that returns
+(text, input tokens or None, output tokens or None) and raises LLMError. GeminiBackend calls
+the Gemini API; HTTPBackend posts JSON to any URL, so a local fake server can stand in for it.
+LLMClient runs an AsyncLLMClient on its own event loop thread for synchronous callers.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import closing
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# HTTP statuses worth retrying: rate limited, or the server failed or timed out
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token) for backends that do not report usage."""
+    return max(1, len(text) // 4)
+
+
+class LLMError(Exception):
+    """A failed model call. `retryable` errors are retried; `retry_after` is the server's hint in seconds."""
+
+    def __init__(self, message, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class LLMResponse:
+    def __init__(self, text, input_tokens, output_tokens, cached=False, attempts=0):
+        self.text = text
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        # Served from the response cache (no model call)
+        self.cached = cached
+        # Model calls made, including failed attempts that were retried
+        self.attempts = attempts
+
+
+class ResponseCache:
+    """
+    Model responses in SQLite, keyed by a hash of the backend's cache_id and the prompt.
+    Responses older than `max_age_days` are not served and are deleted on the next put;
+    past `max_entries`, the least recently used responses are evicted first.
+    """
+
+    def __init__(self, db_path, max_entries=10000, max_age_days=30):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    input_tokens INTEGER,
+                    output_tokens INTEGER,
+                    created_at REAL,
+                    last_used REAL
+                );
+            """)
+            # Caches written before eviction existed have no last_used column
+            if "last_used" not in [row[1] for row in conn.execute("PRAGMA table_info(responses)")]:
+                conn.execute("ALTER TABLE responses ADD COLUMN last_used REAL")
+                conn.execute("UPDATE responses SET last_used = created_at")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def key(cache_id, prompt):
+        return hashlib.sha256(f"{cache_id}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached LLMResponse for `key` (unless it has expired), or None."""
+        now = time.time()
+        oldest = now - self.max_age if self.max_age else 0
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT text, input_tokens, output_tokens FROM responses "
+                               "WHERE key = ? AND created_at >= ?", (key, oldest)).fetchone()
+            if row:
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return LLMResponse(*row, cached=True) if row else None
+
+    def put(self, key, cache_id, response):
+        """Store a response, then drop expired ones and evict the least recently used past max_entries."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT OR REPLACE INTO responses (key, model, text, input_tokens, output_tokens, "
+                         "created_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (key, cache_id, response.text, response.input_tokens, response.output_tokens, now, now))
+            expired = conn.execute("DELETE FROM responses WHERE created_at < ?",
+                                   (now - self.max_age,)).rowcount if self.max_age else 0
+            excess = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute("DELETE FROM responses WHERE key IN "
+                             "(SELECT key FROM responses ORDER BY last_used LIMIT ?)", (excess,))
+            conn.execute("COMMIT")
+        if expired or excess > 0:
+            logging.info(f"Response cache: removed {expired} expired and {max(excess, 0)} least recently used "
+                         f"response(s)")
+
+    def count(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, in bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # Waiters queue on the lock, so they are served in order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class GeminiBackend:
+    """Gemini through google.generativeai; its blocking calls run on a worker thread."""
+
+    def __init__(self, model_name, api_key):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.cache_id = f"gemini:{model_name}"
+        self.model = genai.GenerativeModel(model_name)
+
+    async def generate(self, prompt):
+        try:
+            response = await asyncio.to_thread(self.model.generate_content, prompt)
+            text = response.text
+        except Exception as e:
+            # google.api_core errors carry the HTTP status as `code`
+            status = getattr(e, "code", None)
+            retryable = status in RETRYABLE_STATUS or isinstance(e, (ConnectionError, TimeoutError))
+            raise LLMError(f"Gemini request failed: {e}", retryable=retryable) from e
+        usage = getattr(response, "usage_metadata", None)
+        return text, getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None)
+
+
+class HTTPBackend:
+    """
+    POSTs {"model", "prompt"} as JSON to `url` and reads {"text", "input_tokens", "output_tokens"}
+    (token counts optional). Lets a local server, or a test fake, stand in for the API.
+    """
+
+    def __init__(self, url, model_name="local", timeout=120):
+        self.url = url
+        self.model_name = model_name
+        self.cache_id = f"http:{url}:{model_name}"
+        self.timeout = timeout
+
+    def _post(self, prompt):
+        body = json.dumps({"model": self.model_name, "prompt": prompt}).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            retry_after = e.headers.get("Retry-After")
+            raise LLMError(f"{self.url} answered {e.code}", retryable=e.code in RETRYABLE_STATUS,
+                           retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None) from e
+        except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+            raise LLMError(f"{self.url} unreachable: {e}", retryable=True) from e
+        except ValueError as e:
+            raise LLMError(f"{self.url} returned invalid JSON: {e}") from e
+
+    async def generate(self, prompt):
+        data = await asyncio.to_thread(self._post, prompt)
+        if not isinstance(data, dict) or "text" not in data:
+            raise LLMError(f"{self.url} returned no text")
+        return data["text"], data.get("input_tokens"), data.get("output_tokens")
+
+
+class AsyncLLMClient:
+    """
+    Concurrency-limited, rate-limited, retrying and caching calls to `backend`.
+    Use one instance from a single event loop.
+    """
+
+    def __init__(self, backend, max_concurrency=4, requests_per_minute=60, max_retries=4,
+                 backoff_base=1.0, backoff_max=30.0, cache=None):
+        self.backend = backend
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cache = cache
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bucket = TokenBucket(requests_per_minute / 60, max_concurrency) if requests_per_minute else None
+
+    async def generate(self, prompt):
+        """Return an LLMResponse for `prompt`; raises LLMError once retries are exhausted."""
+        key = self.cache.key(self.backend.cache_id, prompt) if self.cache else None
+        if self.cache:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+        async with self._semaphore:
+            attempt = 0
+            while True:
+                if self._bucket:
+                    await self._bucket.acquire()
+                attempt += 1
+                try:
+                    text, input_tokens, output_tokens = await self.backend.generate(prompt)
+                    break
+                except LLMError as e:
+                    if not e.retryable or attempt > self.max_retries:
+                        raise
+                    if e.retry_after:
+                        # A server asking for a very long pause is still capped, so calls fail instead of hanging
+                        delay = min(e.retry_after, self.backoff_max)
+                    else:
+                        # Doubles per attempt; the jitter keeps requests that failed together from retrying together
+                        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                    logging.warning(f"{e}; retrying in {delay:.1f}s (attempt {attempt} of {self.max_retries + 1})")
+                    await asyncio.sleep(delay)
+        response = LLMResponse(text, input_tokens or estimate_tokens(prompt), output_tokens or estimate_tokens(text),
+                               attempts=attempt)
+        if self.cache:
+            await asyncio.to_thread(self.cache.put, key, self.backend.cache_id, response)
+        return response
+
+    async def generate_many(self, prompts):
+        """LLMResponses for `prompts`, in order; the concurrency and rate limits still apply."""
+        return await asyncio.gather(*(self.generate(prompt) for prompt in prompts))
+
+
+class LLMClient:
+    """Synchronous front end: runs an AsyncLLMClient on a private event loop thread."""
+
+    def __init__(self, client):
+        self.client = client
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+
+    @property
+    def model_name(self):
+        return self.client.backend.model_name
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def generate(self, prompt):
+        return self._run(self.client.generate(prompt))
+
+    def generate_many(self, prompts):
+        return self._run(self.client.generate_many(prompts))
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+def create_backend(settings, api_key=None):
+    """The backend llm_settings asks for, or None when Gemini is selected without an API key."""
+    if settings['backend'] == 'http':
+        return HTTPBackend(settings['url'], settings['model'], settings['timeout'])
+    if not api_key:
+        return None
+    return GeminiBackend(settings['model'], api_key)
+
+
+def create_client(backend, settings):
+    """LLMClient over `backend` with the limits and cache from llm_settings."""
+    cache = ResponseCache(settings['cache_path'], settings['cache_max_entries'],
+                          settings['cache_max_age_days']) if settings['cache_enabled'] else None
+    return LLMClient(AsyncLLMClient(backend, max_concurrency=settings['max_concurrency'],
+                                    requests_per_minute=settings['requests_per_minute'],
+                                    max_retries=settings['max_retries'], backoff_base=settings['backoff_base'],
+                                    backoff_max=settings['backoff_max'], cache=cache))
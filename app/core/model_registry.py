@@ -0,0 +1,217 @@
+import contextlib
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+
+from ..utils.config import get_settings
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def _rss_bytes():
+    """Return the resident set size of this process in bytes (0 if unknown)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+class ModelRegistry:
+    """
+    Loads models the first time they are requested and shares one instance
+    between every caller. Each model is registered with a zero-argument loader;
+    nothing is loaded until get() is called with its name. Callers that run long inference
+    hold a lease() on the model, so the idle monitor does not unload it while it is in use.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._monitor = None
+        self._monitor_stop = threading.Event()
+
+    def register(self, name, loader):
+        """Register (or replace) the loader used to build the model `name`."""
+        with self._lock:
+            self._loaders[name] = loader
+            self._load_locks.setdefault(name, threading.Lock())
+
+    def get(self, name):
+        """Return the shared instance of `name`, loading it on first use."""
+        entry = self._entries.get(name)
+        if entry is None:
+            if name not in self._loaders:
+                raise KeyError(f"No model registered under '{name}'")
+            # Only one thread loads a given model; others wait and reuse it
+            with self._load_locks[name]:
+                entry = self._entries.get(name)
+                if entry is None:
+                    entry = self._load(name)
+        entry["last_used"] = time.time()
+        entry["uses"] += 1
+        return entry["model"]
+
+    @contextlib.contextmanager
+    def lease(self, name):
+        """
+        Use `name` for the duration of the block: it is not unloaded as idle until the block
+        ends, and its idle time counts from then.
+        """
+        while True:
+            self.get(name)
+            with self._lock:
+                entry = self._entries.get(name)
+                # Unloaded between get() and here: load it again
+                if entry is not None:
+                    entry["leases"] += 1
+                    break
+        try:
+            yield entry["model"]
+        finally:
+            with self._lock:
+                entry["leases"] -= 1
+                entry["last_used"] = time.time()
+
+    def _load(self, name):
+        logging.info(f"Loading model '{name}'...")
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        model = self._loaders[name]()
+        load_seconds = time.perf_counter() - start
+        memory_bytes = max(_rss_bytes() - rss_before, 0)
+        entry = {
+            "model": model,
+            "load_seconds": load_seconds,
+            "memory_bytes": memory_bytes,
+            "loaded_at": time.time(),
+            "last_used": time.time(),
+            "uses": 0,
+            "leases": 0,
+        }
+        with self._lock:
+            self._entries[name] = entry
+        logging.info(
+            f"Model '{name}' loaded in {load_seconds:.1f}s "
+            f"(+{memory_bytes / 2**20:.0f} MB resident)"
+        )
+        return entry
+
+    def is_loaded(self, name):
+        return name in self._entries
+
+    def unload(self, name):
+        """Drop the registry's reference to `name` so its memory can be reclaimed."""
+        with self._lock:
+            entry = self._entries.pop(name, None)
+        if entry is None:
+            return False
+        del entry
+        self._reclaim(name)
+        return True
+
+    def _reclaim(self, name):
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        logging.info(f"Model '{name}' unloaded; resident memory now {_rss_bytes() / 2**20:.0f} MB")
+
+    def unload_idle(self, max_idle_seconds):
+        """Unload every model that is not leased and has not been used for `max_idle_seconds`."""
+        now = time.time()
+        with self._lock:
+            # Checked and removed under one lock, so no lease can start in between
+            idle = [name for name, entry in self._entries.items()
+                    if not entry["leases"] and now - entry["last_used"] > max_idle_seconds]
+            for name in idle:
+                del self._entries[name]
+        for name in idle:
+            self._reclaim(name)
+        return idle
+
+    def start_idle_monitor(self, max_idle_seconds, interval_seconds=60):
+        """Periodically unload idle models from a daemon thread."""
+        if self._monitor is not None or max_idle_seconds <= 0:
+            return
+
+        def run():
+            while not self._monitor_stop.wait(interval_seconds):
+                self.unload_idle(max_idle_seconds)
+
+        self._monitor = threading.Thread(target=run, name="model-idle-monitor", daemon=True)
+        self._monitor.start()
+
+    def stop_idle_monitor(self):
+        self._monitor_stop.set()
+        self._monitor = None
+
+    def stats(self):
+        """Return load time, memory and usage information for every registered model."""
+        now = time.time()
+        stats = {}
+        for name in self._loaders:
+            entry = self._entries.get(name)
+            if entry is None:
+                stats[name] = {"loaded": False}
+                continue
+            stats[name] = {
+                "loaded": True,
+                "load_seconds": round(entry["load_seconds"], 2),
+                "memory_mb": round(entry["memory_bytes"] / 2**20, 1),
+                "uses": entry["uses"],
+                "in_use": entry["leases"],
+                "idle_seconds": round(now - entry["last_used"], 1),
+            }
+        return stats
+
+
+def _load_whisper():
+    from .backends import load_whisper
+    model, _ = load_whisper()
+    return model
+
+
+def _load_emotion_classifier():
+    from .backends import load_emotion_classifier
+    model, _ = load_emotion_classifier()
+    return model
+
+
+def _load_spacy():
+    import spacy
+    name = get_settings()["models"]["spacy_model"]
+    # Text analysis needs tokens, noun chunks (tagger, attribute_ruler, parser) and entities only
+    exclude = get_settings()["text_analysis"]["exclude"]
+    try:
+        return spacy.load(name, exclude=exclude)
+    except OSError:
+        logging.info("Downloading spaCy model...")
+        os.system(f"python -m spacy download {name}")
+        return spacy.load(name, exclude=exclude)
+
+
+def _load_nllb():
+    from .backends import load_nllb
+    model, _ = load_nllb()
+    return model
+
+
+# Process-wide registry shared by the GUI handlers, the transcriber and the analyzers
+registry = ModelRegistry()
+registry.register("whisper", _load_whisper)
+registry.register("emotion", _load_emotion_classifier)
+registry.register("spacy", _load_spacy)
+registry.register("nllb", _load_nllb)
@@ -0,0 +1,96 @@
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class PhraseStatistics:
+    """
+    Document frequencies of key-phrase candidates across every analyzed transcript, in SQLite.
+    Adding a transcript costs one upsert per distinct phrase in it; a transcript that was
+    already counted (same text) is not counted again. The number of documents is kept in a
+    one-row table, updated in the same transaction, so ranking never counts the documents.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    key TEXT PRIMARY KEY,
+                    phrases INTEGER NOT NULL,
+                    added_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS phrase_df (
+                    phrase TEXT PRIMARY KEY,
+                    df INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    documents INTEGER NOT NULL
+                );
+            """)
+            # Databases created before the totals table are counted once here
+            conn.execute("INSERT OR IGNORE INTO totals (id, documents) SELECT 1, COUNT(*) FROM documents")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def key(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def add_documents(self, documents):
+        """Count (text, phrases) pairs that have not been counted before. Returns how many were new."""
+        added = 0
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for text, phrases in documents:
+                phrases = set(phrases)
+                inserted = conn.execute("INSERT OR IGNORE INTO documents (key, phrases, added_at) VALUES (?, ?, ?)",
+                                        (self.key(text), len(phrases), now)).rowcount
+                if not inserted:
+                    continue
+                conn.executemany("INSERT INTO phrase_df (phrase, df) VALUES (?, 1) "
+                                 "ON CONFLICT(phrase) DO UPDATE SET df = df + 1", [(p,) for p in phrases])
+                added += 1
+            conn.execute("UPDATE totals SET documents = documents + ? WHERE id = 1", (added,))
+            conn.execute("COMMIT")
+        return added
+
+    def document_frequencies(self, phrases):
+        """Return (number of documents, {phrase: document frequency}) for `phrases`."""
+        phrases = list(set(phrases))
+        found = {}
+        with closing(self._connect()) as conn:
+            documents = conn.execute("SELECT documents FROM totals WHERE id = 1").fetchone()[0]
+            # Stay well under SQLite's limit on bound parameters
+            for start in range(0, len(phrases), 500):
+                batch = phrases[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                found.update(conn.execute(
+                    f"SELECT phrase, df FROM phrase_df WHERE phrase IN ({placeholders})", batch).fetchall())
+        return documents, found
+
+    def rank(self, phrase_counts, limit=10):
+        """
+        Rank a transcript's phrases by TF-IDF against the corpus: term count times the smoothed
+        inverse document frequency log((1 + N) / (1 + df)) + 1. Ties are broken alphabetically,
+        so the ranking is the same on every run. Returns [(phrase, score)].
+        """
+        documents, df = self.document_frequencies(phrase_counts)
+        scored = [(phrase, count * (math.log((1 + documents) / (1 + df.get(phrase, 0))) + 1))
+                  for phrase, count in phrase_counts.items()]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
@@ -6,6 +6,12 @@ import os
 import shutil
 import time
 
+import numpy as np
+
+from ..utils.config import get_settings
+from .capture import AudioCaptureSource, LevelMeter
+from .ring_buffer import AudioRingBuffer
+
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
 )
@@ -14,65 +20,147 @@ logging.basicConfig(
 class AudioRecorder:
     def __init__(self):
         self.audio = pyaudio.PyAudio()
-        self.stream = None
-        self.frames = []
+        self.writers = []  # (wave writer, part path, kind) for every file being recorded
         self.recording = False
         self.filepath = None
+        self.archival_filepath = None
         self.recording_start_time = None  
         self.recording_duration = 0 
+        settings = get_settings()['audio']
+        self.profile = settings['capture_profile']
+        self.speech_rate = settings['speech_rate']
+        self.device_rate = settings['device_rate']
+        self.rate = self.speech_rate if self.profile == 'speech' else self.device_rate  # rate of output.wav
+        self.capture = None
+        self.level_meter = None
+        # Only the last few seconds stay in memory (for visualization); the take itself goes to disk
+        self.recent_seconds = 10
+        self.recent = AudioRingBuffer(self.device_rate * self.recent_seconds)
+        # 16 kHz copy of the take for handing straight to Whisper, up to max_memory_seconds
+        self.max_memory_seconds = settings['max_memory_seconds']
+        self.speech_buffer = bytearray()
+        self.speech_truncated = False
     
     def set_save_directory(self, directory):
         self.save_directory = directory
         logging.info(f"Save directory set to: {self.save_directory}")
 
+    def _output_path(self, name="output.wav"):
+        # Always save as output.wav in the specified directory
+        if hasattr(self, "save_directory"):
+            return os.path.join(self.save_directory, name)
+        return name
+
+    def _negotiate_device_rate(self):
+        """Capture at 16 kHz directly when the input device supports it, otherwise at device_rate."""
+        settings = get_settings()['audio']
+        if self.profile == 'speech':
+            try:
+                device = self.audio.get_default_input_device_info()['index']
+                if self.audio.is_format_supported(self.speech_rate, input_device=device,
+                                                  input_channels=1, input_format=pyaudio.paInt16):
+                    return self.speech_rate
+            except Exception as e:
+                logging.info(f"Input device does not support {self.speech_rate} Hz capture: {e}")
+        return settings['device_rate']
+
+    def _open_writer(self, path, rate, kind):
+        # Chunks are streamed into a .part file and renamed on stop,
+        # so memory use does not grow with the length of the session
+        part_path = path + ".part"
+        writer = wave.open(part_path, "wb")
+        writer.setnchannels(1)
+        writer.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
+        writer.setframerate(rate)
+        self.writers.append((writer, part_path, kind))
+
     def start_recording(self):
-        self.frames = []
         self.recording_start_time = time.time()
+        self.speech_buffer = bytearray()
+        self.speech_truncated = False
         try:
-            self.stream = self.audio.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=44100,
-                input=True,
-                frames_per_buffer=1024,
-            )
+            self.device_rate = self._negotiate_device_rate()
+            self.recent = AudioRingBuffer(self.device_rate * self.recent_seconds)
+
+            self.writers = []
+            if self.profile == 'speech':
+                self.rate = self.speech_rate
+                self._open_writer(self._output_path(), self.speech_rate, 'speech')
+                if self.device_rate != self.speech_rate and get_settings()['audio']['keep_archival_copy']:
+                    self._open_writer(self._output_path("output_full.wav"), self.device_rate, 'device')
+            else:
+                self.rate = self.device_rate
+                self._open_writer(self._output_path(), self.device_rate, 'device')
+
+            # One device stream for the whole app; the file writer is just its first consumer.
+            # It must never drop audio, so a slow disk only grows its backlog.
+            self.capture = AudioCaptureSource(self.audio, self.device_rate, self.speech_rate)
+            self.writer_subscription = self.capture.subscribe("file-writer", max_seconds=30, lossless=True)
+            self.capture.start()
+            self.level_meter = LevelMeter(self.capture)
             self.recording = True
             self.thread = threading.Thread(target=self.record)
             self.thread.start()
-            logging.info("Recording started")
+            logging.info(f"Recording started ({self.profile} profile, device at {self.device_rate} Hz, "
+                         f"{'resampling' if self.capture.resampler else 'no resampling'} to {self.speech_rate} Hz)")
         except Exception as e:
             logging.error(f"Error starting recording: {e}")
             raise RuntimeError(f"Error starting recording: {e}")
 
+    def subscribe(self, name, max_seconds=5.0):
+        """Subscribe another consumer (visualizer, live transcription, ...) to the running capture."""
+        return self.capture.subscribe(name, max_seconds)
+
     def record(self):
-        while self.recording:
-            data = self.stream.read(1024)
-            self.frames.append(data)
+        # Runs until the capture is stopped and every queued chunk has been written
+        while True:
+            item = self.writer_subscription.get()
+            if item is None:
+                break
+            data, speech = item
+            for writer, _, kind in self.writers:
+                writer.writeframesraw(speech if kind == 'speech' else data)
+            self.recent.write(np.frombuffer(data, dtype=np.int16))
+            if len(self.speech_buffer) < self.max_memory_seconds * self.speech_rate * 2:
+                self.speech_buffer.extend(speech)
+            else:
+                self.speech_truncated = True
 
     def stop_recording(self):
         self.recording = False
+        self.capture.stop()
         self.thread.join()
-        self.stream.stop_stream()
-        self.stream.close()
         self.recording_duration = time.time() - self.recording_start_time
         self.save_recording()
         logging.info("Recording stopped and saved")
 
     def save_recording(self):
-        # Always save as output.wav in the specified directory
-        if hasattr(self, "save_directory"):
-            self.filepath = os.path.join(self.save_directory, "output.wav")
-        else:
-            self.filepath = "output.wav"
-
-        wf = wave.open(self.filepath, "wb")
-        wf.setnchannels(1)
-        wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
-        wf.setframerate(44100)
-        wf.writeframes(b"".join(self.frames))
-        wf.close()
+        """Finalize the WAV headers and move the finished files to their final names."""
+        for writer, part_path, kind in self.writers:
+            writer.close()  # patches the header with the final frame count
+            final_path = part_path[:-len(".part")]
+            os.replace(part_path, final_path)
+            if self.profile == 'speech' and kind == 'device':
+                self.archival_filepath = final_path
+            else:
+                self.filepath = final_path
+        self.writers = []
         logging.info(f"Recording saved to {self.filepath}")
 
+    def speech_audio(self):
+        """
+        Return the last take as 16 kHz mono float32, ready for Whisper without reading the
+        file back, or None if the take was too long to keep in memory.
+        """
+        if self.speech_truncated or not self.speech_buffer:
+            return None
+        return np.frombuffer(bytes(self.speech_buffer), dtype=np.int16).astype(np.float32) / 32768.0
+
+    def recent_audio(self, seconds=None):
+        """Return the most recent `seconds` of the current take as int16 samples at device_rate."""
+        count = None if seconds is None else int(seconds * self.device_rate)
+        return self.recent.read_latest(count)
+
     def rename_audio(self, new_name):
         if not self.filepath or not os.path.exists(self.filepath):
             logging.error("No audio file exists to rename")
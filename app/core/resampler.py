@@ -0,0 +1,57 @@
+from math import gcd
+
+import numpy as np
+
+
+class StreamResampler:
+    """
+    Streaming polyphase resampler for mono audio (e.g. 44.1 kHz capture to 16 kHz for Whisper).
+
+    The rate ratio is reduced to up/down factors L/M and a windowed-sinc low-pass filter is
+    split into L phases, so each output sample costs one short dot product. The last few
+    input samples are carried between calls, so resampling chunk by chunk gives the same
+    result as resampling the whole signal at once.
+    """
+
+    def __init__(self, in_rate, out_rate, taps_per_phase=32):
+        divisor = gcd(int(in_rate), int(out_rate))
+        self.up = int(out_rate) // divisor
+        self.down = int(in_rate) // divisor
+        self.taps = taps_per_phase
+
+        # Low-pass prototype at the upsampled rate, cut off below the lower Nyquist frequency
+        length = self.taps * self.up
+        cutoff = 0.5 / max(self.up, self.down) * 0.9
+        n = np.arange(length) - (length - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 6.0) * self.up
+        # phases[p, j] is the coefficient applied to x[i - j] for output phase p
+        self.phases = prototype.reshape(self.taps, self.up).T.astype(np.float32)
+
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._consumed = 0  # input samples seen so far
+        self._produced = 0  # output samples emitted so far
+
+    def process(self, samples):
+        """Resample the next chunk of float samples and return the output available so far."""
+        samples = np.asarray(samples, dtype=np.float32)
+        buffer = np.concatenate([self._history, samples])
+        base = self._consumed - len(self._history)  # absolute index of buffer[0]
+        self._consumed += len(samples)
+
+        end = (self._consumed * self.up + self.down - 1) // self.down
+        outputs = np.arange(self._produced, end, dtype=np.int64)
+        self._produced = end
+        self._history = buffer[len(buffer) - (self.taps - 1):]
+        if len(outputs) == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        position = outputs * self.down
+        index = (position // self.up - base)[:, None] - np.arange(self.taps)[None, :]
+        coefficients = self.phases[position % self.up]
+        return np.einsum("ij,ij->i", buffer[index], coefficients).astype(np.float32)
+
+    def process_int16(self, data):
+        """Resample raw int16 bytes and return raw int16 bytes."""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        resampled = self.process(samples)
+        return np.clip(np.round(resampled), -32768, 32767).astype(np.int16).tobytes()
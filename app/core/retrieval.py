@@ -0,0 +1,201 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter, OrderedDict
+
+from ..utils.helpers import format_time, write_json_atomic
+from .llm_client import estimate_tokens
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Bumped when tokenization changes, so indexes built by older versions are rebuilt
+INDEX_VERSION = 2
+
+# Words too common to say anything about which segment answers a question
+STOP_WORDS = frozenset("""
+a an the and or but if of to in on at by for with from as is are was were be been being am do does did
+have has had i you he she it we they me him her us them my your his its our their this that these those
+what which who whom whose when where why how there here not no so than too very can could will would
+shall should may might must just about into over under again then once all any both each few more most
+other some such only own same s t don doesn didn isn aren wasn weren
+""".split())
+
+
+def stem(word):
+    """
+    Light suffix stripping, so inflections of a word match each other ("decide", "decided",
+    "decides", "deciding" -> "decid"; "recordings" -> "record"). Stems keep at least three letters.
+    """
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies") and len(word) > 5:
+        word = word[:-3] + "y"
+    elif word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        word = word[:-1]
+    if word.endswith("eed") and len(word) > 4:
+        # agreed -> agree
+        word = word[:-1]
+    else:
+        for suffix in ("ing", "ied", "ed", "ly"):
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                word = word[:-len(suffix)] + ("y" if suffix == "ied" else "")
+                # running -> runn -> run
+                if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "aeioulsz":
+                    word = word[:-1]
+                break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Stemmed, lowercased word tokens without stop words."""
+    return [stem(word) for word in re.findall(r"\w+", text.lower()) if word not in STOP_WORDS]
+
+
+def segment_label(segment, index):
+    """How an excerpt is cited: its time range, or its position when there are no timings."""
+    if segment.get('start') is None:
+        return f"[#{index + 1}]"
+    return f"[{format_time(segment['start'])} - {format_time(segment['end'])}]"
+
+
+class BM25Index:
+    """Okapi BM25 over the segments of one transcript."""
+
+    def __init__(self, segments, postings, lengths, k1=1.5, b=0.75):
+        self.segments = segments
+        self.postings = postings
+        self.lengths = lengths
+        self.k1 = k1
+        self.b = b
+        self.average_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    @classmethod
+    def build(cls, segments):
+        segments = [{'text': s['text'].strip(), 'start': s.get('start'), 'end': s.get('end')} for s in segments]
+        postings, lengths = {}, []
+        for i, segment in enumerate(segments):
+            terms = Counter(tokenize(segment['text']))
+            lengths.append(sum(terms.values()))
+            for term, count in terms.items():
+                postings.setdefault(term, []).append([i, count])
+        return cls(segments, postings, lengths)
+
+    def to_dict(self):
+        return {'version': INDEX_VERSION, 'segments': self.segments, 'postings': self.postings,
+                'lengths': self.lengths}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['segments'], data['postings'], data['lengths'])
+
+    def search(self, query, k=6):
+        """Return the indexes of the `k` best matching segments for `query`, best first."""
+        n = len(self.segments)
+        scores = Counter()
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log((n - len(postings) + 0.5) / (len(postings) + 0.5) + 1)
+            for i, count in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / (self.average_length or 1))
+                scores[i] += idf * count * (self.k1 + 1) / (count + norm)
+        # Ties go to the earlier segment, so results do not change between runs
+        return [i for i, _ in sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]]
+
+
+class TranscriptRetriever:
+    """
+    Builds a BM25 index once per transcript and keeps it on disk (one JSON file per transcript,
+    named by a hash of its segments), so every later question about the same transcript
+    loads the index instead of rebuilding it. The most recently used indexes stay in memory.
+    """
+
+    def __init__(self, directory, top_k=6, context_segments=1, fallback_tokens=3000, memory_indexes=4):
+        self.directory = directory
+        self.top_k = top_k
+        self.context_segments = context_segments
+        self.fallback_tokens = fallback_tokens
+        self.memory_indexes = memory_indexes
+        self._indexes = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(segments):
+        content = json.dumps([[s['text'].strip(), s.get('start'), s.get('end')] for s in segments])
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def index_for(self, segments):
+        """Return (index, how it was obtained: 'memory', 'disk' or 'built')."""
+        key = self.key(segments)
+        if key in self._indexes:
+            self._indexes.move_to_end(key)
+            return self._indexes[key], "memory"
+        path = os.path.join(self.directory, f"{key}.json")
+        index, source = None, "disk"
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION:
+                    index = BM25Index.from_dict(data)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Retrieval index {path} could not be read, rebuilding it: {e}")
+        if index is None:
+            index, source = BM25Index.build(segments), "built"
+            write_json_atomic(path, index.to_dict())
+            logging.info(f"Built retrieval index over {len(segments)} segment(s) at {path}")
+        self._indexes[key] = index
+        while len(self._indexes) > self.memory_indexes:
+            self._indexes.popitem(last=False)
+        return index, source
+
+    def retrieve(self, segments, query):
+        """
+        The excerpts most relevant to `query`, in transcript order, as [(label, text)].
+        Each hit is widened by `context_segments` neighbours on both sides, and overlapping
+        or adjacent excerpts are merged.
+        """
+        index, _ = self.index_for(segments)
+        hits = index.search(query, self.top_k)
+        if not hits:
+            return []
+        ranges = sorted((max(0, i - self.context_segments), min(len(index.segments) - 1, i + self.context_segments))
+                        for i in hits)
+        merged = [list(ranges[0])]
+        for first, last in ranges[1:]:
+            if first <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], last)
+            else:
+                merged.append([first, last])
+        excerpts = []
+        for first, last in merged:
+            start, end = index.segments[first], index.segments[last]
+            label = segment_label({'start': start['start'], 'end': end['end']}, first)
+            excerpts.append((label, " ".join(s['text'] for s in index.segments[first:last + 1])))
+        return excerpts
+
+    def leading(self, segments):
+        """
+        The opening of the transcript, up to `fallback_tokens`, as one [(label, text)] excerpt.
+        Sent instead when no segment matches the question (e.g. "What is this about?").
+        """
+        segments = [s for s in segments if s['text'].strip()]
+        taken, tokens = [], 0
+        for segment in segments:
+            size = estimate_tokens(segment['text'])
+            if taken and tokens + size > self.fallback_tokens:
+                break
+            taken.append(segment)
+            tokens += size
+        if not taken:
+            return []
+        label = segment_label({'start': taken[0].get('start'), 'end': taken[-1].get('end')}, 0)
+        return [(label, " ".join(s['text'].strip() for s in taken))]
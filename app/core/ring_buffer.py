@@ -0,0 +1,48 @@
+import threading
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size, thread-safe ring buffer holding the most recent samples of a stream.
+    One thread writes chunks as they arrive; any thread can read the latest samples.
+    """
+
+    def __init__(self, capacity, dtype=np.int16):
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity, dtype=dtype)
+        self._write_pos = 0
+        self.total_written = 0
+        self._lock = threading.Lock()
+
+    def write(self, samples):
+        samples = np.asarray(samples, dtype=self._data.dtype)
+        written = len(samples)
+        if len(samples) >= self.capacity:
+            samples = samples[-self.capacity:]
+        with self._lock:
+            end = self._write_pos + len(samples)
+            if end <= self.capacity:
+                self._data[self._write_pos:end] = samples
+            else:
+                split = self.capacity - self._write_pos
+                self._data[self._write_pos:] = samples[:split]
+                self._data[:end - self.capacity] = samples[split:]
+            self._write_pos = end % self.capacity
+            self.total_written += written
+
+    def read_latest(self, count=None):
+        """Return a copy of the newest `count` samples (all buffered samples by default), oldest first."""
+        with self._lock:
+            available = min(self.total_written, self.capacity)
+            count = available if count is None else min(int(count), available)
+            start = (self._write_pos - count) % self.capacity
+            if start + count <= self.capacity:
+                return self._data[start:start + count].copy()
+            return np.concatenate([self._data[start:], self._data[:self._write_pos]])
+
+    def clear(self):
+        with self._lock:
+            self._write_pos = 0
+            self.total_written = 0
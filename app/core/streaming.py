@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+
+import librosa
+import numpy as np
+
+from .model_registry import registry
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+WHISPER_RATE = 16000
+
+
+class StreamingTranscriber:
+    """
+    Transcribes audio while it is still being recorded.
+
+    16 kHz chunks arrive through a Subscription to the recorder's capture source and are
+    consumed by a worker thread. Whenever a full window has accumulated it is sent to Whisper; segments that
+    end before the trailing overlap are finalized and the rest of the window is carried
+    over, so words cut at a window edge are transcribed again with their full context.
+    The text of the finalized segments is passed as the prompt for the next window.
+    """
+
+    def __init__(self, transcriber, subscription, input_rate=16000, window_seconds=30.0, overlap_seconds=5.0,
+                 on_segment=None, language='en', context_chars=200):
+        self.transcriber = transcriber
+        self.subscription = subscription
+        self.input_rate = input_rate
+        self.window_samples = int(window_seconds * input_rate)
+        self.overlap_seconds = overlap_seconds
+        self.on_segment = on_segment
+        self.language = language
+        self.context_chars = context_chars
+
+        self.buffer = np.zeros(0, dtype=np.float32)  # audio not yet finalized, at input_rate
+        self.buffer_start = 0.0  # position of buffer[0] in the recording, in seconds
+        self.segments = []  # finalized segments with recording-relative timestamps
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="streaming-transcriber", daemon=True)
+        self.thread.start()
+        logging.info("Streaming transcription started")
+
+    def finish(self, timeout=None):
+        """Transcribe whatever audio is left and return all finalized segments."""
+        self.subscription.close()
+        if self.thread:
+            self.thread.join(timeout)
+        return self.segments
+
+    def _run(self):
+        while True:
+            # Take everything queued at once so a slow window doesn't cause many small appends
+            items = self.subscription.get_all()
+            stop = items is None
+            if items:
+                data = b"".join(speech for _, speech in items)
+                chunk = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+                self.buffer = np.concatenate([self.buffer, chunk])
+
+            if stop:
+                start = time.perf_counter()
+                while len(self.buffer) > self.input_rate * 0.1:
+                    self._process_window(final=True)
+                logging.info(f"Streaming transcription flushed in {time.perf_counter() - start:.1f}s "
+                             f"({len(self.segments)} segments)")
+                return
+            while len(self.buffer) >= self.window_samples:
+                self._process_window(final=False)
+                queued = self.subscription.pending()
+                if queued > self.subscription.maxsize // 2:
+                    logging.warning(f"Streaming transcription is falling behind the recording "
+                                    f"({queued} chunks queued)")
+
+    def _process_window(self, final):
+        try:
+            self._transcribe_window(final)
+        except Exception as e:
+            # Skip the failed window rather than retrying it on every new chunk
+            logging.error(f"Error during streaming transcription: {e}")
+            self._advance(min(self.window_samples, len(self.buffer)))
+
+    def _transcribe_window(self, final):
+        window = self.buffer[:self.window_samples]
+        window_seconds = len(window) / self.input_rate
+        audio = window
+        if self.input_rate != WHISPER_RATE:
+            audio = librosa.resample(window, orig_sr=self.input_rate, target_sr=WHISPER_RATE)
+
+        context = " ".join(s['text'].strip() for s in self.segments)[-self.context_chars:]
+        # Leased, so the idle monitor cannot unload the model in the middle of a window
+        with registry.lease("whisper") as model:
+            result = model.transcribe(
+                audio.astype(np.float32), language=self.language, word_timestamps=True,
+                initial_prompt=context or None, condition_on_previous_text=False
+            )
+        segments = result.get('segments', [])
+
+        if final:
+            committed, cut = segments, window_seconds
+        else:
+            stable_until = window_seconds - self.overlap_seconds
+            committed = [s for s in segments if s['end'] <= stable_until]
+            if committed:
+                cut = committed[-1]['end']
+            elif len(segments) > 1:
+                # One long segment runs into the overlap; keep everything before it
+                committed = segments[:-1]
+                cut = segments[-1]['start']
+            elif segments:
+                committed, cut = segments, segments[0]['end']
+            else:
+                # Silence: nothing to finalize, drop the stable part of the window
+                cut = stable_until
+            cut = min(max(cut, 1.0), window_seconds)
+
+        for segment in committed:
+            segment = self._shift(segment, self.buffer_start)
+            self.segments.append(segment)
+            if self.on_segment:
+                self.on_segment(segment)
+
+        self._advance(int(cut * self.input_rate))
+
+    def _advance(self, samples):
+        self.buffer = self.buffer[samples:]
+        self.buffer_start += samples / self.input_rate
+
+    @staticmethod
+    def _shift(segment, offset):
+        """Return a copy of a Whisper segment with timestamps moved by `offset` seconds."""
+        shifted = dict(segment, start=segment['start'] + offset, end=segment['end'] + offset)
+        if segment.get('words'):
+            shifted['words'] = [dict(w, start=w['start'] + offset, end=w['end'] + offset)
+                                for w in segment['words']]
+        return shifted
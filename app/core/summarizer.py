@@ -0,0 +1,142 @@
+import hashlib
+import logging
+import re
+import time
+
+from ..utils.helpers import format_time, split_sentences
+from .llm_client import estimate_tokens
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Lines AudioTranscriber.format_segments adds after the text: "[00:05 - 00:09]" and "(93.1% confidence)"
+METADATA_LINE = re.compile(r"^\s*(\[\d+:\d{2} - \d+:\d{2}\]|\(\d+(\.\d+)?% confidence\))\s*$")
+
+MAP_PROMPT = ("Please provide a concise summary of the following part of a transcript. "
+              "Keep names, numbers, decisions and action items.\n\n{text}")
+REDUCE_PROMPT = ("The following are summaries of consecutive parts of one transcript, in order. "
+                 "Combine them into a single concise summary of the whole transcript.\n\n{text}")
+SINGLE_PROMPT = "Please provide a concise summary of the following text:\n\n{text}"
+
+
+def transcript_segments(text):
+    """
+    Segments ({'text'}) of a transcript as shown in the transcription box: the timestamp and
+    confidence lines are dropped and the remaining text is split into sentences.
+    """
+    lines = [line for line in text.splitlines() if not METADATA_LINE.match(line)]
+    return [{'text': sentence} for sentence in split_sentences(" ".join(lines))]
+
+
+class Summarizer:
+    """
+    Map-reduce summarization of transcripts longer than the model's context.
+
+    Segments are grouped into chunks of about `chunk_tokens`. Chunk boundaries are chosen by
+    the content of the segments, not by position, so editing one part of a transcript changes
+    only the chunks around the edit. Chunks are summarized concurrently. The chunk summaries
+    are then combined, in several rounds if they do not fit in one prompt.
+
+    `client` is an app.core.llm_client.LLMClient, or anything with its generate_many(prompts).
+    It limits concurrency and caches every prompt's response, so summarizing an edited
+    transcript only calls the model for the chunks that changed.
+    """
+
+    def __init__(self, client, chunk_tokens=2000):
+        self.client = client
+        self.chunk_tokens = chunk_tokens
+        self.last_stats = {}
+
+    def chunk(self, segments):
+        """
+        Group segments into chunks of whole segments. Once a chunk holds half of chunk_tokens,
+        it ends after any segment whose text hash marks a boundary (each segment with a chance
+        proportional to its size, so chunks average about chunk_tokens). A chunk also ends
+        before a segment that would take it past chunk_tokens. Boundaries depend only on
+        nearby text, so an edit moves at most the boundaries up to the next unchanged one.
+        Returns [{'text', 'start', 'end'}]; start/end are None without segment timings.
+        """
+        chunks, current, tokens = [], [], 0
+        for segment in segments:
+            text = segment['text'].strip()
+            if not text:
+                continue
+            size = estimate_tokens(text)
+            if current and tokens + size > self.chunk_tokens:
+                chunks.append(current)
+                current, tokens = [], 0
+            current.append(segment)
+            tokens += size
+            digest = int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16) / 2**32
+            if tokens >= self.chunk_tokens / 2 and digest < size / (self.chunk_tokens / 2):
+                chunks.append(current)
+                current, tokens = [], 0
+        if current:
+            chunks.append(current)
+        return [{
+            'text': " ".join(s['text'].strip() for s in chunk),
+            'start': chunk[0].get('start'),
+            'end': chunk[-1].get('end'),
+        } for chunk in chunks]
+
+    def summarize(self, segments):
+        """Summarize transcript segments ({'text'} dicts, optionally with 'start'/'end' seconds)."""
+        started = time.perf_counter()
+        self.last_stats = {'chunks': 0, 'llm_calls': 0, 'cached_calls': 0, 'input_tokens': 0,
+                           'output_tokens': 0, 'map_seconds': 0.0, 'reduce_seconds': 0.0, 'rounds': 0}
+        chunks = self.chunk(segments)
+        self.last_stats['chunks'] = len(chunks)
+        if not chunks:
+            return ""
+        if len(chunks) == 1:
+            summary = self._generate([SINGLE_PROMPT.format(text=chunks[0]['text'])])[0]
+        else:
+            summaries = self._generate([MAP_PROMPT.format(text=chunk['text']) for chunk in chunks])
+            self.last_stats['map_seconds'] = time.perf_counter() - started
+            parts = [self._label(i, chunk) + summary for i, (chunk, summary) in enumerate(zip(chunks, summaries))]
+            summary = self._reduce(parts)
+            self.last_stats['reduce_seconds'] = time.perf_counter() - started - self.last_stats['map_seconds']
+        self.last_stats['seconds'] = time.perf_counter() - started
+        stats = self.last_stats
+        logging.info(f"Summarized {stats['chunks']} chunk(s) in {stats['seconds']:.1f}s: {stats['llm_calls']} "
+                     f"model call(s), {stats['cached_calls']} cached, {stats['input_tokens']} input / "
+                     f"{stats['output_tokens']} output tokens")
+        return summary
+
+    @staticmethod
+    def _label(index, chunk):
+        if chunk['start'] is None:
+            return f"Part {index + 1}: "
+        return f"Part {index + 1} ({format_time(chunk['start'])} - {format_time(chunk['end'])}): "
+
+    def _reduce(self, parts):
+        """Combine part summaries; groups that together exceed chunk_tokens are combined first."""
+        while True:
+            self.last_stats['rounds'] += 1
+            groups, current, tokens = [], [], 0
+            for part in parts:
+                size = estimate_tokens(part)
+                if current and tokens + size > self.chunk_tokens:
+                    groups.append(current)
+                    current, tokens = [], 0
+                current.append(part)
+                tokens += size
+            groups.append(current)
+            if len(groups) == 1:
+                return self._generate([REDUCE_PROMPT.format(text="\n\n".join(groups[0]))])[0]
+            if len(groups) == len(parts):
+                # Every part alone fills a prompt; summarizing pairs still makes progress
+                groups = [parts[i:i + 2] for i in range(0, len(parts), 2)]
+            parts = self._generate([REDUCE_PROMPT.format(text="\n\n".join(group)) for group in groups])
+
+    def _generate(self, prompts):
+        responses = self.client.generate_many(prompts)
+        for response in responses:
+            if response.cached:
+                self.last_stats['cached_calls'] += 1
+            else:
+                self.last_stats['llm_calls'] += 1
+                self.last_stats['input_tokens'] += response.input_tokens
+                self.last_stats['output_tokens'] += response.output_tokens
+        return [response.text for response in responses]
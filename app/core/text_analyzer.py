@@ -1,84 +1,144 @@
-import spacy
 from collections import Counter, defaultdict
 import logging
-from typing import Dict
+import os
+import time
+from typing import Dict, List, Optional
 
-# Download required spaCy model
-try:
-    spacy.load("en_core_web_sm")
-except OSError:
-    logging.info("Downloading spaCy model...")
-    import os
-    os.system("python -m spacy download en_core_web_sm")
+from ..utils.config import get_settings
+from ..utils.helpers import split_sentences
+from .model_registry import registry
+from .phrase_stats import PhraseStatistics
 
 class TextAnalyzer:
     def __init__(self):
-        """Initialize the TextAnalyzer with required models and resources."""
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            logging.info("Downloading spaCy model...")
-            import os
-            os.system("python -m spacy download en_core_web_sm")
-            self.nlp = spacy.load("en_core_web_sm")
-        
-        logging.info("Text analyzer initialized successfully")
+        settings = get_settings()['text_analysis']
+        # Corpus document frequencies used to rank key phrases by TF-IDF
+        self.phrase_stats = PhraseStatistics(settings['phrase_stats_path']) \
+            if settings['phrase_stats_enabled'] else None
+
+    @property
+    def nlp(self):
+        """The shared spaCy pipeline, loaded (and downloaded if missing) on first use."""
+        return registry.get("spacy")
 
-    def analyze_text(self, text: str) -> Dict:
+    def analyze_text(self, text: str, segments: Optional[List[Dict]] = None) -> Dict:
         """
         Analyze the text and return key topics, frequent words, and entities.
         
         Args:
             text (str): The text to analyze
+            segments (list): Optional transcript segments of the text; they are used as the
+                units the text is split into for spaCy instead of sentences
             
         Returns:
             dict: Dictionary containing analysis results
         """
-        if not text:
-            return {
-                "frequent_words": [],
-                "key_phrases": [],
-                "entities": [],
-                "word_count": 0
-            }
+        return self.analyze_texts([text], [segments])[0]
+
+    def analyze_texts(self, texts: List[str], segments: Optional[List[Optional[List[Dict]]]] = None,
+                      n_process: Optional[int] = None) -> List[Dict]:
+        """
+        Analyze many texts in one spaCy stream and return one result dict per text (see analyze_text).
+
+        Each text is split into pieces of at most `chunk_chars` characters, so transcripts of any
+        length stay under spaCy's max_length. The pieces of all texts go through a single
+        nlp.pipe call, batched and optionally spread over `n_process` processes, and the
+        per-piece counts, phrases and entities are merged back per text.
+        """
+        settings = get_settings()['text_analysis']
+        segments = segments or [None] * len(texts)
+        pieces = [(piece, index) for index, (text, text_segments) in enumerate(zip(texts, segments)) if text
+                  for piece in self._pieces(text, text_segments, settings['chunk_chars'])]
+        word_freqs = [Counter() for _ in texts]
+        phrase_freqs = [Counter() for _ in texts]
+        entities = [defaultdict(list) for _ in texts]
+        if not pieces:
+            return [self._result(*parts) for parts in zip(word_freqs, [[] for _ in texts], entities)]
+
+        n_process = n_process or settings['n_process']
+        if n_process < 0:
+            n_process = os.cpu_count() or 1
+        # Starting worker processes only pays off when each gets at least a batch of pieces
+        n_process = max(1, min(n_process, len(pieces) // settings['batch_size']))
 
         try:
-            # Process text with spaCy
-            doc = self.nlp(text)
-            
-            # Get word frequency (excluding stop words and punctuation)
-            words = [token.text.lower() for token in doc 
-                    if not token.is_stop and not token.is_punct and token.is_alpha]
-            word_freq = Counter(words)
-            frequent_words = word_freq.most_common(10)
-            
-            # Extract key phrases using noun chunks
-            key_phrases = list(set([
-                chunk.text.lower() for chunk in doc.noun_chunks 
-                if len(chunk.text.split()) > 1  # Only phrases with 2+ words
-            ]))[:10]
-            
-            # Extract named entities
-            entities = defaultdict(list)
-            for ent in doc.ents:
-                entities[ent.label_].append(ent.text)
-            
-            # Format entities for display
-            formatted_entities = [
-                f"{label}: {', '.join(texts)}"
-                for label, texts in entities.items()
-            ]
+            started = time.perf_counter()
+            # Process text with spaCy; leased so it is not unloaded as idle during a long batch
+            with registry.lease("spacy") as nlp:
+                for doc, index in nlp.pipe(pieces, as_tuples=True, batch_size=settings['batch_size'],
+                                           n_process=n_process):
+                    # Get word frequency (excluding stop words and punctuation)
+                    word_freqs[index].update(token.text.lower() for token in doc
+                                             if not token.is_stop and not token.is_punct and token.is_alpha)
 
-            return {
-                "frequent_words": frequent_words,
-                "key_phrases": key_phrases,
-                "entities": formatted_entities,
-                "word_count": len(words)
-            }
-            
+                    # Extract key phrases using noun chunks, without leading determiners and pronouns
+                    # ("the budget review" and "our budget review" are the same phrase)
+                    for chunk in doc.noun_chunks:
+                        start = chunk.start
+                        while start < chunk.end and (doc[start].is_stop or doc[start].is_punct):
+                            start += 1
+                        phrase = doc[start:chunk.end].text.lower()
+                        if len(phrase.split()) > 1:  # Only phrases with 2+ words
+                            phrase_freqs[index][phrase] += 1
+
+                    # Extract named entities
+                    for ent in doc.ents:
+                        entities[index][ent.label_].append(ent.text)
+            logging.info(f"Text analysis of {len(texts)} text(s) in {len(pieces)} piece(s) "
+                         f"took {time.perf_counter() - started:.2f}s ({n_process} process(es))")
         except Exception as e:
             logging.error(f"Error in text analysis: {str(e)}")
             raise
+        key_phrases = self._rank_phrases(texts, phrase_freqs)
+        return [self._result(*parts) for parts in zip(word_freqs, key_phrases, entities)]
+
+    def _rank_phrases(self, texts: List[str], phrase_freqs: List[Counter]) -> List[List]:
+        """
+        Count the texts into the corpus statistics, then rank each text's phrases by TF-IDF.
+        Without statistics, phrases are ranked by count. Ties are alphabetical in both cases.
+        """
+        if self.phrase_stats:
+            try:
+                self.phrase_stats.add_documents((text, freq) for text, freq in zip(texts, phrase_freqs) if text)
+                return [self.phrase_stats.rank(freq) for freq in phrase_freqs]
+            except Exception as e:
+                logging.warning(f"Phrase statistics unavailable, ranking key phrases by count: {e}")
+        return [sorted(freq.items(), key=lambda item: (-item[1], item[0]))[:10] for freq in phrase_freqs]
+
+    @staticmethod
+    def _pieces(text: str, segments: Optional[List[Dict]], chunk_chars: int) -> List[str]:
+        """Group segments (or sentences) into pieces of at most chunk_chars characters."""
+        units = [segment['text'].strip() for segment in segments] if segments else split_sentences(text)
+        pieces, current = [], ""
+        for unit in units:
+            # A single overlong unit is cut on whitespace
+            while len(unit) > chunk_chars:
+                cut = unit.rfind(" ", 0, chunk_chars)
+                cut = cut if cut > 0 else chunk_chars
+                pieces.append(unit[:cut])
+                unit = unit[cut:].strip()
+            if current and len(current) + 1 + len(unit) > chunk_chars:
+                pieces.append(current)
+                current = ""
+            current = f"{current} {unit}" if current else unit
+        if current:
+            pieces.append(current)
+        return pieces
+
+    @staticmethod
+    def _result(word_freq: Counter, key_phrases: List, entities: Dict) -> Dict:
+        # Format entities for display
+        formatted_entities = [
+            f"{label}: {', '.join(texts)}"
+            for label, texts in entities.items()
+        ]
+        return {
+            "frequent_words": word_freq.most_common(10),
+            "key_phrases": [phrase for phrase, _ in key_phrases],
+            "key_phrase_scores": key_phrases,
+            "entities": formatted_entities,
+            "word_count": sum(word_freq.values())
+        }
 
     def format_analysis_results(self, analysis: Dict) -> str:
         """
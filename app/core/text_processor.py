@@ -1,62 +1,104 @@
-import google.generativeai as genai
 import logging
 import os
 from dotenv import load_dotenv
+from ..utils.config import get_settings
+from .llm_client import create_backend, create_client, estimate_tokens
+from .retrieval import TranscriptRetriever
+from .summarizer import Summarizer, transcript_segments
 
 class TextProcessor:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, backend=None):
+        """`backend` overrides the one llm_settings selects (see app.core.llm_client)."""
         # Load environment variables
         load_dotenv()
         
+        self.last_summary_stats = {}
+        retrieval_settings = get_settings()['retrieval']
+        self.retriever = TranscriptRetriever(retrieval_settings['directory'], top_k=retrieval_settings['top_k'],
+                                             context_segments=retrieval_settings['context_segments'],
+                                             fallback_tokens=retrieval_settings['fallback_tokens'])
+        self.last_query_stats = {}
+
         # Try to get API key from environment variable if not provided
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        # The LLMClient every model call goes through; None until a backend is available
+        self.model = None
         
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            try:
-                self.model = genai.GenerativeModel('gemini-pro')
-                logging.info("Gemini model initialized successfully")
-            except Exception as e:
-                logging.error(f"Error initializing Gemini model: {e}")
-                self.model = None
-        else:
-            logging.warning("No API key provided. Text processing features will be unavailable.")
-            self.model = None
+        try:
+            backend = backend or create_backend(get_settings()['llm'], self.api_key)
+            if backend:
+                self.model = create_client(backend, get_settings()['llm'])
+                logging.info(f"Language model {backend.model_name} initialized successfully")
+            else:
+                logging.warning("No API key provided. Text processing features will be unavailable.")
+        except Exception as e:
+            logging.error(f"Error initializing language model: {e}")
 
     def set_api_key(self, api_key):
         """Set or update the API key"""
         self.api_key = api_key
-        genai.configure(api_key=api_key)
+        settings = dict(get_settings()['llm'], backend='gemini')
         try:
-            self.model = genai.GenerativeModel('gemini-pro')
-            logging.info("Gemini model initialized successfully")
-            return True
+            client = create_client(create_backend(settings, api_key), settings)
         except Exception as e:
             logging.error(f"Error initializing Gemini model: {e}")
-            self.model = None
             return False
+        if self.model:
+            self.model.close()
+        self.model = client
+        logging.info("Gemini model initialized successfully")
+        return True
 
-    def summarize_text(self, text):
-        """Generate a concise summary of the given text"""
+    def summarize_text(self, text, segments=None):
+        """
+        Generate a concise summary of the given text. Long transcripts are summarized in chunks
+        (see app.core.summarizer); `segments` with timings are used as the chunking units when given,
+        otherwise the text's timestamp and confidence lines are dropped and it is split into sentences.
+        """
         if not self.model:
             return "Error: Gemini model not initialized. Please set API key first."
         
         try:
-            prompt = f"Please provide a concise summary of the following text:\n\n{text}"
-            response = self.model.generate_content(prompt)
-            return response.text
+            summarizer = Summarizer(self.model, chunk_tokens=get_settings()['summary']['chunk_tokens'])
+            summary = summarizer.summarize(segments or transcript_segments(text))
+            self.last_summary_stats = summarizer.last_stats
+            return summary
         except Exception as e:
             logging.error(f"Error generating summary: {e}")
             return f"Error generating summary: {str(e)}"
 
-    def query_text(self, text, query):
-        """Answer questions about the text"""
+    def query_text(self, text, query, segments=None):
+        """
+        Answer questions about the text. Only the transcript excerpts most relevant to the question
+        (see app.core.retrieval) are sent to the model, labelled with their timestamps, and the
+        answer cites them. `segments` with timings are used when given, otherwise the text's
+        sentences (without timestamp and confidence lines).
+        """
         if not self.model:
             return "Error: Gemini model not initialized. Please set API key first."
         
         try:
-            prompt = f"""Context: {text}\n\nQuestion: {query}\n\nPlease answer the question based on the context provided above."""
-            response = self.model.generate_content(prompt)
+            segments = segments or transcript_segments(text)
+            excerpts = self.retriever.retrieve(segments, query)
+            matched = bool(excerpts)
+            if not matched:
+                # Nothing shares a word with the question; fall back to the start of the transcript
+                excerpts = self.retriever.leading(segments)
+            self.last_query_stats = {
+                'excerpts': [label for label, _ in excerpts],
+                'matched': matched,
+                'transcript_tokens': sum(estimate_tokens(segment['text']) for segment in segments),
+                'context_tokens': sum(estimate_tokens(excerpt) for _, excerpt in excerpts),
+            }
+            if not excerpts:
+                return "The transcript is empty."
+            context = "\n".join(f"{label} {excerpt}" for label, excerpt in excerpts)
+            prompt = (f"Transcript excerpts:\n{context}\n\nQuestion: {query}\n\n"
+                      "Please answer the question based only on the excerpts above. "
+                      "Cite the bracketed timestamp of every excerpt you use, like [01:05 - 01:20]. "
+                      "If the excerpts do not contain the answer, say so.")
+            response = self.model.generate(prompt)
+            self.last_query_stats['cached'] = response.cached
             return response.text
         except Exception as e:
             logging.error(f"Error processing query: {e}")
@@ -1,10 +1,16 @@
 import os
-import whisper
 import logging
 import shutil
+import time
 import librosa
 import numpy as np
+from ..utils.config import get_settings
 from ..utils.helpers import format_time
+from .backends import model_tag
+from .history_store import HistoryStore
+from .model_registry import registry
+from .transcription_cache import TranscriptionCache
+from .vad import EnergyVAD, SpeechMap
 
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -12,14 +18,27 @@ logging.basicConfig(
 
 class AudioTranscriber:
     def __init__(self):
+        self.transcription_file = None
+        self.segments_with_confidence = []
+        # Options passed to model.transcribe; they are also part of the cache key
+        self.decode_options = {'language': 'en', 'word_timestamps': True}
+        cache_settings = get_settings()['transcription_cache']
+        self.cache = TranscriptionCache(cache_settings['directory'], cache_settings['max_bytes']) \
+            if cache_settings['enabled'] else None
+        vad_settings = get_settings()['vad']
+        self.vad = EnergyVAD(margin_db=vad_settings['margin_db'], min_silence_ms=vad_settings['min_silence_ms'],
+                             padding_ms=vad_settings['padding_ms']) if vad_settings['enabled'] else None
+        history_settings = get_settings()['history']
+        self.history = HistoryStore(history_settings['path']) if history_settings['enabled'] else None
+
+    @property
+    def model(self):
+        """The shared Whisper model, loaded on first use."""
         try:
-            self.model = whisper.load_model("small")
-            logging.info("Whisper model loaded successfully.")
+            return registry.get("whisper")
         except Exception as e:
             logging.error(f"Error loading Whisper model: {e}")
-            self.model = None
-        self.transcription_file = None
-        self.segments_with_confidence = []
+            return None
 
     def transcribe_audio(self, filepath, save_directory=None):
         """
@@ -27,82 +46,234 @@ class AudioTranscriber:
         This method maintains the existing features (confidence calculation, history update, file saving)
         and is used by the batch processing UI code to process multiple files one by one.
         """
-        if not self.model:
-            logging.error("Whisper model is not loaded.")
-            return "Error: Whisper model not loaded.\n"
         try:
             if not os.path.exists(filepath):
                 error_msg = f"Audio file not found at: {filepath}"
                 logging.error(error_msg)
                 return f"Error: {error_msg}\n"
 
-            # Load and preprocess audio file using librosa
-            logging.info(f"Loading audio file: {filepath}")
-            audio_data, sr = librosa.load(filepath, sr=16000, mono=True)
-            audio_data = audio_data.astype(np.float32)
-            logging.info(f"Audio loaded successfully. Shape: {audio_data.shape}, dtype: {audio_data.dtype}")
+            audio_data = self.load_audio(filepath)
+        except Exception as e:
+            error_msg = f"Error during transcription: {str(e)}"
+            logging.error(error_msg)
+            return f"Error: {error_msg}\n"
+        return self.transcribe_samples(audio_data, save_directory, source=filepath)
 
-            # Transcribe with word timestamps
-            logging.info("Starting transcription...")
-            result = self.model.transcribe(audio_data, language='en', word_timestamps=True)
+    def transcribe_samples(self, audio_data, save_directory=None, source=None):
+        """
+        Transcribes 16 kHz mono float32 samples that are already in memory (such as a fresh
+        recording from AudioRecorder.speech_audio) and saves the outputs like transcribe_audio.
+        """
+        try:
+            result = self.transcribe_array(audio_data)
 
             # Process segments from the transcription result
             segments = result.get('segments', [])
             if not segments:
                 return "Error: No speech detected in the audio file.\n"
 
-            # Prepare outputs: raw text and confidence details
-            text_output = []
-            confidence_output = []
-            self.segments_with_confidence = []
-
-            for segment in segments:
-                # Extract and store text
-                text = segment['text'].strip()
-                text_output.append(text)
-
-                # Format timestamp and calculate confidence
-                timestamp = f"[{self._format_time(segment['start'])} - {self._format_time(segment['end'])}]"
-                confidence = self._calculate_segment_confidence(segment)
-                confidence_str = f"({confidence:.1%} confidence)"
-
-                # Save segment details for potential further use
-                self.segments_with_confidence.append({
-                    'timestamp': timestamp,
-                    'confidence': confidence_str,
-                    'text': text
-                })
-
-                confidence_output.extend([timestamp, confidence_str, ""])
-
-            # Combine outputs into strings
-            text_content = " ".join(text_output)
-            confidence_content = "\n".join(confidence_output)
-
-            # Save transcription and confidence details to files
-            if save_directory:
-                text_file = os.path.join(save_directory, "output_transcription.txt")
-                conf_file = os.path.join(save_directory, "output_transcription_confidence.txt")
-            else:
-                text_file = "output_transcription.txt"
-                conf_file = "output_transcription_confidence.txt"
-
-            with open(text_file, 'w', encoding='utf-8') as f:
-                f.write(text_content)
-            with open(conf_file, 'w', encoding='utf-8') as f:
-                f.write(confidence_content)
-
-            # Update history with the transcription text
-            self.update_transcription_history(text_content)
-
-            # Return the combined transcription and confidence information for display
-            return f"{text_content}\n\n{confidence_content}"
+            return self.save_segments(segments, save_directory, source=source,
+                                      audio_seconds=len(audio_data) / 16000)
 
         except Exception as e:
             error_msg = f"Error during transcription: {str(e)}"
             logging.error(error_msg)
             return f"Error: {error_msg}\n"
 
+    def load_audio(self, filepath):
+        """
+        Load an audio file as 16 kHz mono float32, the format Whisper expects.
+        Files recorded with the 'speech' capture profile are already 16 kHz, so librosa skips resampling.
+        """
+        # Load and preprocess audio file using librosa
+        logging.info(f"Loading audio file: {filepath}")
+        audio_data, sr = librosa.load(filepath, sr=16000, mono=True)
+        audio_data = audio_data.astype(np.float32)
+        logging.info(f"Audio loaded successfully. Shape: {audio_data.shape}, dtype: {audio_data.dtype}")
+        return audio_data
+
+    def transcribe_array(self, audio_data):
+        """
+        Run Whisper on a 16 kHz float32 array and return its raw result dict.
+        Results are cached by audio content and settings, so the model is only
+        loaded and run for audio it has not transcribed before. With VAD enabled,
+        only the detected speech is transcribed and timestamps refer to the full audio.
+        """
+        cache_key = None
+        if self.cache:
+            options = dict(self.decode_options)
+            if self.vad:
+                options['vad'] = self.vad.options()
+            cache_key = self.cache.key(audio_data, model=model_tag("whisper"), **options)
+            result = self.cache.get(cache_key)
+            if result is not None:
+                return result
+
+        speech_map = None
+        if self.vad:
+            speech_map = SpeechMap(audio_data, self.vad.detect(audio_data))
+            if len(speech_map.audio) == 0:
+                logging.info(f"VAD: no speech found in {speech_map.total_seconds:.1f}s of audio")
+                result = {'text': '', 'segments': [], 'language': self.decode_options.get('language')}
+                if self.cache:
+                    self.cache.put(cache_key, result)
+                return result
+            audio_data = speech_map.audio
+
+        # Transcribe with word timestamps
+        logging.info("Starting transcription...")
+        started = time.perf_counter()
+        # Leased, so the idle monitor cannot unload the model during a long transcription
+        with registry.lease("whisper") as model:
+            result = model.transcribe(audio_data, **self.decode_options)
+
+        if speech_map:
+            speech_map.remap(result)
+            elapsed = time.perf_counter() - started
+            # Only the decode of the speech was timed; how long the full audio would take is not known
+            logging.info(f"VAD: transcribed {speech_map.speech_seconds:.1f}s of speech out of "
+                         f"{speech_map.total_seconds:.1f}s of audio ({speech_map.skipped_fraction:.1%} of the audio "
+                         f"skipped, {len(speech_map.offsets)} region(s)) in {elapsed:.1f}s")
+
+        if self.cache:
+            self.cache.put(cache_key, result)
+        return result
+
+    def transcribe_file(self, filepath):
+        """
+        Transcribe a file without touching output files or history.
+        Returns a JSON-serializable record with the text and the segments (with word timings).
+        """
+        audio_data = self.load_audio(filepath)
+        return self.make_record(filepath, audio_data, self.transcribe_array(audio_data))
+
+    def make_record(self, source, audio_data, result):
+        """Build the JSON-serializable record for a Whisper result (see transcribe_file)."""
+        segments = [{
+            'start': float(segment['start']),
+            'end': float(segment['end']),
+            'text': segment['text'],
+            'words': [{
+                'word': word['word'],
+                'start': float(word['start']),
+                'end': float(word['end']),
+                'probability': float(word.get('probability', 0.0)),
+            } for word in segment.get('words', [])],
+        } for segment in result.get('segments', [])]
+        return {
+            'source': os.path.abspath(source),
+            'audio_seconds': len(audio_data) / 16000,
+            'text': " ".join(segment['text'].strip() for segment in segments),
+            'segments': segments,
+        }
+
+    def transcribe_batch(self, clips):
+        """
+        Transcribe several short clips (up to 30 s each, 16 kHz float32) with one batched
+        Whisper decode over their stacked log-mel spectrograms, and return one result dict per
+        clip. Batched decoding has no word timings: each clip comes back as a single segment.
+        """
+        import torch
+        import whisper
+
+        results = [None] * len(clips)
+        keys = [None] * len(clips)
+        if self.cache:
+            model_name = model_tag("whisper")
+            for i, clip in enumerate(clips):
+                keys[i] = self.cache.key(clip, model=model_name, mode="batched-decode",
+                                         language=self.decode_options.get('language'))
+                results[i] = self.cache.get(keys[i])
+        todo = [i for i, result in enumerate(results) if result is None]
+        if not todo:
+            return results
+
+        with registry.lease("whisper") as model:
+            n_mels = getattr(model.dims, 'n_mels', 80)
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(clips[i])), n_mels) for i in todo
+            ]).to(model.device)
+            options = whisper.DecodingOptions(language=self.decode_options.get('language'), without_timestamps=True,
+                                              fp16=model.device.type == "cuda")
+            started = time.perf_counter()
+            decoded = whisper.decode(model, mels, options)
+        logging.info(f"Decoded {len(todo)} clip(s) in one batch in {time.perf_counter() - started:.2f}s")
+
+        for i, result in zip(todo, decoded):
+            # Same silence rule as model.transcribe: likely no speech and a low-confidence decode
+            silent = result.no_speech_prob > 0.6 and result.avg_logprob < -1.0
+            results[i] = {
+                'text': "" if silent else result.text,
+                'language': result.language,
+                'segments': [] if silent or not result.text.strip() else [{
+                    'start': 0.0,
+                    'end': len(clips[i]) / 16000,
+                    'text': result.text,
+                    'avg_logprob': result.avg_logprob,
+                    'no_speech_prob': result.no_speech_prob,
+                    'words': [],
+                }],
+            }
+            if self.cache:
+                self.cache.put(keys[i], results[i])
+        return results
+
+    def format_segments(self, segments):
+        """Return (text_content, confidence_content) for a list of Whisper-style segments."""
+        text_output = []
+        confidence_output = []
+        for segment in segments:
+            timestamp = f"[{self._format_time(segment['start'])} - {self._format_time(segment['end'])}]"
+            confidence = self._calculate_segment_confidence(segment)
+            text_output.append(segment['text'].strip())
+            confidence_output.extend([timestamp, f"({confidence:.1%} confidence)", ""])
+        return " ".join(text_output), "\n".join(confidence_output)
+
+    def segment_rows(self, segments):
+        """One row per segment with numeric and formatted times, confidence and text (the export format)."""
+        rows = []
+        for segment in segments:
+            timestamp = f"[{self._format_time(segment['start'])} - {self._format_time(segment['end'])}]"
+            confidence = self._calculate_segment_confidence(segment)
+            rows.append({
+                'start': float(segment['start']),
+                'end': float(segment['end']),
+                'timestamp': timestamp,
+                'confidence': f"({confidence:.1%} confidence)",
+                'text': segment['text'].strip()
+            })
+        return rows
+
+    def save_segments(self, segments, save_directory=None, source=None, audio_seconds=None):
+        """
+        Formats Whisper segments into the transcription and confidence outputs, saves both files,
+        updates history and returns the combined string shown in the UI.
+        Shared by file transcription and live (streaming) transcription.
+        """
+        # Save segment details for potential further use
+        self.segments_with_confidence = self.segment_rows(segments)
+
+        text_content, confidence_content = self.format_segments(segments)
+
+        # Save transcription and confidence details to files
+        if save_directory:
+            text_file = os.path.join(save_directory, "output_transcription.txt")
+            conf_file = os.path.join(save_directory, "output_transcription_confidence.txt")
+        else:
+            text_file = "output_transcription.txt"
+            conf_file = "output_transcription_confidence.txt"
+
+        with open(text_file, 'w', encoding='utf-8') as f:
+            f.write(text_content)
+        with open(conf_file, 'w', encoding='utf-8') as f:
+            f.write(confidence_content)
+
+        # Record the transcription in the history store
+        self.update_transcription_history(text_content, segments, source=source, audio_seconds=audio_seconds)
+
+        # Return the combined transcription and confidence information for display
+        return f"{text_content}\n\n{confidence_content}"
+
     def _calculate_segment_confidence(self, segment):
         """Calculate confidence score for a segment based on word-level probabilities."""
         if 'words' in segment and segment['words']:
@@ -115,15 +286,28 @@ class AudioTranscriber:
         return 0.75  # Default confidence if no word-level data available
 
     def _format_time(self, seconds):
-        format_time(seconds)
+        return format_time(seconds)
 
-    def update_transcription_history(self, text):
-        """Appends the transcription to a history file."""
-        history_file = "history.txt"
+    def update_transcription_history(self, text, segments=None, source=None, audio_seconds=None):
+        """
+        Records the transcription, with its source, duration, model and confidence, in the history store
+        and adds its segments to the search index.
+        """
+        if not self.history:
+            return
+        rows = [{
+            'start': float(segment['start']),
+            'end': float(segment['end']),
+            'text': segment['text'],
+            'confidence': self._calculate_segment_confidence(segment),
+        } for segment in segments or []]
+        if audio_seconds is None and rows:
+            audio_seconds = rows[-1]['end']
+        confidence = sum(row['confidence'] for row in rows) / len(rows) if rows else None
         try:
-            with open(history_file, "a", encoding="utf-8") as f:
-                f.write(text + "\n")
-            logging.info(f"Transcription appended to {history_file}")
+            self.history.add(text, source=os.path.abspath(source) if source else None, model=model_tag("whisper"),
+                             audio_seconds=audio_seconds, segments=rows, confidence=confidence)
+            logging.info(f"Transcription recorded in {self.history.db_path}")
         except Exception as e:
             logging.error(f"Error updating transcription history: {e}")
 
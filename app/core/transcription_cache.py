@@ -0,0 +1,120 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from ..utils.helpers import write_json_atomic
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def _to_builtin(value):
+    """Convert numpy scalars/arrays left in a Whisper result into JSON-friendly values."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class TranscriptionCache:
+    """
+    Disk cache of Whisper results keyed by a hash of the decoded audio plus the model
+    name and decoding options. One JSON file per result; the file's mtime is refreshed
+    on every hit so eviction removes the least recently used results first.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None  # total bytes on disk, computed lazily
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(audio_data, **options):
+        """Hash the audio samples together with everything that affects the result."""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(audio_data.tobytes())
+        digest.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """Return the cached result for `key`, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            result = None
+
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        logging.info(f"Transcription cache {'hit' if result is not None else 'miss'} ({self.stats_line()})")
+        return result
+
+    def put(self, key, result):
+        path = self._path(key)
+        try:
+            result = json.loads(json.dumps(result, default=_to_builtin))
+            write_json_atomic(path, result)
+            with self._lock:
+                if self._size is not None:
+                    self._size += os.path.getsize(path)
+            self._evict()
+        except Exception as e:
+            logging.error(f"Error writing transcription cache entry: {e}")
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json") and not name.startswith(".tmp-"):
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+        return entries
+
+    def _evict(self):
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            if self._size <= self.max_bytes:
+                return
+            # Trim to 90% so eviction doesn't run again on the very next put
+            target = self.max_bytes * 0.9
+            removed = 0
+            for _, size, path in sorted(self._entries()):
+                if self._size <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._size -= size
+                removed += 1
+        logging.info(f"Transcription cache evicted {removed} least recently used result(s)")
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "bytes": self._size,
+        }
+
+    def stats_line(self):
+        stats = self.stats()
+        return f"hits={stats['hits']}, misses={stats['misses']}, hit rate {stats['hit_rate']:.0%}"
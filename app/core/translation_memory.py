@@ -0,0 +1,86 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class TranslationMemory:
+    """
+    Persistent exact-match translation memory in SQLite, keyed by
+    (source segment, source language, target language, model).
+    Entries are evicted least recently used first once there are more than `max_entries`.
+    """
+
+    def __init__(self, db_path, max_entries=100000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS memory (
+                    key TEXT PRIMARY KEY,
+                    segment TEXT NOT NULL,
+                    src_lang TEXT NOT NULL,
+                    tgt_lang TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL,
+                    last_used REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_memory_last_used ON memory(last_used);
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def key(segment, src_lang, tgt_lang, model):
+        return hashlib.sha256("\0".join([model, src_lang, tgt_lang, segment]).encode("utf-8")).hexdigest()
+
+    def lookup(self, segments, src_lang, tgt_lang, model):
+        """Return {index: translation} for the segments already in memory and mark them as used."""
+        keys = [self.key(segment, src_lang, tgt_lang, model) for segment in segments]
+        found = {}
+        with closing(self._connect()) as conn:
+            # Stay well under SQLite's limit on bound parameters
+            for start in range(0, len(keys), 500):
+                batch = list(set(keys[start:start + 500]))
+                placeholders = ",".join("?" * len(batch))
+                found.update(conn.execute(
+                    f"SELECT key, translation FROM memory WHERE key IN ({placeholders})", batch).fetchall())
+            if found:
+                conn.executemany("UPDATE memory SET hits = hits + 1, last_used = ? WHERE key = ?",
+                                 [(time.time(), key) for key in found])
+        return {index: found[key] for index, key in enumerate(keys) if key in found}
+
+    def store(self, entries, src_lang, tgt_lang, model):
+        """Add (segment, translation) pairs, then evict the least recently used entries if over capacity."""
+        now = time.time()
+        rows = [(self.key(segment, src_lang, tgt_lang, model), segment, src_lang, tgt_lang, model,
+                 translation, now, now) for segment, translation in entries]
+        if not rows:
+            return
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO memory (key, segment, src_lang, tgt_lang, model, translation, "
+                "created_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            excess = conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute("DELETE FROM memory WHERE key IN "
+                             "(SELECT key FROM memory ORDER BY last_used LIMIT ?)", (excess,))
+                logging.info(f"Translation memory: evicted {excess} least recently used entries")
+            conn.execute("COMMIT")
+
+    def count(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
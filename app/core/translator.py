@@ -0,0 +1,186 @@
+import logging
+import time
+
+from ..utils.config import get_settings
+from ..utils.helpers import split_sentences
+from .backends import model_tag
+from .model_registry import registry
+from .translation_memory import TranslationMemory
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+#  Dictionary of Supported Languages (Including Indian Languages)
+LANGUAGES = {
+    "English": "eng_Latn",
+    "French": "fra_Latn",
+    "Spanish": "spa_Latn",
+    "German": "deu_Latn",
+    "Italian": "ita_Latn",
+    "Russian": "rus_Cyrl",
+    "Chinese": "zho_Hans",
+    # Indian Languages
+    "Hindi": "hin_Deva",
+    "Bengali": "ben_Beng",
+    "Tamil": "tam_Taml",
+    "Telugu": "tel_Telu",
+    "Marathi": "mar_Deva",
+    "Gujarati": "guj_Gujr",
+    "Punjabi": "pan_Guru",
+    "Malayalam": "mal_Mlym",
+    "Kannada": "kan_Knda",
+    "Odia": "ory_Orya",
+    "Urdu": "urd_Arab",
+}
+
+
+class Translator:
+    def __init__(self):
+        self.last_stats = {}
+        settings = get_settings()['translation']
+        self.memory = TranslationMemory(settings['memory_path'], settings['memory_max_entries']) \
+            if settings['memory_enabled'] else None
+
+    @property
+    def nllb(self):
+        """The shared NLLB tokenizer/model pair, loaded on first use."""
+        try:
+            return registry.get("nllb")
+        except Exception as e:
+            logging.error(f"Failed to load NLLB model: {e}")
+            return None
+
+    def translate_text(self, text, src_lang, tgt_lang):
+        """
+        Translate `text` between two languages named as in LANGUAGES.
+        Long texts are split into sentences and translated in batches, so nothing
+        is truncated; line breaks of the original are kept.
+        """
+        self.last_stats = {}
+        try:
+            line_sentences = [split_sentences(line) for line in text.split("\n")]
+            sentences = [sentence for group in line_sentences for sentence in group]
+            translated = iter(self.translate_segments(sentences, src_lang, tgt_lang))
+            return "\n".join(" ".join(next(translated) for _ in group) for group in line_sentences)
+        except Exception as e:
+            logging.error(f"Translation failed: {e}")
+            return f"Translation failed: {e}"
+
+    def translate_segments(self, segments, src_lang, tgt_lang):
+        """
+        Translate a list of segments (sentences or transcript segments) and return the
+        translations in the same order. Segments found in the translation memory are reused;
+        the rest are sorted by length and generated in batches, with segments longer than
+        `chunk_tokens` split on word boundaries.
+        """
+        if not segments:
+            return []
+        settings = get_settings()['translation']
+        model_name = model_tag("nllb")
+
+        # Repeated segments are translated once per job, and not at all if already in memory
+        unique = list(dict.fromkeys(segments))
+        known = self.memory.lookup(unique, src_lang, tgt_lang, model_name) if self.memory else {}
+        done = {unique[index]: translation for index, translation in known.items()}
+        missing = [segment for segment in unique if segment not in done]
+
+        stats = {'segments': len(segments), 'chunks': 0, 'input_tokens': 0, 'output_tokens': 0,
+                 'seconds': 0.0, 'tokens_per_second': 0.0,
+                 'memory_hits': sum(1 for segment in segments if segment in done)}
+        if missing:
+            new = self._translate_missing(missing, src_lang, tgt_lang, settings, stats)
+            done.update(zip(missing, new))
+            if self.memory:
+                self.memory.store(zip(missing, new), src_lang, tgt_lang, model_name)
+
+        translations = [done[segment] for segment in segments]
+        stats['hit_rate'] = stats['memory_hits'] / len(segments)
+        self.last_stats = stats
+        logging.info(f"Translated {len(segments)} segment(s): {stats['memory_hits']} from translation memory "
+                     f"({stats['hit_rate']:.0%}), {len(missing)} new in {stats['chunks']} chunk(s), "
+                     f"{stats['input_tokens']} tokens in, {stats['output_tokens']} out in {stats['seconds']:.1f}s "
+                     f"({stats['tokens_per_second']:.1f} tokens/s)")
+        return translations
+
+    def _translate_missing(self, segments, src_lang, tgt_lang, settings, stats):
+        """Run NLLB on segments that are not in the translation memory and fill in `stats`."""
+        nllb = self.nllb
+        if nllb is None:
+            raise RuntimeError("Model not loaded.")
+        tokenizer = nllb["tokenizer"]
+
+        # Convert language names to model-specific codes
+        src_lang_code = LANGUAGES.get(src_lang, "eng_Latn")
+        tgt_lang_code = LANGUAGES.get(tgt_lang, "hin_Deva")  # Default to Hindi
+        logging.info(f"Translating from {src_lang} ({src_lang_code}) → {tgt_lang} ({tgt_lang_code})")
+
+        # Get `forced_bos_token_id` correctly
+        tgt_lang_id = tokenizer.convert_tokens_to_ids(tgt_lang_code)
+        if tgt_lang_id is None or tgt_lang_id == tokenizer.unk_token_id:
+            raise ValueError(f"Invalid target language {tgt_lang_code}.")
+
+        tokenizer.src_lang = src_lang_code
+        chunks = self._chunk(segments, tokenizer, settings['chunk_tokens'])
+        started = time.perf_counter()
+        # Leased, so the idle monitor cannot unload the model during a long translation
+        with registry.lease("nllb") as nllb:
+            outputs, input_tokens, output_tokens = self._generate([text for text, _ in chunks], nllb,
+                                                                  tgt_lang_id, settings)
+        elapsed = time.perf_counter() - started
+
+        # Pieces of a split segment are consecutive chunks, so appending keeps them in order
+        translations = [""] * len(segments)
+        for (_, index), output in zip(chunks, outputs):
+            translations[index] = f"{translations[index]} {output}".strip()
+
+        stats.update({
+            'chunks': len(chunks),
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'seconds': elapsed,
+            'tokens_per_second': output_tokens / elapsed if elapsed > 0 else 0.0,
+        })
+        return translations
+
+    @staticmethod
+    def _chunk(segments, tokenizer, chunk_tokens):
+        """
+        Return (text, segment index) chunks: one per segment, except that segments longer
+        than `chunk_tokens` are split on word boundaries into several chunks.
+        """
+        lengths = [len(ids) for ids in tokenizer(segments, add_special_tokens=False)["input_ids"]]
+        chunks = []
+        for index, (segment, length) in enumerate(zip(segments, lengths)):
+            if length > chunk_tokens:
+                words = segment.split()
+                pieces = max(1, -(-length // chunk_tokens))
+                size = max(1, -(-len(words) // pieces))
+                for start in range(0, len(words), size):
+                    chunks.append((" ".join(words[start:start + size]), index))
+            else:
+                chunks.append((segment, index))
+        return chunks
+
+    @staticmethod
+    def _generate(texts, nllb, tgt_lang_id, settings):
+        """Run generate over length-sorted batches and return outputs in input order plus token counts."""
+        import torch
+        tokenizer, model, device = nllb["tokenizer"], nllb["model"], nllb["device"]
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        outputs = [None] * len(texts)
+        input_tokens = output_tokens = 0
+        batch_size = settings['batch_size']
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = tokenizer([texts[i] for i in batch], return_tensors="pt", padding=True).to(device)
+            longest = int(inputs["attention_mask"].sum(dim=1).max())
+            input_tokens += int(inputs["attention_mask"].sum())
+            with torch.no_grad():
+                generated = model.generate(**inputs, forced_bos_token_id=tgt_lang_id,
+                                           num_beams=settings['num_beams'],
+                                           max_new_tokens=min(settings['max_new_tokens'], 2 * longest + 10))
+            output_tokens += int((generated != tokenizer.pad_token_id).sum())
+            for i, text in zip(batch, tokenizer.batch_decode(generated, skip_special_tokens=True)):
+                outputs[i] = text
+        return outputs, input_tokens, output_tokens
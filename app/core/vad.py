@@ -0,0 +1,134 @@
+import bisect
+import logging
+
+import numpy as np
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class EnergyVAD:
+    """
+    Energy-based voice activity detection for 16 kHz mono float32 audio.
+
+    Frames louder than an adaptive threshold (a margin above the recording's own noise
+    floor) count as speech. Short pauses inside speech are bridged, very short blips are
+    dropped, and every region is padded so word onsets and endings are not clipped.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=30, margin_db=12.0, min_threshold_db=-60.0,
+                 min_speech_ms=250, min_silence_ms=600, padding_ms=200):
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.min_threshold_db = min_threshold_db
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.min_silence_frames = max(1, min_silence_ms // frame_ms)
+        self.padding = int(sample_rate * padding_ms / 1000)
+
+    def options(self):
+        """The settings that affect detection, for use in cache keys."""
+        return {
+            'frame_length': self.frame_length,
+            'margin_db': self.margin_db,
+            'min_threshold_db': self.min_threshold_db,
+            'min_speech_frames': self.min_speech_frames,
+            'min_silence_frames': self.min_silence_frames,
+            'padding': self.padding,
+        }
+
+    def frame_levels(self, audio):
+        """RMS level of each full frame in dBFS."""
+        count = len(audio) // self.frame_length
+        if count == 0:
+            return np.zeros(0, dtype=np.float32)
+        frames = audio[:count * self.frame_length].reshape(count, self.frame_length)
+        rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+        return 20 * np.log10(np.maximum(rms, 1e-5))
+
+    def threshold(self, levels):
+        # Quiet frames approximate the noise floor; the cap keeps a recording that is
+        # speech from end to end from having its quieter words classed as silence
+        noise_floor = np.percentile(levels, 10)
+        loud = np.percentile(levels, 95)
+        return float(max(min(noise_floor + self.margin_db, loud - 15.0), self.min_threshold_db))
+
+    def detect(self, audio):
+        """Return speech regions as a list of (start, end) sample indices."""
+        levels = self.frame_levels(audio)
+        if len(levels) == 0:
+            return []
+        voiced = levels > self.threshold(levels)
+
+        # Runs of voiced frames as [start, end) frame indices
+        edges = np.diff(np.concatenate([[0], voiced.astype(np.int8), [0]]))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        runs = []
+        for start, end in zip(starts, ends):
+            if runs and start - runs[-1][1] < self.min_silence_frames:
+                runs[-1][1] = end
+            else:
+                runs.append([start, end])
+
+        regions = []
+        for start, end in runs:
+            if end - start < self.min_speech_frames:
+                continue
+            start = max(0, start * self.frame_length - self.padding)
+            end = min(len(audio), end * self.frame_length + self.padding)
+            if regions and start <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], end)
+            else:
+                regions.append((start, end))
+        return regions
+
+
+class SpeechMap:
+    """
+    Concatenation of the speech regions of a recording, with the offset table needed to
+    map timestamps in the concatenated audio back to the original timeline.
+    """
+
+    def __init__(self, audio, regions, sample_rate=16000):
+        self.sample_rate = sample_rate
+        self.total_seconds = len(audio) / sample_rate
+        self.audio = np.concatenate([audio[start:end] for start, end in regions]) if regions \
+            else np.zeros(0, dtype=audio.dtype)
+        # (start in concatenated audio, start in original audio), both in seconds
+        self.offsets = []
+        position = 0
+        for start, end in regions:
+            self.offsets.append((position / sample_rate, start / sample_rate))
+            position += end - start
+        self._starts = [concatenated for concatenated, _ in self.offsets]
+
+    @property
+    def speech_seconds(self):
+        return len(self.audio) / self.sample_rate
+
+    @property
+    def skipped_fraction(self):
+        return 1 - self.speech_seconds / self.total_seconds if self.total_seconds else 0.0
+
+    def to_original(self, seconds, is_end=False):
+        """Map a time in the concatenated audio to the original recording."""
+        if not self.offsets:
+            return seconds
+        # An end time that falls exactly on a region boundary belongs to the earlier region
+        find = bisect.bisect_left if is_end else bisect.bisect_right
+        index = max(find(self._starts, seconds) - 1, 0)
+        concatenated, original = self.offsets[index]
+        return original + seconds - concatenated
+
+    def remap(self, result):
+        """Rewrite segment and word timestamps of a Whisper result in place and return it."""
+        for segment in result.get('segments', []):
+            segment['start'] = self.to_original(segment['start'])
+            segment['end'] = self.to_original(segment['end'], is_end=True)
+            for word in segment.get('words', []):
+                word['start'] = self.to_original(word['start'])
+                word['end'] = self.to_original(word['end'], is_end=True)
+        return result
@@ -1,13 +1,82 @@
+import collections
 import logging
 import tkinter as tk
+from app.utils.config import get_settings
 class TextBoxLogHandler(logging.Handler):
-    def __init__(self, text_widget):
-        super().__init__()
+    """
+    Shows log records in a Tk text widget without touching Tk from the logging thread.
+
+    emit() only formats the record and appends it to a bounded buffer, so recorder and
+    worker threads never wait on the GUI. The Tk main loop drains the buffer every
+    `drain_ms` with one insert per batch, and the widget keeps at most `max_lines` lines.
+    Per-module levels (see log_settings['module_levels']) filter records before they are formatted.
+    """
+
+    def __init__(self, text_widget, max_lines=None, drain_ms=None, drain_batch=None, level=None, module_levels=None):
+        settings = get_settings()['logging']
+        super().__init__(level=level or settings['box_level'])
         self.text_widget = text_widget
+        self.max_lines = max_lines or settings['max_lines']
+        self.drain_ms = drain_ms or settings['drain_ms']
+        self.drain_batch = drain_batch or settings['drain_batch']
+        self.module_levels = {}
+        for name, module_level in (module_levels or settings['module_levels']).items():
+            self.set_module_level(name, module_level)
+        # Lines older than what the widget can hold are dropped here instead of inserted and trimmed
+        self.pending = collections.deque(maxlen=self.max_lines)
+        self.dropped = 0
+        self._after_id = None
+
+    def set_module_level(self, name, level):
+        """Show records from logger or module `name` (and its children) only at `level` and above."""
+        self.module_levels[name] = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+
+    def filter(self, record):
+        # Most core modules log through the root logger, so fall back to the module name
+        name = record.name if record.name != "root" else record.module
+        while name:
+            if name in self.module_levels:
+                if record.levelno < self.module_levels[name]:
+                    return False
+                break
+            name = name.rpartition(".")[0]
+        return super().filter(record)
 
     def emit(self, record):
-        msg = self.format(record)
-        self.text_widget.config(state=tk.NORMAL)
-        self.text_widget.insert(tk.END, msg + '\n')
-        self.text_widget.config(state=tk.DISABLED)
-        self.text_widget.see(tk.END)
\ No newline at end of file
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        self.pending.append(msg)
+
+    def start(self, root):
+        """Start draining queued records into the widget on `root`'s main loop."""
+        self.root = root
+        self._after_id = root.after(self.drain_ms, self._drain)
+
+    def _drain(self):
+        lines = []
+        if self.dropped:
+            lines.append(f"... {self.dropped} older log line(s) not shown")
+            self.dropped = 0
+        while self.pending and len(lines) < self.drain_batch:
+            lines.append(self.pending.popleft())
+        if lines:
+            widget = self.text_widget
+            widget.config(state=tk.NORMAL)
+            widget.insert(tk.END, "\n".join(lines) + "\n")
+            excess = int(widget.index("end-1c").split(".")[0]) - 1 - self.max_lines
+            if excess > 0:
+                widget.delete("1.0", f"{excess + 1}.0")
+            widget.config(state=tk.DISABLED)
+            widget.see(tk.END)
+        self._after_id = self.root.after(self.drain_ms, self._drain)
+
+    def close(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        super().close()
@@ -1,86 +1,156 @@
-import pyaudio
+import logging
+import time
 import numpy as np
 import matplotlib
 matplotlib.use("TkAgg")
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-import threading
+from app.utils.config import get_settings
 
 class WaveformVisualizer:
-    def __init__(self, frame):
+    """
+    Draws the last few seconds of the recording as a min/max envelope.
+
+    Rendering runs on the Tk main loop at a fixed frame rate: each frame reads the
+    recorder's ring buffer, decimates it to one min/max pair per column and blits only
+    the waveform over a cached background, so the audio threads never touch Tk.
+    """
+
+    def __init__(self, frame, fps=None, window_seconds=None, columns=400):
+        settings = get_settings()['audio']
         self.parent = frame
         self.is_recording = False
+        self.fps = fps or settings['visualizer_fps']
+        self.window_seconds = window_seconds or settings['visualizer_seconds']
+        self.columns = columns
         # Create matplotlib figure
         self.fig = Figure(figsize=(4, 4), dpi=100, facecolor='#2b2b2b')
         self.ax = self.fig.add_subplot(111)
         self.ax.set_facecolor('#2b2b2b')
         self.ax.tick_params(axis='x', colors='white')
         self.ax.tick_params(axis='y', colors='white')
-        
-        # Set up the line plot with matching dimensions
-        self.chunk_size = 1024
-        self.x = np.arange(0, self.chunk_size)
-        self.line, = self.ax.plot(self.x, np.zeros(self.chunk_size), color='#4caf50')
-        
+
+        # One vertical stroke per column, from that column's minimum to its maximum
+        self.x = np.repeat(np.arange(self.columns), 2)
+        self.line, = self.ax.plot(self.x, np.zeros(2 * self.columns), color='#4caf50', animated=True)
+        self.level_text = self.ax.text(0.02, 0.95, "", transform=self.ax.transAxes, va='top',
+                                       color='white', animated=True)
+
         # Configure plot appearance
         self.ax.set_ylim(-32768, 32767)
-        self.ax.set_xlim(0, self.chunk_size)
+        self.ax.set_xlim(0, self.columns)
         self.ax.grid(True, color='#444444')
-        
+
         # Create canvas
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.parent)
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.configure(bg='#2b2b2b', highlightthickness=0)
         self.canvas_widget.pack(fill='both', expand=True, padx=10, pady=5)
-        
-        # Audio stream configuration
-        self.format = pyaudio.paInt16
-        self.channels = 1
-        self.rate = 44100
-        self.p = None
-        self.stream = None
-
-    def start_recording(self):
+        self.background = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+        self.recorder = None
+        self._after_id = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.frames = 0
+        self.dropped_frames = 0
+        self.frame_time_total = 0.0
+        self.frame_time_max = 0.0
+        self._last_frame = None
+
+    def _on_draw(self, event):
+        # A full redraw (resize, theme change) invalidates the cached background
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        self.ax.draw_artist(self.line)
+        self.ax.draw_artist(self.level_text)
+
+    def start_recording(self, recorder):
+        self.recorder = recorder
         self.is_recording = True
-        threading.Thread(target=self._record_stream, daemon=True).start()
+        self._reset_stats()
+        self._schedule()
 
     def stop_recording(self):
         self.is_recording = False
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-        if self.p:
-            self.p.terminate()
-
-    def _record_stream(self):
-        self.p = pyaudio.PyAudio()
-        self.stream = self.p.open(
-            format=self.format,
-            channels=self.channels,
-            rate=self.rate,
-            input=True,
-            frames_per_buffer=self.chunk_size
-        )
-
-        while self.is_recording:
-            try:
-                data = self.stream.read(self.chunk_size)
-                audio_data = np.frombuffer(data, dtype=np.int16)
-                self.line.set_ydata(audio_data)
-                self.canvas.draw_idle()
-            except Exception as e:
-                print(f"Error reading audio stream: {e}")
-                break
-
-        self.stop_recording()
+        if self._after_id:
+            self.parent.after_cancel(self._after_id)
+            self._after_id = None
+        stats = self.stats()
+        logging.info(f"Waveform: {stats['frames']} frames, {stats['frame_ms_avg']:.1f} ms average "
+                     f"({stats['frame_ms_max']:.1f} ms max), {stats['dropped_frames']} dropped")
+
+    def _schedule(self):
+        self._after_id = self.parent.after(int(1000 / self.fps), self._render_frame)
+
+    def _render_frame(self):
+        if not self.is_recording:
+            return
+        start = time.perf_counter()
+        interval = 1.0 / self.fps
+        if self._last_frame is not None:
+            # Frames the main loop was too busy to render
+            late = start - self._last_frame
+            self.dropped_frames += max(int(late / interval) - 1, 0)
+        self._last_frame = start
+
+        try:
+            samples = self.recorder.recent_audio(self.window_seconds)
+            self.line.set_ydata(self._envelope(samples, int(self.window_seconds * self.recorder.device_rate)))
+            level_meter = self.recorder.level_meter
+            if level_meter:
+                self.level_text.set_text(f"{level_meter.rms_db:.0f} dBFS")
+            if self.background is None:
+                self.canvas.draw()
+            else:
+                self.canvas.restore_region(self.background)
+                self._draw_animated()
+                self.canvas.blit(self.fig.bbox)
+        except Exception as e:
+            logging.error(f"Error rendering waveform: {e}")
+
+        elapsed = time.perf_counter() - start
+        self.frames += 1
+        self.frame_time_total += elapsed
+        self.frame_time_max = max(self.frame_time_max, elapsed)
+        self._schedule()
+
+    def _envelope(self, samples, window_length):
+        """Min/max of each column over the last `window_length` samples, right-aligned."""
+        envelope = np.zeros(2 * self.columns)
+        if len(samples) == 0:
+            return envelope
+        per_column = max(window_length // self.columns, 1)
+        usable = min(len(samples) // per_column, self.columns) * per_column
+        if usable == 0:
+            return envelope
+        blocks = samples[len(samples) - usable:].reshape(-1, per_column)
+        pairs = np.column_stack([blocks.min(axis=1), blocks.max(axis=1)]).ravel()
+        envelope[len(envelope) - len(pairs):] = pairs
+        return envelope
+
+    def stats(self):
+        """Rendering performance since recording started."""
+        return {
+            'frames': self.frames,
+            'dropped_frames': self.dropped_frames,
+            'frame_ms_avg': 1000 * self.frame_time_total / self.frames if self.frames else 0.0,
+            'frame_ms_max': 1000 * self.frame_time_max,
+        }
+
     def update_theme(self, theme):
         self.fig.set_facecolor(theme['plot_bg'])
         self.ax.set_facecolor(theme['plot_bg'])
         self.line.set_color(theme['waveform_color'])
+        self.level_text.set_color(theme['axis_color'])
         self.ax.tick_params(axis='x', colors=theme['axis_color'])
         self.ax.tick_params(axis='y', colors=theme['axis_color'])
         self.ax.grid(True, color=theme['grid_color'])
         self.ax.xaxis.label.set_color(theme['axis_color'])
         self.ax.yaxis.label.set_color(theme['axis_color'])
         self.ax.title.set_color(theme['axis_color'])
-        self.canvas.draw()
\ No newline at end of file
+        self.canvas.draw()
@@ -1,47 +1,58 @@
 import os
 import logging
+import threading
 import tkinter as tk
 from tkinter import simpledialog
 def analyze_emotions(Analysis,event=None):
-    if not Analysis['recorder'].filepath or not os.path.exists(Analysis['recorder'].filepath):
+    filepath = Analysis['recorder'].filepath
+    if not filepath or not os.path.exists(filepath):
         logging.warning("No audio file available for emotion analysis.")
         Analysis['transcription_box'].insert(tk.END, "\nNo audio file available for emotion analysis.")
         return
     
-    try:
-        # Get the current transcription text (excluding confidence scores and formatting)
-        current_text = Analysis['transcription_box'].get("1.0", tk.END).strip()
-        
-        # Extract just the transcribed text, removing confidence scores and formatting
-        clean_text = ""
-        for line in current_text.split('\n'):
-            if not any(x in line for x in ['confidence', '===', '---', 'TRANSCRIPTION']):
-                if not line.startswith('[') and not line.strip() == "":
-                    clean_text += line.strip() + " "
-        
-        if not clean_text:
-            logging.warning("No transcription available for emotion analysis.")
-            return
+    # Get the current transcription text (excluding confidence scores and formatting)
+    current_text = Analysis['transcription_box'].get("1.0", tk.END).strip()
+    
+    # Extract just the transcribed text, removing confidence scores and formatting
+    clean_text = ""
+    for line in current_text.split('\n'):
+        if not any(x in line for x in ['confidence', '===', '---', 'TRANSCRIPTION']):
+            if not line.startswith('[') and not line.strip() == "":
+                clean_text += line.strip() + " "
+    
+    if not clean_text:
+        logging.warning("No transcription available for emotion analysis.")
+        return
+    
+    # Per-segment analysis only while the box still shows the transcriber's last transcript
+    segments = timed_segments(Analysis, current_text)
+    box = Analysis['transcription_box']
+    
+    # Model inference and audio feature extraction take a while; keep the Tk loop responsive
+    def run():
+        try:
+            emotion_analysis = Analysis['emotion_analyzer'].analyze(clean_text, filepath, segments)
             
-        # Perform emotion analysis
-        emotion_analysis = Analysis['emotion_analyzer'].analyze(clean_text, Analysis['recorder'].filepath)
-        
-        # Save emotion analysis
-        if Analysis['save_directory']:
-            emotion_path = os.path.join(Analysis['save_directory'], "emotion_analysis.txt")
-        else:
-            emotion_path = "emotion_analysis.txt"
+            # Save emotion analysis
+            if Analysis['save_directory']:
+                emotion_path = os.path.join(Analysis['save_directory'], "emotion_analysis.txt")
+            else:
+                emotion_path = "emotion_analysis.txt"
+                
+            with open(emotion_path, "w", encoding="utf-8") as f:
+                f.write(f"Emotion Analysis:\n{emotion_analysis}")
             
-        with open(emotion_path, "w", encoding="utf-8") as f:
-            f.write(f"Emotion Analysis:\n{emotion_analysis}")
-        
-        # Display in UI
-        Analysis['transcription_box'].insert(tk.END, "\n\nEmotion Analysis:\n" + emotion_analysis)
-        logging.info(f"Emotion analysis completed and saved to {emotion_path}")
-        
-    except Exception as e:
-        logging.error(f"Error during emotion analysis: {e}")
-        Analysis['transcription_box'].insert(tk.END, f"\nError during emotion analysis: {e}")
+            # Display in UI
+            Analysis['root'].after(0, lambda: box.insert(tk.END, "\n\nEmotion Analysis:\n" + emotion_analysis))
+            logging.info(f"Emotion analysis completed and saved to {emotion_path}")
+            
+        except Exception as e:
+            logging.error(f"Error during emotion analysis: {e}")
+            message = f"\nError during emotion analysis: {e}"
+            Analysis['root'].after(0, lambda: box.insert(tk.END, message))
+    
+    logging.info("Analyzing emotions...")
+    threading.Thread(target=run, daemon=True).start()
         
 def analyze_text_content(Analysis,event=None):
     """Analyze the transcribed text for key topics and entities."""    
@@ -110,61 +121,76 @@ def set_api_key(Analysis,event=None):
         else:
             logging.error("Failed to initialize with provided API key")
 
+def show_text_window(Analysis, title, text):
+    """Show `text` read-only in a new window."""
+    window = tk.Toplevel(Analysis['root'])
+    window.title(title)
+    window.geometry("600x400")
+    
+    text_widget = tk.Text(window, wrap=tk.WORD, height=15, width=60)
+    text_widget.pack(padx=10, pady=10, expand=True, fill='both')
+    text_widget.insert("1.0", text)
+    text_widget.config(state=tk.DISABLED)
+
+def timed_segments(Analysis, text):
+    """The transcriber's segments carry timings; use them while the box still shows that transcript."""
+    rows = Analysis['transcriber'].segments_with_confidence
+    return rows if rows and text.startswith(" ".join(row['text'] for row in rows)) else None
+
 def summarize_text(Analysis,event=None):
     if not Analysis['text_processor'].model:
         logging.error("Please set Gemini API key first")
         return
         
-    try:
-        # Get text from transcription text widget
-        text = Analysis['transcription_box'].get("1.0", tk.END).strip()
-        if not text:
-            logging.error("No text to summarize")
-            return
-            
-        summary = Analysis['text_processor'].summarize_text(text)
-        
-        # Show summary in a new window
-        summary_window = tk.Toplevel(Analysis['root'])
-        summary_window.title("Summary")
-        summary_window.geometry("600x400")
-        
-        summary_text = tk.Text(summary_window, wrap=tk.WORD, height=15, width=60)
-        summary_text.pack(padx=10, pady=10, expand=True, fill='both')
-        summary_text.insert("1.0", summary)
-        summary_text.config(state=tk.DISABLED)
-        
-    except Exception as e:
-        logging.error(f"Error generating summary: {e}")
+    # Get text from transcription text widget
+    text = Analysis['transcription_box'].get("1.0", tk.END).strip()
+    if not text:
+        logging.error("No text to summarize")
+        return
+    segments = timed_segments(Analysis, text)
+    
+    # Model calls can take a while; keep the Tk loop responsive and show the result from it
+    def run():
+        try:
+            summary = Analysis['text_processor'].summarize_text(text, segments)
+            stats = Analysis['text_processor'].last_summary_stats
+            if stats.get('chunks'):
+                summary += (f"\n\n({stats['chunks']} part(s), {stats['llm_calls']} model call(s), "
+                            f"{stats['cached_calls']} cached, {stats['input_tokens']} input / "
+                            f"{stats['output_tokens']} output tokens, {stats['seconds']:.1f}s)")
+            Analysis['root'].after(0, lambda: show_text_window(Analysis, "Summary", summary))
+        except Exception as e:
+            logging.error(f"Error generating summary: {e}")
+    
+    logging.info("Generating summary...")
+    threading.Thread(target=run, daemon=True).start()
 
 def query_text(Analysis,event=None):
     if not Analysis['text_processor'].model:
         logging.error("Please set Gemini API key first")
         return
         
-    try:
-        # Get text from transcription text widget
-        text = Analysis['transcription_box'].get("1.0", tk.END).strip()
-        if not text:
-            logging.error("No text to query")
-            return
-            
-        # Get query from user
-        query = simpledialog.askstring("Query", "Enter your question about the text:")
-        if not query:
-            return
-            
-        answer = Analysis['text_processor'].query_text(text, query)
-        
-        # Show answer in a new window
-        answer_window = tk.Toplevel(Analysis['root'])
-        answer_window.title("Answer")
-        answer_window.geometry("600x400")
-        
-        answer_text = tk.Text(answer_window, wrap=tk.WORD, height=15, width=60)
-        answer_text.pack(padx=10, pady=10, expand=True, fill='both')
-        answer_text.insert("1.0", answer)
-        answer_text.config(state=tk.DISABLED)
+    # Get text from transcription text widget
+    text = Analysis['transcription_box'].get("1.0", tk.END).strip()
+    if not text:
+        logging.error("No text to query")
+        return
         
-    except Exception as e:
-        logging.error(f"Error processing query: {e}")
\ No newline at end of file
+    # Get query from user
+    query = simpledialog.askstring("Query", "Enter your question about the text:")
+    if not query:
+        return
+    segments = timed_segments(Analysis, text)
+    
+    def run():
+        try:
+            answer = Analysis['text_processor'].query_text(text, query, segments)
+            stats = Analysis['text_processor'].last_query_stats
+            if stats.get('excerpts'):
+                answer += (f"\n\nSources: {', '.join(stats['excerpts'])} "
+                           f"({stats['context_tokens']} of {stats['transcript_tokens']} transcript tokens sent)")
+            Analysis['root'].after(0, lambda: show_text_window(Analysis, "Answer", answer))
+        except Exception as e:
+            logging.error(f"Error processing query: {e}")
+    
+    threading.Thread(target=run, daemon=True).start()
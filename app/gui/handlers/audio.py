@@ -4,6 +4,7 @@ from tkinter import simpledialog
 from tkinter import Toplevel, ttk
 import threading
 import time
+from app.core.streaming import StreamingTranscriber
 def start_recording(Recording,event=None):
     if not Recording['save_directory']:
         logging.warning("Save directory is not set. Please select a directory first.")
@@ -12,7 +13,7 @@ def start_recording(Recording,event=None):
     Recording['recorder'].set_save_directory(Recording['save_directory'])
     try:
         Recording['recorder'].start_recording()
-        Recording['visualizer'].start_recording()
+        Recording['visualizer'].start_recording(Recording['recorder'])
         Recording['start_button'].config(state=tk.DISABLED)
         Recording['stop_button'].config(state=tk.NORMAL)
         Recording['transcribe_button'].config(state=tk.DISABLED)
@@ -23,6 +24,8 @@ def start_recording(Recording,event=None):
         # threading.Thread(target = plot_waveform).start()
 
         Recording['transcription_box'].delete(1.0, tk.END)  # Clear previous transcription
+        if Recording['streaming_var'].get():
+            start_streaming(Recording)
         logging.info("Start recording button clicked")
     except RuntimeError as e:
         logging.error(e)
@@ -37,8 +40,53 @@ def stop_recording(Recording,event=None):
     Recording['stop_button'].config(state=tk.DISABLED)
     Recording['transcribe_button'].config(state=tk.NORMAL)
     Recording['rename_audio_button'].config(state=tk.NORMAL)
+    if Recording.get('stream'):
+        finish_streaming(Recording)
     logging.info("Stop recording button clicked")
 
+def start_streaming(Recording):
+    """Transcribe in fixed windows while recording, showing segments as they are finalized."""
+    root = Recording['root']
+    box = Recording['transcription_box']
+
+    def show_segment(segment):
+        # Called from the transcription thread; hand the update to the Tk main loop
+        root.after(0, lambda: (box.insert(tk.END, segment['text'].strip() + " "), box.see(tk.END)))
+
+    # Whisper can take a while per window; buffer generously so no audio is dropped
+    subscription = Recording['recorder'].subscribe("live-transcription", max_seconds=300)
+    stream = StreamingTranscriber(Recording['transcriber'], subscription,
+                                  input_rate=Recording['recorder'].speech_rate, on_segment=show_segment)
+    stream.start()
+    Recording['stream'] = stream
+
+def finish_streaming(Recording):
+    """Transcribe the tail of the recording and replace the live text with the final transcript."""
+    stream = Recording.pop('stream')
+    root = Recording['root']
+    box = Recording['transcription_box']
+    # Recorded like file transcriptions in the history: source file and duration
+    source = Recording['recorder'].filepath
+    audio_seconds = Recording['recorder'].recording_duration
+
+    def show_transcription(transcription):
+        box.delete(1.0, tk.END)
+        box.insert(tk.END, transcription)
+
+    def run():
+        try:
+            segments = stream.finish()
+            if segments:
+                transcription = Recording['transcriber'].save_segments(segments, Recording['save_directory'],
+                                                                      source=source, audio_seconds=audio_seconds)
+            else:
+                transcription = "Error: No speech detected in the recording.\n"
+        except Exception as e:
+            transcription = f"Error: {e}\n"
+        root.after(0, lambda: show_transcription(transcription))
+
+    threading.Thread(target=run, daemon=True).start()
+
 def transcribe_with_progress(Recording,event=None):
     """
     Automatically displays a progress tracking window during transcription.
@@ -82,7 +130,13 @@ def transcribe_with_progress(Recording,event=None):
 
             # Phase 2: Transcribing audio
             update_status("Transcribing...", 50)
-            transcription = Recording['transcriber'].transcribe_audio(Recording['recorder'].filepath, Recording['save_directory'])
+            # A fresh take is already in memory at 16 kHz; only fall back to the file when it isn't
+            speech_audio = Recording['recorder'].speech_audio()
+            if speech_audio is not None:
+                transcription = Recording['transcriber'].transcribe_samples(speech_audio, Recording['save_directory'],
+                                                                          source=Recording['recorder'].filepath)
+            else:
+                transcription = Recording['transcriber'].transcribe_audio(Recording['recorder'].filepath, Recording['save_directory'])
 
             # Phase 3: Saving transcription
             update_status("Saving transcription...", 80)
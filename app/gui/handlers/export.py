@@ -1,6 +1,5 @@
-import csv
-import json
 from tkinter import filedialog, messagebox
+from app.utils.helpers import export_segments
 def export_transcription(transcriber):
     """
     Exports the current transcription segments (from transcriber.segments_with_confidence)
@@ -26,21 +25,8 @@ def export_transcription(transcriber):
         return  # User cancelled
 
     try:
-        data = transcriber.segments_with_confidence  # List of dictionaries with transcription details
-        if export_format == "json":
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4)
-        else:
-            with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
-                fieldnames = ["timestamp", "text", "confidence"]
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                for segment in data:
-                    writer.writerow({
-                        "timestamp": segment.get("timestamp", ""),
-                        "text": segment.get("text", ""),
-                        "confidence": segment.get("confidence", "")
-                    })
+        # List of dictionaries with transcription details
+        export_segments(transcriber.segments_with_confidence, file_path, export_format)
         messagebox.showinfo("Export Success", f"Transcription exported successfully to {file_path}")
     except Exception as e:
         messagebox.showerror("Export Error", f"Failed to export transcription: {e}")
\ No newline at end of file
@@ -4,8 +4,9 @@ import tkinter as tk
 import os
 from tkinter import messagebox
 import threading
-import time
+import json
 from tkinter import Toplevel, ttk
+from app.core.batch import BatchTranscriptionEngine
 def browse_directory(Files,event=None):
     directory = filedialog.askdirectory(title="Select Directory")
     if directory:
@@ -40,8 +41,9 @@ def browse_multiple_files(Files):
 
 def process_batch_transcription(Files,filepaths):
     """
-    Processes multiple audio files and appends transcriptions to a single file (batch_transcription.txt)
-    while showing a progress bar with detailed status messages.
+    Processes multiple audio files in parallel worker processes and appends transcriptions to a
+    single file (batch_transcription.txt) while showing a progress bar with throughput.
+    Files finished in an earlier, interrupted run are not transcribed again.
     """
     batch_file = os.path.join(Files['save_directory'], "batch_transcription.txt")
     Files['transcription_box'].delete(1.0, tk.END)
@@ -69,28 +71,42 @@ def process_batch_transcription(Files,filepaths):
         Files['root'].update_idletasks()
 
     total_files = len(filepaths)
-    progress_increment = 100 / (total_files + 1) if total_files > 0 else 100
+
+    def on_progress(progress):
+        # Called from the batch thread; hand the update to the Tk main loop
+        finished = progress['done'] + progress['failed']
+        message = (f"Transcribed {finished}/{total_files} "
+                   f"({progress['files_per_minute']:.1f} files/min, "
+                   f"{progress['audio_seconds_per_second']:.1f} audio-s/s)")
+        Files['root'].after(0, lambda: update_status(message, 100 * finished / max(total_files, 1)))
 
     def run_batch():
         try:
+            engine = BatchTranscriptionEngine(Files['save_directory'], progress_callback=on_progress)
+            summary = engine.run(filepaths)
+            lines = []
             with open(batch_file, "a", encoding="utf-8") as f:
-                for i, filepath in enumerate(filepaths, start=1):
-                    base_name = os.path.basename(filepath)
-                    update_status(f"Processing {base_name} ({i}/{total_files})...", progress_increment * i)
-                    transcription = Files['transcriber'].transcribe_audio(filepath, Files['save_directory'])
-                    if transcription.startswith("Error:"):
-                        Files['transcription_box'].insert(tk.END, f"Skipped {base_name} (Error)\n")
+                for path, status, result_path, error in summary['results']:
+                    base_name = os.path.basename(path)
+                    if status != "done":
+                        lines.append(f"Skipped {base_name} (Error: {error})\n")
                         continue
+                    with open(result_path, "r", encoding="utf-8") as rf:
+                        record = json.load(rf)
+                    text_content, confidence_content = Files['transcriber'].format_segments(record['segments'])
                     f.write(f"---- Transcription: {base_name} ----\n")
-                    f.write(transcription + "\n\n")
-                    Files['transcription_box'].insert(tk.END, f"Processed {base_name}\n")
-                    Files['root'].update_idletasks()
-                    # (Optional: add a small delay for smoother UI updates)
-                    time.sleep(0.2)
-            Files['transcription_box'].insert(tk.END, f"\nBatch transcription saved to: {batch_file}\n")
+                    f.write(f"{text_content}\n\n{confidence_content}\n\n")
+                    lines.append(f"Processed {base_name}\n")
+            lines.append(f"\nBatch transcription saved to: {batch_file}\n"
+                         f"{summary['files_per_minute']:.1f} files/min, "
+                         f"{summary['audio_seconds_per_second']:.1f} audio-seconds per second\n")
+            Files['root'].after(0, lambda: Files['transcription_box'].insert(tk.END, "".join(lines)))
         except Exception as e:
-            messagebox.showerror("Error", f"Batch transcription failed: {e}")
+            logging.error(f"Batch transcription failed: {e}")
+            # `e` is unbound once the except block ends, before the callback runs
+            message = f"Batch transcription failed: {e}"
+            Files['root'].after(0, lambda: messagebox.showerror("Error", message))
         finally:
-            progress_win.destroy()
+            Files['root'].after(0, progress_win.destroy)
 
-    threading.Thread(target=run_batch).start()
\ No newline at end of file
+    threading.Thread(target=run_batch, daemon=True).start()
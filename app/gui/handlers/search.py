@@ -0,0 +1,75 @@
+import datetime
+import logging
+import os
+import tkinter as tk
+from tkinter import Toplevel, ttk, messagebox
+from app.core.history_store import HistoryStore
+from app.utils.config import get_settings
+from app.utils.helpers import format_time
+def open_search_window(Files, event=None):
+    """Search every past transcription for a phrase; hits show the file, timestamp and confidence."""
+    try:
+        store = HistoryStore(get_settings()['history']['path'])
+    except Exception as e:
+        messagebox.showerror("Error", f"Could not open the transcription history: {e}")
+        return
+
+    search_win = Toplevel(Files['root'])
+    search_win.title("Search Transcriptions")
+    search_win.geometry("900x500")
+    search_win.configure(bg=Files['root'].cget("bg"))
+
+    query_frame = tk.Frame(search_win, bg=Files['root'].cget("bg"))
+    query_frame.pack(fill=tk.X, padx=10, pady=10)
+    query_var = tk.StringVar(search_win)
+    query_entry = tk.Entry(query_frame, textvariable=query_var, font=("Helvetica", 12))
+    query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+    status_label = tk.Label(search_win, text="Type words to find and press Enter.", anchor="w",
+                            bg=Files['root'].cget("bg"), fg="white")
+
+    columns = ("file", "time", "confidence", "text")
+    results = ttk.Treeview(search_win, columns=columns, show="headings")
+    for column, width in zip(columns, (160, 90, 90, 520)):
+        results.heading(column, text=column.capitalize())
+        results.column(column, width=width, stretch=column == "text")
+    hits = {}
+
+    def run_search(event=None):
+        query = query_var.get().strip()
+        results.delete(*results.get_children())
+        hits.clear()
+        if not query:
+            return
+        try:
+            found = store.search(query, limit=get_settings()['history']['search_limit'])
+        except Exception as e:
+            logging.error(f"History search failed: {e}")
+            status_label.config(text=f"Search failed: {e}")
+            return
+        for hit in found:
+            when = f"{format_time(hit['start'])} - {format_time(hit['end'])}" if hit['start'] is not None else "-"
+            confidence = f"{hit['confidence']:.1%}" if hit['confidence'] is not None else "-"
+            item = results.insert("", tk.END, values=(os.path.basename(hit['source'] or "recording"), when,
+                                                      confidence, hit['snippet']))
+            hits[item] = hit
+        status_label.config(text=f"{len(found)} matching segment(s)")
+
+    def show_hit(event=None):
+        selection = results.selection()
+        if not selection:
+            return
+        hit = hits[selection[0]]
+        recorded = datetime.datetime.fromtimestamp(hit['created_at']).strftime('%Y-%m-%d %H:%M:%S')
+        Files['transcription_box'].delete(1.0, tk.END)
+        Files['transcription_box'].insert(tk.END, f"{hit['source'] or 'recording'} (transcribed {recorded})\n")
+        if hit['start'] is not None:
+            Files['transcription_box'].insert(tk.END, f"[{format_time(hit['start'])} - {format_time(hit['end'])}]\n")
+        Files['transcription_box'].insert(tk.END, f"{hit['text']}\n")
+
+    tk.Button(query_frame, text="Search", command=run_search, bg="#4caf50", fg="white",
+              font=("Helvetica", 10, "bold")).pack(side=tk.RIGHT)
+    query_entry.bind("<Return>", run_search)
+    results.bind("<Double-1>", show_hit)
+    results.pack(fill=tk.BOTH, expand=True, padx=10)
+    status_label.pack(fill=tk.X, padx=10, pady=5)
+    query_entry.focus_set()
@@ -0,0 +1,75 @@
+import os
+import threading
+import tkinter as tk
+from tkinter import messagebox
+from app.core.translator import LANGUAGES
+
+#  Translate the output_transcription.txt file
+def translate_file(Translation, src_lang, tgt_lang):
+    save_directory = Translation['save_directory'] or os.getcwd()
+    transcription_file = os.path.join(save_directory, "output_transcription.txt")
+    translated_file = os.path.join(save_directory, f"output_transcription_{tgt_lang}.txt")
+
+    if not os.path.exists(transcription_file):
+        messagebox.showerror("Error", "No output_transcription file found. Please transcribe some audio first.")
+        return
+
+    try:
+        with open(transcription_file, "r", encoding="utf-8") as f:
+            content = f.read()
+
+        if not content.strip():
+            messagebox.showerror("Error", "The output_transcription.txt file is empty.")
+            return
+
+        translated_text = Translation['translator'].translate_text(content, src_lang, tgt_lang)
+
+        with open(translated_file, "w", encoding="utf-8") as f:
+            f.write(translated_text)
+
+        stats = Translation['translator'].last_stats
+        details = f"\n\n{stats['segments']} sentence(s), {stats['memory_hits']} from translation memory " \
+                  f"({stats['hit_rate']:.0%} hit rate).\nModel time {stats['seconds']:.1f}s " \
+                  f"({stats['tokens_per_second']:.1f} tokens/s)" if stats else ""
+        messagebox.showinfo("Success", f"Translated file saved as output_transcription_{tgt_lang}.txt{details}")
+
+    except Exception as e:
+        messagebox.showerror("Error", f"Translation failed: {e}")
+
+#  Asynchronous wrapper to prevent GUI from freezing
+def translate_async(Translation, src_lang, tgt_lang):
+    threading.Thread(target=lambda: translate_file(Translation, src_lang, tgt_lang), daemon=True).start()
+
+#  GUI for Translation
+def open_translation_dashboard(Translation):
+    save_directory = Translation['save_directory'] or os.getcwd()
+    transcription_file = os.path.join(save_directory, "output_transcription.txt")
+
+    if not os.path.exists(transcription_file):
+        messagebox.showerror("Error", "No transcription file found. Please transcribe some audio first.")
+        return
+
+    # Create a new Tkinter window
+    dashboard = tk.Toplevel(Translation['root'])
+    dashboard.title("Translate output_transcription.txt")
+    dashboard.geometry("300x300")
+
+    tk.Label(dashboard, text="Translate output_transcription.txt to:").pack(pady=10)
+
+    # Dropdown for source and target languages
+    tk.Label(dashboard, text="Source Language:").pack()
+    src_lang_var = tk.StringVar(dashboard)
+    src_lang_var.set("English")  # Default source language
+    src_lang_menu = tk.OptionMenu(dashboard, src_lang_var, *LANGUAGES.keys())
+    src_lang_menu.pack(pady=5)
+
+    tk.Label(dashboard, text="Target Language:").pack()
+    tgt_lang_var = tk.StringVar(dashboard)
+    tgt_lang_var.set("Hindi")  # Default target language
+    tgt_lang_menu = tk.OptionMenu(dashboard, tgt_lang_var, *LANGUAGES.keys())
+    tgt_lang_menu.pack(pady=5)
+
+    # Button to translate
+    translate_btn = tk.Button(dashboard, text="Translate",
+                              command=lambda: translate_async(Translation, src_lang_var.get(), tgt_lang_var.get()))
+    translate_btn.pack(pady=10)
@@ -1,95 +1,228 @@
 import os
 import datetime
-import collections
+import logging
+import threading
 import tkinter as tk
 from tkinter import messagebox
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import seaborn as sns
+from app.core.history_store import HistoryStore, LENGTH_BUCKET_WORDS
+from app.utils.config import get_settings
+
+# The open dashboard, if any: opening it again brings this window forward instead of building another
+_dashboard = None
+
+
+class UsageDashboard:
+    """
+    Usage statistics window. The statistics come from the history store's incrementally
+    maintained aggregates and are read on a background thread; the Tk thread only updates
+    the panels whose data changed, on a figure that is built once and reused. While open,
+    the dashboard polls the store and refreshes itself when new transcriptions are recorded.
+    """
+
+    def __init__(self, root, save_directory):
+        self.root = root
+        self.save_directory = save_directory
+        self.settings = get_settings()['history']
+        self.store = None
+        self.revision = None
+        self.data = {}
+        self._loading = False
+        # Set when a refresh is requested while a load is running; that load's result is then stale
+        self._reload_pending = False
+        self._after_id = None
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Usage Statistics Dashboard")
+        self.window.geometry("1100x750")  # Increased size for better readability
+        self.window.configure(bg="#2b2b2b")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        title_label = tk.Label(self.window, text="Usage Statistics Dashboard", bg="#2b2b2b", fg="white", font=("Helvetica", 18, "bold"))
+        title_label.pack(pady=10)
+
+        main_frame = tk.Frame(self.window, bg="#2b2b2b")
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        summary_frame = tk.Frame(main_frame, bg="#2b2b2b")
+        summary_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10)
+        self.summary_label = tk.Label(summary_frame, text="Loading history...", justify="left", bg="#2b2b2b", fg="white", font=("Helvetica", 12))
+        self.summary_label.pack(anchor="n")
+
+        # Usage over time can be bucketed per day or per week
+        self.period_var = tk.StringVar(self.window, value="day")
+        for period in ("day", "week"):
+            tk.Radiobutton(summary_frame, text=f"Usage per {period}", variable=self.period_var, value=period,
+                           command=self.refresh, bg="#2b2b2b", fg="white", selectcolor="#444444",
+                           activebackground="#2b2b2b", activeforeground="white").pack(anchor="w")
+
+        graphs_frame = tk.Frame(main_frame, bg="#2b2b2b")
+        graphs_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10)
+
+        sns.set_style("darkgrid", {"axes.facecolor": "#2b2b2b", "grid.color": "gray"})
+        self.fig = plt.Figure(figsize=(12, 8), dpi=100, facecolor="#2b2b2b", constrained_layout=True)
+        self.axes = {
+            'recent': self.fig.add_subplot(221),
+            'common_words': self.fig.add_subplot(222),
+            'histogram': self.fig.add_subplot(223),
+            'usage': self.fig.add_subplot(224),
+        }
+        self.canvas = FigureCanvasTkAgg(self.fig, master=graphs_frame)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        close_btn = tk.Button(self.window, text="Close Dashboard", command=self.close, bg="#F44336", fg="white", font=("Helvetica", 12, "bold"))
+        close_btn.pack(pady=5)
+
+        self.refresh()
+
+    def refresh(self):
+        """Reload the statistics on a background thread (forced, e.g. after switching day/week)."""
+        self.revision = None
+        if self._loading:
+            self._reload_pending = True
+            return
+        self._start_load()
+
+    def _start_load(self):
+        if self._loading:
+            return
+        self._loading = True
+        threading.Thread(target=self._load, args=(self.period_var.get(),), daemon=True).start()
+
+    def _load(self, period):
+        try:
+            if self.store is None:
+                self.store = HistoryStore(self.settings['path'])
+                # Older versions appended to history.txt in the save directory or the working directory
+                for legacy_file in {os.path.join(self.save_directory, "history.txt"), os.path.abspath("history.txt")}:
+                    self.store.import_text_history(legacy_file)
+            revision = self.store.revision()
+            if revision == self.revision:
+                data = None
+            else:
+                summary = self.store.summary()
+                data = {
+                    'summary': summary,
+                    'recent': self.store.recent(self.settings['dashboard_recent']),
+                    'common_words': summary['common_words'],
+                    'histogram': self.store.length_histogram(),
+                    'usage': (period, self.store.usage(period, self.settings['dashboard_buckets'])),
+                }
+            self.root.after(0, lambda: self._apply(revision, data))
+        except Exception as e:
+            logging.error(f"Could not read the transcription history: {e}")
+            # `e` is unbound once the except block ends, before the callback runs
+            self.root.after(0, lambda error=e: self._apply(None, None, error=error))
+
+    def _apply(self, revision, data, error=None):
+        self._loading = False
+        if not self.window.winfo_exists():
+            return
+        if self._reload_pending:
+            # E.g. the period was switched while this load ran: load again for the current settings
+            self._reload_pending = False
+            self.revision = None
+            self._start_load()
+            return
+        self._schedule()
+        if error is not None:
+            self.summary_label.config(text=f"Could not read the transcription history:\n{error}")
+            return
+        if data is None:
+            return
+        self.revision = revision
+        summary = data['summary']
+        if not summary['transcriptions']:
+            self.summary_label.config(text="No transcription history found.\nPlease transcribe some audio first.")
+            return
+        self.summary_label.config(text=self._summary_text(summary))
+        changed = [name for name in self.axes if data[name] != self.data.get(name)]
+        for name in changed:
+            ax = self.axes[name]
+            ax.clear()
+            getattr(self, f"_draw_{name}")(ax, data[name])
+        self.data = data
+        if changed:
+            self.canvas.draw_idle()
+
+    def _schedule(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.settings['dashboard_refresh_ms'], self._poll)
+
+    def _poll(self):
+        self._after_id = None
+        if self.window.winfo_exists():
+            self._start_load()
+
+    def close(self):
+        global _dashboard
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self.window.destroy()
+        if _dashboard is self:
+            _dashboard = None
+
+    @staticmethod
+    def _summary_text(summary):
+        last = summary['last']
+        confidence = summary['average_confidence']
+        return (
+            f"Total Transcriptions: {summary['transcriptions']}\n"
+            f"Total Words: {summary['words']}\n"
+            f"Average Words per Transcription: {summary['average_words']:.2f}\n"
+            f"Total Audio: {summary['audio_seconds'] / 60:.1f} min\n"
+            f"Average Confidence: {f'{confidence:.1%}' if confidence is not None else 'N/A'}\n"
+            f"Last Transcription: {last['text'][:50] + '...'}\n"
+            f"Date: {datetime.datetime.fromtimestamp(last['created_at']).strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+
+    @staticmethod
+    def _style(ax, title, xlabel, ylabel):
+        ax.set_xlabel(xlabel, color="white")
+        ax.set_ylabel(ylabel, color="white")
+        ax.set_title(title, color="white")
+        ax.tick_params(axis="x", colors="white")
+        ax.tick_params(axis="y", colors="white")
+
+    def _draw_recent(self, ax, recent):
+        ax.bar([row[0] for row in recent], [row[2] for row in recent], color="#4CAF50")
+        self._style(ax, f"Words per Transcription (last {len(recent)})", "Transcription #", "Word Count")
+
+    def _draw_common_words(self, ax, common_words):
+        if common_words:
+            labels = [f"{word} ({count})" for word, count in common_words]
+            counts = [count for word, count in common_words]
+            ax.pie(counts, labels=labels, colors=sns.color_palette("pastel"), autopct='%1.1f%%', textprops={'color': 'white'})
+        ax.set_title("Frequent Words", color="white")
+
+    def _draw_histogram(self, ax, histogram):
+        # The histogram is kept up to date by the store, so it covers the whole history without reading it
+        ax.bar([start for start, _ in histogram], [count for _, count in histogram], width=LENGTH_BUCKET_WORDS,
+               align="edge", color="#FFA726")
+        self._style(ax, "Transcription Length Distribution", "Word Count", "Transcriptions")
+
+    def _draw_usage(self, ax, usage):
+        period, buckets = usage
+        labels = [day[5:] for day, _, _, _ in buckets]  # MM-DD
+        ax.bar(range(len(buckets)), [words for _, _, words, _ in buckets], color="#FF5722")
+        ax.set_xticks(range(len(buckets)))
+        ax.set_xticklabels(labels, rotation=45, ha="right", fontsize=8)
+        minutes = sum(seconds for _, _, _, seconds in buckets) / 60
+        self._style(ax, f"Words per {period.capitalize()} ({minutes:.0f} min of audio)",
+                    "Week starting" if period == "week" else "Day", "Words")
+
+
 def open_new_dashboard(save_directory, root):
-    """Opens a modern dashboard window displaying usage statistics from history.txt."""
-    history_file = os.path.join(save_directory, "history.txt")
-    try:
-        with open(history_file, "r", encoding="utf-8") as f:
-            lines = [line.strip() for line in f if line.strip()]
-    except FileNotFoundError:
-        messagebox.showerror("Error", "No history file found. Please transcribe some audio first.")
+    """Opens the usage statistics dashboard, or brings the open one to the front."""
+    global _dashboard
+    if _dashboard is not None and _dashboard.window.winfo_exists():
+        _dashboard.window.lift()
+        _dashboard.refresh()
         return
-
-    num_transcriptions = len(lines)
-    word_counts = [len(line.split()) for line in lines]
-    total_words = sum(word_counts)
-    avg_words = total_words / num_transcriptions if num_transcriptions > 0 else 0
-
-    all_words = []
-    for line in lines:
-        all_words.extend(line.lower().split())
-    common_words = collections.Counter(all_words).most_common(5)
-
-    summary_text = (
-        f"Total Transcriptions: {num_transcriptions}\n"
-        f"Total Words: {total_words}\n"
-        f"Average Words per Transcription: {avg_words:.2f}\n"
-        f"Last Transcription: {lines[-1][:50] + '...' if lines else 'N/A'}\n"
-        f"Date: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-    )
-
-    dash_win = tk.Toplevel(root)
-    dash_win.title("Usage Statistics Dashboard")
-    dash_win.geometry("1100x750")  # Increased size for better readability
-    dash_win.configure(bg="#2b2b2b")
-
-    title_label = tk.Label(dash_win, text="Usage Statistics Dashboard", bg="#2b2b2b", fg="white", font=("Helvetica", 18, "bold"))
-    title_label.pack(pady=10)
-
-    main_frame = tk.Frame(dash_win, bg="#2b2b2b")
-    main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-    summary_frame = tk.Frame(main_frame, bg="#2b2b2b")
-    summary_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10)
-    summary_label = tk.Label(summary_frame, text=summary_text, justify="left", bg="#2b2b2b", fg="white", font=("Helvetica", 12))
-    summary_label.pack(anchor="n")
-
-    graphs_frame = tk.Frame(main_frame, bg="#2b2b2b")
-    graphs_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10)
-
-    sns.set_style("darkgrid", {"axes.facecolor": "#2b2b2b", "grid.color": "gray"})
-    fig = plt.Figure(figsize=(12, 8), dpi=100, facecolor="#2b2b2b", constrained_layout=True)
-
-    ax1 = fig.add_subplot(221)
-    ax1.bar(range(1, num_transcriptions + 1), word_counts, color="#4CAF50")
-    ax1.set_xlabel("Transcription #", color="white")
-    ax1.set_ylabel("Word Count", color="white")
-    ax1.set_title("Words per Transcription", color="white")
-    ax1.tick_params(axis="x", colors="white")
-    ax1.tick_params(axis="y", colors="white")
-
-    ax2 = fig.add_subplot(222)
-    if common_words:
-        labels = [f"{word} ({count})" for word, count in common_words]
-        counts = [count for word, count in common_words]
-        ax2.pie(counts, labels=labels, colors=sns.color_palette("pastel"), autopct='%1.1f%%', textprops={'color': 'white'})
-    ax2.set_title("Frequent Words", color="white")
-
-    ax3 = fig.add_subplot(223)
-    sns.histplot(word_counts, bins=15, kde=True, color="#FFA726", ax=ax3)
-    ax3.set_xlabel("Word Count", color="white")
-    ax3.set_ylabel("Frequency", color="white")
-    ax3.set_title("Transcription Length Distribution", color="white")
-    ax3.tick_params(axis="x", colors="white")
-    ax3.tick_params(axis="y", colors="white")
-
-    ax4 = fig.add_subplot(224)
-    ax4.plot(range(1, num_transcriptions + 1), word_counts, marker='o', linestyle='-', color="#FF5722")
-    ax4.set_xlabel("Transcription #", color="white")
-    ax4.set_ylabel("Word Count", color="white")
-    ax4.set_title("Transcription Trend", color="white")
-    ax4.tick_params(axis="x", colors="white")
-    ax4.tick_params(axis="y", colors="white")
-
-    canvas = FigureCanvasTkAgg(fig, master=graphs_frame)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-    close_btn = tk.Button(dash_win, text="Close Dashboard", command=dash_win.destroy, bg="#F44336", fg="white", font=("Helvetica", 12, "bold"))
-    close_btn.pack(pady=5)
\ No newline at end of file
+    try:
+        _dashboard = UsageDashboard(root, save_directory)
+    except Exception as e:
+        messagebox.showerror("Error", f"Could not open the usage dashboard: {e}")
@@ -0,0 +1,352 @@
+"""
+Local HTTP transcription service: one process holds the models, other tools send it audio.
+
+    POST /jobs                 JSON {"path": "...", "analyze": ["emotion", "text"]}, or raw audio bytes
+                               (X-Filename header for the extension). 202 with the job, 503 when full.
+    GET  /jobs/<id>            job status
+    GET  /jobs/<id>/result     transcription record (plus analyses), 409 until the job is done
+    GET  /health               queue depth, batching and model statistics
+
+Jobs are processed by a single worker on one model thread. Short clips that arrive together
+are transcribed with one batched Whisper decode. The transcriber and analyzers can be injected,
+so the service runs fully offline against stubs.
+"""
+import asyncio
+import http.client
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils.config import get_settings
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+STATUS_TEXT = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+# Analyses a job can ask for besides the transcription
+ANALYSES = ("emotion", "text")
+
+
+class TranscriptionService:
+    def __init__(self, transcriber=None, emotion_analyzer=None, text_analyzer=None, **overrides):
+        settings = dict(get_settings()['service'], **overrides)
+        self.settings = settings
+        self._transcriber = transcriber
+        self._emotion_analyzer = emotion_analyzer
+        self._text_analyzer = text_analyzer
+        self.jobs = OrderedDict()
+        self.queue = None
+        self.server = None
+        self._worker_task = None
+        # One thread for all model work: requests share the loaded models instead of each loading their own
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="service-model")
+        self.batches = 0
+        self.batched_clips = 0
+        os.makedirs(settings['upload_directory'], exist_ok=True)
+
+    @property
+    def transcriber(self):
+        if self._transcriber is None:
+            from .core.transcriber import AudioTranscriber
+            self._transcriber = AudioTranscriber()
+        return self._transcriber
+
+    @property
+    def emotion_analyzer(self):
+        if self._emotion_analyzer is None:
+            from .core.emotion_analyzer import EmotionAnalyzer
+            self._emotion_analyzer = EmotionAnalyzer()
+        return self._emotion_analyzer
+
+    @property
+    def text_analyzer(self):
+        if self._text_analyzer is None:
+            from .core.text_analyzer import TextAnalyzer
+            self._text_analyzer = TextAnalyzer()
+        return self._text_analyzer
+
+    # ---- server ----
+
+    async def start(self, host=None, port=None):
+        """Start listening (port 0 picks a free port) and return the bound port."""
+        self.queue = asyncio.Queue(maxsize=self.settings['max_queue'])
+        self._worker_task = asyncio.create_task(self._worker())
+        self.server = await asyncio.start_server(self._handle, host or self.settings['host'],
+                                                 self.settings['port'] if port is None else port)
+        bound = self.server.sockets[0].getsockname()[1]
+        logging.info(f"Transcription service listening on {host or self.settings['host']}:{bound}")
+        return bound
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if self._worker_task:
+            self._worker_task.cancel()
+        self.executor.shutdown(wait=False)
+
+    def serve_forever(self, host=None, port=None):
+        async def main():
+            await self.start(host, port)
+            async with self.server:
+                await self.server.serve_forever()
+        asyncio.run(main())
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").strip()
+            method, target, _ = request_line.split(" ", 2)
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1")
+                if line in ("\r\n", "\n", ""):
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", "0"))
+            if length > self.settings['max_upload_bytes']:
+                status, body = 413, {"error": "upload too large"}
+            else:
+                payload = await reader.readexactly(length) if length else b""
+                status, body = await self._route(method, target.split("?", 1)[0], headers, payload)
+        except ValueError:
+            status, body = 400, {"error": "malformed request"}
+        except Exception as e:
+            logging.error(f"Service request failed: {e}")
+            status, body = 500, {"error": str(e)}
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        extra = "Retry-After: 1\r\n" if status == 503 else ""
+        writer.write(f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\n{extra}Connection: close\r\n\r\n".encode("latin-1") + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, headers, payload):
+        parts = [part for part in path.split("/") if part]
+        if parts == ["health"] and method == "GET":
+            return 200, self.health()
+        if parts == ["jobs"] and method == "POST":
+            return await self._submit(headers, payload)
+        if len(parts) in (2, 3) and parts[0] == "jobs" and method == "GET":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return 404, {"error": "unknown job"}
+            if len(parts) == 2:
+                return 200, self._public(job)
+            if parts[2] == "result":
+                if job["status"] == "done":
+                    return 200, job["result"]
+                if job["status"] == "failed":
+                    return 500, {"error": job["error"]}
+                return 409, {"error": f"job is {job['status']}"}
+        if parts and parts[0] in ("jobs", "health"):
+            return 405, {"error": "method not allowed"}
+        return 404, {"error": "not found"}
+
+    async def _submit(self, headers, payload):
+        if self.queue.full():
+            return 503, {"error": "queue full, retry later", "queued": self.queue.qsize()}
+        job_id = uuid.uuid4().hex
+        if headers.get("content-type", "").startswith("application/json"):
+            try:
+                request = json.loads(payload or b"{}")
+            except ValueError:
+                return 400, {"error": "invalid JSON"}
+            if not isinstance(request, dict):
+                return 400, {"error": "expected a JSON object"}
+            path = request.get("path")
+            if not isinstance(path, str) or not os.path.exists(path):
+                return 400, {"error": f"file not found: {path}"}
+            analyze = request.get("analyze", [])
+            upload = False
+        else:
+            if not payload:
+                return 400, {"error": "empty upload"}
+            extension = os.path.splitext(headers.get("x-filename", ""))[1] or ".wav"
+            path = os.path.join(self.settings['upload_directory'], job_id + extension)
+            analyze = [name.strip() for name in headers.get("x-analyze", "").split(",") if name.strip()]
+            upload = True
+        if not isinstance(analyze, list) or not all(name in ANALYSES for name in analyze):
+            return 400, {"error": f"analyze must be a list of: {', '.join(ANALYSES)}"}
+        if upload:
+            # Uploads can be hundreds of MB; writing them on the event loop would stall every other request
+            await asyncio.get_running_loop().run_in_executor(None, self._write_upload, path, payload)
+            if self.queue.full():
+                os.remove(path)
+                return 503, {"error": "queue full, retry later", "queued": self.queue.qsize()}
+        job = {"id": job_id, "status": "queued", "source": path, "upload": upload, "analyze": analyze,
+               "submitted_at": time.time(), "started_at": None, "completed_at": None,
+               "result": None, "error": None}
+        self.jobs[job_id] = job
+        self.queue.put_nowait(job)
+        self._forget_old_jobs()
+        return 202, self._public(job)
+
+    @staticmethod
+    def _write_upload(path, payload):
+        with open(path, "wb") as f:
+            f.write(payload)
+
+    @staticmethod
+    def _public(job):
+        return {key: job[key] for key in ("id", "status", "submitted_at", "started_at", "completed_at", "error")}
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("done", "failed")]
+        for job_id in finished[:max(0, len(finished) - self.settings['keep_finished_jobs'])]:
+            del self.jobs[job_id]
+
+    def health(self):
+        from .core.model_registry import registry
+        return {
+            "status": "ok",
+            "queued": self.queue.qsize() if self.queue else 0,
+            "jobs": len(self.jobs),
+            "batches": self.batches,
+            "mean_batch_size": self.batched_clips / self.batches if self.batches else 0.0,
+            "models": registry.stats(),
+        }
+
+    # ---- processing ----
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        window = self.settings['batch_window_ms'] / 1000
+        while True:
+            batch = [await self.queue.get()]
+            # Collect whatever else arrives within the batching window
+            deadline = loop.time() + window
+            while len(batch) < self.settings['max_batch']:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            for job in batch:
+                job["status"] = "running"
+                job["started_at"] = time.time()
+            try:
+                await loop.run_in_executor(self.executor, self._process, batch)
+            except Exception as e:
+                logging.error(f"Service batch failed: {e}")
+                for job in batch:
+                    if job["status"] == "running":
+                        self._finish(job, error=str(e))
+
+    def _process(self, batch):
+        """Runs on the model thread: load, transcribe (short clips batched), analyze."""
+        transcriber = self.transcriber
+        loaded = []
+        for job in batch:
+            try:
+                loaded.append((job, transcriber.load_audio(job["source"])))
+            except Exception as e:
+                self._finish(job, error=f"could not load audio: {e}")
+
+        limit = self.settings['short_clip_seconds'] * 16000
+        short = [(job, audio) for job, audio in loaded if len(audio) <= limit]
+        long = [(job, audio) for job, audio in loaded if len(audio) > limit]
+        if len(short) > 1 and hasattr(transcriber, "transcribe_batch"):
+            try:
+                results = transcriber.transcribe_batch([audio for _, audio in short])
+                self.batches += 1
+                self.batched_clips += len(short)
+                for (job, audio), result in zip(short, results):
+                    self._complete(job, audio, result)
+            except Exception as e:
+                logging.error(f"Batched decode failed, transcribing clips one by one: {e}")
+                long = short + long
+        else:
+            long = short + long
+
+        for job, audio in long:
+            try:
+                self._complete(job, audio, transcriber.transcribe_array(audio))
+            except Exception as e:
+                self._finish(job, error=str(e))
+
+    def _complete(self, job, audio, result):
+        try:
+            record = self.transcriber.make_record(job["source"], audio, result)
+            if "text" in job["analyze"]:
+                record["text_analysis"] = self.text_analyzer.analyze_text(record["text"], record["segments"])
+            if "emotion" in job["analyze"] and record["segments"]:
+                record["emotions"] = self.emotion_analyzer.analyze_segments(record["segments"])
+            self._finish(job, result=record)
+        except Exception as e:
+            self._finish(job, error=str(e))
+
+    def _finish(self, job, result=None, error=None):
+        job["result"] = result
+        job["error"] = error
+        job["status"] = "failed" if error else "done"
+        job["completed_at"] = time.time()
+        if job["upload"] and os.path.exists(job["source"]):
+            os.remove(job["source"])
+        if error:
+            logging.error(f"Service job {job['id']} failed: {error}")
+
+
+class ServiceClient:
+    """Minimal client for TranscriptionService over http.client (no third-party dependencies)."""
+
+    def __init__(self, host="127.0.0.1", port=None, timeout=30):
+        self.host = host
+        self.port = port or get_settings()['service']['port']
+        self.timeout = timeout
+
+    def _request(self, method, path, body=None, headers=None):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            return response.status, json.loads(response.read() or b"{}")
+        finally:
+            conn.close()
+
+    def health(self):
+        return self._request("GET", "/health")[1]
+
+    def submit_path(self, path, analyze=()):
+        """Queue a file the service can read; returns (status code, job)."""
+        body = json.dumps({"path": os.path.abspath(path), "analyze": list(analyze)})
+        return self._request("POST", "/jobs", body, {"Content-Type": "application/json"})
+
+    def submit_audio(self, data, filename="upload.wav", analyze=()):
+        """Upload audio bytes; returns (status code, job)."""
+        headers = {"Content-Type": "application/octet-stream", "X-Filename": filename}
+        if analyze:
+            headers["X-Analyze"] = ",".join(analyze)
+        return self._request("POST", "/jobs", data, headers)
+
+    def status(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}")[1]
+
+    def result(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}/result")
+
+    def wait(self, job_id, timeout=300, poll_interval=0.1):
+        """Poll until the job finishes and return its result (raises RuntimeError if it failed)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            status = self.status(job_id)
+            if status.get("status") == "done":
+                return self.result(job_id)[1]
+            if status.get("status") == "failed":
+                raise RuntimeError(status.get("error"))
+            if status.get("status") is None:
+                raise RuntimeError(status.get("error", "unknown job"))
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"job {job_id} still {status.get('status')}")
+            time.sleep(poll_interval)
@@ -1,11 +1,12 @@
-import tkinter as tk
+import os
+
 button_style = {
     "font": ("Helvetica", 12, "bold"),
     "bg": "#4caf50",
     "fg": "white",
     "activebackground": "#45a049",
     "activeforeground": "white",
-    "relief": tk.RAISED,
+    "relief": "raised",  # tk.RAISED, kept as a literal so core modules can import this without Tk
     "bd": 3,
     "width": 20,
     "height": 1, 
@@ -38,5 +39,206 @@ light_theme = {
     'axis_color': 'black',
     'grid_color': '#dddddd'
 }
+# Caches, indexes and other files the app keeps between runs
+data_directory = os.getenv('TRANSCRIBER_DATA_DIR', os.path.join(os.path.expanduser('~'), '.ai-voice-recorder'))
+
+# Model names and lifecycle settings used by app.core.model_registry
+model_settings = {
+    'whisper_model': os.getenv('WHISPER_MODEL', 'small'),
+    'emotion_model': 'j-hartmann/emotion-english-distilroberta-base',
+    'spacy_model': 'en_core_web_sm',
+    'nllb_model': 'facebook/nllb-200-distilled-600M',
+    # Models that have not been used for this many seconds are unloaded (0 disables)
+    'idle_unload_seconds': int(os.getenv('MODEL_IDLE_UNLOAD_SECONDS', '900')),
+    'idle_check_seconds': 60,
+    # Inference backend per model: 'fp32', 'int8' (dynamic quantization) or 'onnx' (needs optimum[onnxruntime]).
+    # Converted models are cached in converted_directory; compare them with `python -m app.core.benchmark`.
+    'backends': {
+        'whisper': os.getenv('WHISPER_BACKEND', 'fp32'),
+        'nllb': os.getenv('NLLB_BACKEND', 'fp32'),
+        'emotion': os.getenv('EMOTION_BACKEND', 'fp32'),
+    },
+    'converted_directory': os.path.join(data_directory, 'converted_models'),
+}
+
+# Parallel batch transcription (app.core.batch); each worker process loads its own model
+batch_settings = {
+    'workers': int(os.getenv('BATCH_WORKERS', str(max(1, (os.cpu_count() or 2) // 2)))),
+    # Retries for a file whose worker process crashed before finishing it
+    'max_attempts': 2,
+}
+
+# Audio capture (app.core.recorder). The 'speech' profile records 16 kHz mono, the format
+# Whisper uses, either natively or resampled while recording; 'archival' keeps the device rate.
+audio_settings = {
+    'capture_profile': os.getenv('CAPTURE_PROFILE', 'speech'),
+    'speech_rate': 16000,
+    'device_rate': 44100,
+    # In the speech profile, also save the full-rate take as output_full.wav
+    'keep_archival_copy': os.getenv('KEEP_ARCHIVAL_COPY', '0') == '1',
+    # Takes up to this long are handed to Whisper from memory instead of re-reading the file
+    'max_memory_seconds': 1800,
+    # Waveform display: redraw rate and how many seconds of audio the envelope shows
+    'visualizer_fps': 30,
+    'visualizer_seconds': 2.0,
+}
+
+# Content-addressed cache of Whisper results (app.core.transcription_cache)
+transcription_cache_settings = {
+    'enabled': os.getenv('TRANSCRIPTION_CACHE', '1') != '0',
+    'directory': os.path.join(data_directory, 'transcription_cache'),
+    # Least recently used results are evicted once the cache grows past this size
+    'max_bytes': 512 * 2**20,
+}
+
+# Per-segment emotion scoring (EmotionAnalyzer.analyze_segments)
+emotion_settings = {
+    # Segments per pipeline call; each batch is padded only to its own longest segment
+    'batch_size': int(os.getenv('EMOTION_BATCH_SIZE', '16')),
+}
+
+# spaCy text analysis (app.core.text_analyzer)
+text_analysis_settings = {
+    # Pipeline components the analysis does not use, never loaded
+    'exclude': ['lemmatizer', 'senter', 'textcat'],
+    # Transcripts are analyzed in pieces of at most this many characters (spaCy's max_length is 1,000,000)
+    'chunk_chars': 5000,
+    # Pieces per nlp.pipe batch, and worker processes for large batches (-1 uses every core)
+    'batch_size': 64,
+    'n_process': int(os.getenv('SPACY_PROCESSES', '1')),
+    # Key phrases are ranked by TF-IDF against the document frequencies of every analyzed transcript
+    'phrase_stats_enabled': os.getenv('PHRASE_STATS', '1') != '0',
+    'phrase_stats_path': os.path.join(data_directory, 'phrase_stats.sqlite3'),
+}
+
+# NLLB translation of long transcripts (app.core.translator)
+translation_settings = {
+    # Sentences longer than this many tokens are split on word boundaries
+    'chunk_tokens': 160,
+    # Chunks per generate() call; chunks are sorted by length so padding stays small
+    'batch_size': int(os.getenv('TRANSLATION_BATCH_SIZE', '8')),
+    'num_beams': 2,
+    'max_new_tokens': 320,
+    # Exact-match translation memory of previously translated sentences (app.core.translation_memory)
+    'memory_enabled': os.getenv('TRANSLATION_MEMORY', '1') != '0',
+    'memory_path': os.path.join(data_directory, 'translation_memory.sqlite3'),
+    'memory_max_entries': 100000,
+}
+
+# Summaries (app.core.summarizer): long transcripts are summarized in chunks, then combined
+summary_settings = {
+    # Estimated tokens per chunk, well under the model's context
+    'chunk_tokens': 2000,
+}
+
+# Model calls for summaries and questions (app.core.llm_client)
+llm_settings = {
+    # 'gemini', or 'http' for any server that answers POST {"model", "prompt"} with {"text"}
+    'backend': os.getenv('LLM_BACKEND', 'gemini'),
+    'model': os.getenv('GEMINI_MODEL', 'gemini-pro'),
+    'url': os.getenv('LLM_URL', 'http://127.0.0.1:8080/generate'),
+    'timeout': 120,
+    # Requests in flight at once, and on average per minute (short bursts up to max_concurrency)
+    'max_concurrency': 4,
+    'requests_per_minute': int(os.getenv('LLM_REQUESTS_PER_MINUTE', '60')),
+    # Rate-limit and server errors are retried after backoff_base, 2 * backoff_base, ... seconds
+    'max_retries': 4,
+    'backoff_base': 1.0,
+    'backoff_max': 30.0,
+    # Every response is cached, so re-summarizing an edited transcript only sends the changed chunks
+    'cache_enabled': os.getenv('LLM_CACHE', '1') != '0',
+    'cache_path': os.path.join(data_directory, 'llm_cache.sqlite3'),
+    # Least recently used responses are evicted past cache_max_entries; older ones are not served
+    'cache_max_entries': 10000,
+    'cache_max_age_days': 30,
+}
+
+# Question answering (app.core.retrieval): only the transcript segments that best match a question
+# are sent to the model, from a BM25 index built once per transcript and kept on disk
+retrieval_settings = {
+    'directory': os.path.join(data_directory, 'retrieval_index'),
+    'top_k': 6,
+    # Neighbouring segments sent with every match, for context
+    'context_segments': 1,
+    # Estimated tokens from the start of the transcript sent when no segment matches the question
+    'fallback_tokens': 3000,
+}
+
+# Local HTTP transcription service (app.service, `python -m app serve`)
+service_settings = {
+    'host': os.getenv('SERVICE_HOST', '127.0.0.1'),
+    'port': int(os.getenv('SERVICE_PORT', '8765')),
+    # Jobs waiting beyond this are refused with 503 until the queue drains
+    'max_queue': 64,
+    # Short clips arriving within batch_window_ms of each other share one Whisper decode
+    'max_batch': 8,
+    'batch_window_ms': 50,
+    'short_clip_seconds': 30,
+    'max_upload_bytes': 512 * 2**20,
+    'upload_directory': os.path.join(data_directory, 'service_uploads'),
+    # Finished jobs kept for status/result queries
+    'keep_finished_jobs': 1000,
+}
+
+# Transcription history (app.core.history_store), read by the usage dashboard
+history_settings = {
+    'enabled': os.getenv('TRANSCRIPTION_HISTORY', '1') != '0',
+    'path': os.path.join(data_directory, 'history.sqlite3'),
+    # Transcriptions plotted in the dashboard's per-transcription charts
+    'dashboard_recent': 100,
+    # Days or weeks shown in the usage-over-time chart, and how often an open dashboard checks for new data
+    'dashboard_buckets': 30,
+    'dashboard_refresh_ms': 5000,
+    # Most segments returned by a full-text search of the history
+    'search_limit': 200,
+}
+
+# Voice activity detection before Whisper (app.core.vad): only the detected speech is transcribed
+vad_settings = {
+    'enabled': os.getenv('VAD_ENABLED', '0') == '1',
+    # Frames this many dB above the recording's noise floor count as speech
+    'margin_db': 12.0,
+    # Pauses shorter than this stay inside a speech region
+    'min_silence_ms': 600,
+    # Silence kept around every speech region
+    'padding_ms': 200,
+}
+
+# GUI log box (app.gui.components.log_handler). Records are queued by the logging thread and
+# inserted in batches by the Tk main loop every drain_ms.
+log_settings = {
+    'box_level': os.getenv('LOG_BOX_LEVEL', 'DEBUG'),
+    # Minimum level per logger or module name (core modules log through the root logger, so
+    # their module name, e.g. 'transcriber', is used); children of a listed logger inherit its level
+    'module_levels': {
+        'numba': 'WARNING',
+        'matplotlib': 'WARNING',
+        'PIL': 'WARNING',
+        'urllib3': 'WARNING',
+    },
+    'max_lines': 1000,
+    'drain_ms': 100,
+    'drain_batch': 500,
+}
+
 def get_styles():
-    return {'dark_theme': dark_theme, 'light_theme': light_theme, 'button_style': button_style}
\ No newline at end of file
+    return {'dark_theme': dark_theme, 'light_theme': light_theme, 'button_style': button_style}
+
+def get_settings():
+    return {
+        'data_directory': data_directory,
+        'models': model_settings,
+        'batch': batch_settings,
+        'audio': audio_settings,
+        'transcription_cache': transcription_cache_settings,
+        'vad': vad_settings,
+        'emotion': emotion_settings,
+        'text_analysis': text_analysis_settings,
+        'translation': translation_settings,
+        'summary': summary_settings,
+        'llm': llm_settings,
+        'retrieval': retrieval_settings,
+        'service': service_settings,
+        'history': history_settings,
+        'logging': log_settings,
+    }
\ No newline at end of file
@@ -1,5 +1,52 @@
+import csv
+import json
+import os
+import re
+import tempfile
+
+
 def format_time(seconds):
     """Convert seconds to MM:SS format"""
     minutes = int(seconds // 60)
     seconds = int(seconds % 60)
-    return f"{minutes:02d}:{seconds:02d}"
\ No newline at end of file
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def write_json_atomic(path, data):
+    """Write `data` as JSON so readers only ever see the old or the complete new file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def split_sentences(text):
+    """Split text into sentences on ., ! and ? followed by whitespace."""
+    return [sentence.strip() for sentence in re.split(r'(?<=[.!?])\s+', text) if sentence.strip()]
+
+
+def export_segments(rows, file_path, export_format):
+    """Write transcript rows (see AudioTranscriber.segment_rows) to `file_path` as 'json' or 'csv'."""
+    if export_format == "json":
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=4)
+    else:
+        with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
+            fieldnames = ["timestamp", "text", "confidence"]
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            for segment in rows:
+                writer.writerow({
+                    "timestamp": segment.get("timestamp", ""),
+                    "text": segment.get("text", ""),
+                    "confidence": segment.get("confidence", "")
+                })
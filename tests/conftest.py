@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Settings are read at import time: keep caches, indexes and history out of the user's data directory
+os.environ.setdefault("TRANSCRIBER_DATA_DIR", tempfile.mkdtemp(prefix="transcriber-tests-"))
+os.environ.setdefault("TRANSCRIPTION_HISTORY", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
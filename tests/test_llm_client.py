@@ -0,0 +1,199 @@
+"""AsyncLLMClient limits, retries and caching against a local fake HTTP backend."""
+import asyncio
+import json
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.llm_client import AsyncLLMClient, HTTPBackend, LLMError, ResponseCache
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """
+    Answers {"model", "prompt"} posts with {"text"}. `failures` is a list of (status, headers)
+    answered, in order, before any success; `delay` is how long each request takes.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeLLMHandler)
+        self.failures = []
+        self.delay = 0.0
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def url(self, path="/generate"):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.requests.append((time.monotonic(), self.path, body))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            failure = server.failures.pop(0) if server.failures else None
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+        status, headers = failure or (200, {})
+        payload = {"text": f"{body['model']} answers {body['prompt']}"} if status == 200 else {"error": "failed"}
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = FakeLLMServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(5)
+
+
+def make_client(url, **options):
+    options = {'max_concurrency': 4, 'requests_per_minute': 0, 'backoff_base': 0.01, **options}
+    return AsyncLLMClient(HTTPBackend(url, timeout=5), **options)
+
+
+def test_requests_in_flight_never_exceed_max_concurrency(server):
+    server.delay = 0.1
+    client = make_client(server.url(), max_concurrency=2)
+    responses = asyncio.run(client.generate_many([f"prompt {i}" for i in range(8)]))
+    assert [r.text for r in responses] == [f"local answers prompt {i}" for i in range(8)]
+    assert server.max_in_flight == 2
+
+
+def test_token_bucket_spaces_requests_after_a_burst(server):
+    # 600 a minute is one request every 0.1s, after a burst of max_concurrency
+    client = make_client(server.url(), max_concurrency=2, requests_per_minute=600)
+    asyncio.run(client.generate_many([f"prompt {i}" for i in range(6)]))
+    times = sorted(t for t, _, _ in server.requests)
+    assert times[1] - times[0] < 0.05
+    assert times[-1] - times[0] >= 0.35
+    assert all(later - earlier >= 0.07 for earlier, later in zip(times[2:], times[3:]))
+
+
+def test_rate_limit_and_server_errors_are_retried(server):
+    server.failures = [(429, {}), (503, {})]
+    response = asyncio.run(make_client(server.url()).generate("prompt"))
+    assert response.text == "local answers prompt"
+    assert response.attempts == 3 and len(server.requests) == 3
+
+
+def test_backoff_doubles_between_attempts(server):
+    server.failures = [(500, {}), (502, {}), (504, {})]
+    asyncio.run(make_client(server.url(), backoff_base=0.1).generate("prompt"))
+    times = [t for t, _, _ in server.requests]
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    # Jitter scales each delay by 0.5-1.0: 0.05-0.1s, then 0.1-0.2s, then 0.2-0.4s
+    assert gaps[0] >= 0.05 and gaps[1] >= 0.1 and gaps[2] >= 0.2
+
+
+def test_retry_after_is_honoured(server):
+    server.failures = [(429, {"Retry-After": "1"})]
+    started = time.monotonic()
+    response = asyncio.run(make_client(server.url()).generate("prompt"))
+    assert response.attempts == 2 and time.monotonic() - started >= 1.0
+
+
+def test_retry_after_is_capped_at_backoff_max(server):
+    server.failures = [(503, {"Retry-After": "3600"})]
+    started = time.monotonic()
+    response = asyncio.run(make_client(server.url(), backoff_max=0.2).generate("prompt"))
+    assert response.attempts == 2 and time.monotonic() - started < 2
+
+
+def test_gives_up_after_max_retries(server):
+    server.failures = [(503, {})] * 10
+    with pytest.raises(LLMError, match="answered 503") as error:
+        asyncio.run(make_client(server.url(), max_retries=2).generate("prompt"))
+    assert error.value.retryable and len(server.requests) == 3
+
+
+def test_client_errors_are_not_retried(server):
+    server.failures = [(400, {})]
+    with pytest.raises(LLMError, match="answered 400") as error:
+        asyncio.run(make_client(server.url()).generate("prompt"))
+    assert not error.value.retryable and len(server.requests) == 1
+
+
+def test_unreachable_server_is_retryable():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    with pytest.raises(LLMError, match="unreachable") as error:
+        asyncio.run(make_client(f"http://127.0.0.1:{port}/generate", max_retries=0).generate("prompt"))
+    assert error.value.retryable
+
+
+def test_cached_responses_are_not_sent_again(server, tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.db"))
+    client = make_client(server.url(), cache=cache)
+    prompts = ["first", "second", "first"]
+
+    async def twice():
+        return await client.generate_many(prompts), await client.generate_many(prompts)
+
+    _, second = asyncio.run(twice())
+    assert [r.text for r in second] == ["local answers first", "local answers second", "local answers first"]
+    assert all(r.cached for r in second)
+    assert {body['prompt'] for _, _, body in server.requests} == {"first", "second"}
+    assert len(server.requests) <= 3
+
+
+def test_cache_entries_are_not_shared_between_backends(server, tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.db"))
+    asyncio.run(make_client(server.url("/a"), cache=cache).generate("prompt"))
+    other_path = asyncio.run(make_client(server.url("/b"), cache=cache).generate("prompt"))
+    other_model = asyncio.run(AsyncLLMClient(HTTPBackend(server.url("/a"), model_name="other"),
+                                             requests_per_minute=0, cache=cache).generate("prompt"))
+    again = asyncio.run(make_client(server.url("/a"), cache=cache).generate("prompt"))
+    assert not other_path.cached and not other_model.cached
+    assert other_model.text == "other answers prompt"
+    assert again.cached and [path for _, path, _ in server.requests] == ["/a", "/b", "/a"]
+
+
+def test_least_recently_used_responses_are_evicted(server, tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.db"), max_entries=2)
+    client = make_client(server.url(), cache=cache)
+
+    async def run():
+        for prompt in ["first", "second", "first", "third"]:
+            await client.generate(prompt)
+        return await client.generate("first"), await client.generate("second")
+
+    first, second = asyncio.run(run())
+    assert cache.count() == 2
+    assert first.cached and not second.cached
+
+
+def test_expired_responses_are_not_served(server, tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.db"), max_age_days=1)
+    asyncio.run(make_client(server.url(), cache=cache).generate("prompt"))
+    with closing(sqlite3.connect(cache.db_path)) as conn, conn:
+        conn.execute("UPDATE responses SET created_at = created_at - 2 * 86400")
+    again = asyncio.run(make_client(server.url(), cache=cache).generate("prompt"))
+    assert not again.cached and len(server.requests) == 2
+    assert cache.count() == 1
@@ -0,0 +1,129 @@
+"""TranscriptionService and ServiceClient over a real socket, with a stub transcriber (no models)."""
+import asyncio
+import os
+import threading
+
+import pytest
+
+from app.service import ServiceClient, TranscriptionService
+
+
+class StubTranscriber:
+    """Treats each uploaded byte as one 16 kHz sample; b"bad" uploads cannot be loaded."""
+
+    def __init__(self):
+        self.batches = []
+        self.single = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def load_audio(self, path):
+        self.release.wait(5)
+        with open(path, "rb") as f:
+            data = f.read()
+        if data.startswith(b"bad"):
+            raise ValueError("unsupported format")
+        return data
+
+    def transcribe_batch(self, clips):
+        self.batches.append(len(clips))
+        return [{'text': f"clip of {len(clip)} samples", 'segments': []} for clip in clips]
+
+    def transcribe_array(self, audio):
+        self.single.append(len(audio))
+        return {'text': f"clip of {len(audio)} samples", 'segments': []}
+
+    def make_record(self, source, audio, result):
+        return {'source': source, 'audio_seconds': len(audio) / 16000, 'text': result['text'], 'segments': []}
+
+
+@pytest.fixture
+def service(tmp_path):
+    """(service, client, transcriber) with the service running on its own event loop thread."""
+    transcriber = StubTranscriber()
+    service = TranscriptionService(transcriber=transcriber, upload_directory=str(tmp_path),
+                                   batch_window_ms=300, max_queue=4)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    port = asyncio.run_coroutine_threadsafe(service.start(host="127.0.0.1", port=0), loop).result(5)
+    yield service, ServiceClient(port=port, timeout=5), transcriber
+    transcriber.release.set()
+    asyncio.run_coroutine_threadsafe(service.stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+def test_clips_arriving_together_share_one_batch(service):
+    service, client, transcriber = service
+    jobs = [client.submit_audio(b"x" * size)[1]['id'] for size in (1600, 3200, 4800)]
+    results = [client.wait(job_id, timeout=10, poll_interval=0.02) for job_id in jobs]
+    assert [r['text'] for r in results] == ["clip of 1600 samples", "clip of 3200 samples", "clip of 4800 samples"]
+    assert transcriber.batches == [3]
+    assert client.health()['mean_batch_size'] == 3.0
+
+
+def test_long_clips_are_transcribed_alone(service):
+    service, client, transcriber = service
+    long_clip = b"x" * (service.settings['short_clip_seconds'] * 16000 + 1)
+    job_id = client.submit_audio(long_clip)[1]['id']
+    assert client.wait(job_id, timeout=10, poll_interval=0.02)['audio_seconds'] > 30
+    assert transcriber.single == [len(long_clip)] and transcriber.batches == []
+
+
+def test_uploads_are_removed_after_the_job(service, tmp_path):
+    service, client, _ = service
+    client.wait(client.submit_audio(b"x" * 100)[1]['id'], timeout=10, poll_interval=0.02)
+    assert os.listdir(tmp_path) == []
+
+
+def test_failed_job_reports_its_error(service):
+    _, client, _ = service
+    job_id = client.submit_audio(b"bad audio")[1]['id']
+    with pytest.raises(RuntimeError, match="could not load audio"):
+        client.wait(job_id, timeout=10, poll_interval=0.02)
+    status, body = client.result(job_id)
+    assert status == 500 and "unsupported format" in body['error']
+
+
+def test_error_responses(service, tmp_path):
+    _, client, _ = service
+    assert client.submit_audio(b"")[0] == 400
+    status, body = client.submit_path(tmp_path / "missing.wav")
+    assert status == 400 and "file not found" in body['error']
+    assert client.result("no-such-job")[0] == 404
+    with pytest.raises(RuntimeError, match="unknown job"):
+        client.wait("no-such-job", timeout=1)
+    assert client._request("DELETE", "/jobs")[0] == 405
+
+
+def test_unknown_analyses_are_rejected(service, tmp_path):
+    _, client, _ = service
+    audio = tmp_path / "clip.wav"
+    audio.write_bytes(b"x" * 100)
+    status, body = client.submit_path(audio, analyze=["sentiment"])
+    assert status == 400 and "emotion, text" in body['error']
+    assert client.submit_audio(b"x" * 100, analyze=["text", "bogus"])[0] == 400
+    body = '{"path": "%s", "analyze": "text"}' % audio
+    assert client._request("POST", "/jobs", body, {"Content-Type": "application/json"})[0] == 400
+    assert client._request("POST", "/jobs", "[]", {"Content-Type": "application/json"})[0] == 400
+    assert os.listdir(tmp_path) == ["clip.wav"]
+
+
+def test_result_is_409_until_the_job_is_done(service):
+    _, client, transcriber = service
+    transcriber.release.clear()
+    job_id = client.submit_audio(b"x" * 100)[1]['id']
+    assert client.result(job_id)[0] == 409
+    transcriber.release.set()
+    assert client.wait(job_id, timeout=10, poll_interval=0.02)['text'] == "clip of 100 samples"
+
+
+def test_full_queue_answers_503(service):
+    service, client, transcriber = service
+    transcriber.release.clear()
+    # The worker takes up to max_batch jobs off the queue while it collects a batch
+    capacity = service.settings['max_queue'] + service.settings['max_batch']
+    statuses = [client.submit_audio(b"x" * 100)[0] for _ in range(capacity + 5)]
+    transcriber.release.set()
+    assert statuses[0] == 202 and statuses[-1] == 503
@@ -0,0 +1,103 @@
+"""Summarizer chunking and chunk-summary caching, with a stub backend behind the real client and cache."""
+import pytest
+
+from app.core.llm_client import AsyncLLMClient, LLMClient, ResponseCache, estimate_tokens
+from app.core.summarizer import MAP_PROMPT, Summarizer, transcript_segments
+
+
+class StubBackend:
+    """Answers every prompt with a short summary and records the prompts it was sent."""
+
+    model_name = "stub"
+    cache_id = "stub:summaries"
+
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, prompt):
+        self.prompts.append(prompt)
+        return f"summary {len(self.prompts)}", None, None
+
+
+def make_segments(count):
+    return [{'text': f"Speaker {i % 3} said sentence number {i} about topic {i * 7 % 13} in some detail.",
+             'start': i * 4.0, 'end': i * 4.0 + 3.5} for i in range(count)]
+
+
+@pytest.fixture
+def summarizer(tmp_path):
+    """(summarizer, backend) with a fresh response cache."""
+    backend = StubBackend()
+    client = LLMClient(AsyncLLMClient(backend, max_concurrency=4, requests_per_minute=0,
+                                      cache=ResponseCache(str(tmp_path / "responses.db"))))
+    yield Summarizer(client, chunk_tokens=200), backend
+    client.close()
+
+
+def test_chunks_respect_the_budget_and_keep_every_segment_in_order(summarizer):
+    summarizer, _ = summarizer
+    segments = make_segments(300)
+    chunks = summarizer.chunk(segments)
+    assert len(chunks) > 10
+    assert " ".join(chunk['text'] for chunk in chunks) == " ".join(s['text'] for s in segments)
+    # The budget counts each segment's tokens, not the spaces that join them
+    remaining = iter(segments)
+    for chunk in chunks:
+        tokens, text = 0, ""
+        while text != chunk['text']:
+            segment = next(remaining)
+            tokens += estimate_tokens(segment['text'])
+            text = f"{text} {segment['text']}".strip()
+        assert tokens <= summarizer.chunk_tokens
+    assert chunks[0]['start'] == 0.0 and chunks[-1]['end'] == segments[-1]['end']
+
+
+def test_editing_one_segment_changes_only_nearby_chunks(summarizer):
+    summarizer, _ = summarizer
+    segments = make_segments(300)
+    before = [chunk['text'] for chunk in summarizer.chunk(segments)]
+    segments[150] = dict(segments[150], text="An edited sentence that is nothing like the original one.")
+    after = [chunk['text'] for chunk in summarizer.chunk(segments)]
+    changed = set(after) - set(before)
+    assert 1 <= len(changed) <= 3
+    assert after[:3] == before[:3] and after[-3:] == before[-3:]
+
+
+def test_chunk_summaries_are_served_from_the_cache(summarizer):
+    summarizer, backend = summarizer
+    segments = make_segments(300)
+    first = summarizer.summarize(segments)
+    calls = len(backend.prompts)
+    assert summarizer.last_stats['llm_calls'] == calls > summarizer.last_stats['chunks']
+    assert summarizer.summarize(segments) == first
+    assert len(backend.prompts) == calls
+    assert summarizer.last_stats['llm_calls'] == 0 and summarizer.last_stats['cached_calls'] == calls
+
+
+def test_an_edit_only_resummarizes_the_chunks_it_touched(summarizer):
+    summarizer, backend = summarizer
+    segments = make_segments(300)
+    summarizer.summarize(segments)
+    chunks = summarizer.last_stats['chunks']
+    segments[150] = dict(segments[150], text="An edited sentence that is nothing like the original one.")
+    backend.prompts.clear()
+    summarizer.summarize(segments)
+    map_calls = [prompt for prompt in backend.prompts if prompt.startswith(MAP_PROMPT.split("{text}")[0])]
+    assert 1 <= len(map_calls) <= 3
+    assert summarizer.last_stats['cached_calls'] >= chunks - 3
+
+
+def test_reduce_prompts_label_parts_with_their_times(summarizer):
+    summarizer, backend = summarizer
+    summarizer.summarize(make_segments(60))
+    assert summarizer.last_stats['chunks'] > 1
+    assert "Part 1 (00:00 - " in backend.prompts[-1]
+
+
+def test_short_transcripts_take_a_single_call(summarizer):
+    summarizer, backend = summarizer
+    text = "[00:00 - 00:04]\nHello there. General remarks follow.\n(93.1% confidence)"
+    assert summarizer.summarize(transcript_segments(text)) == "summary 1"
+    assert len(backend.prompts) == 1 and "Hello there. General remarks follow." in backend.prompts[0]
+    assert "confidence" not in backend.prompts[0]
+    assert summarizer.summarize([]) == ""
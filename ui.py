@@ -2,8 +2,6 @@ import threading
 from tkinter import messagebox
 import warnings
 
-import torch
-
 from app.core.recorder import AudioRecorder
 from app.gui.components.waveform import WaveformVisualizer
 from app.gui.components.log_handler import TextBoxLogHandler
@@ -24,18 +22,21 @@ from app.core.transcriber import AudioTranscriber
 from app.core.emotion_analyzer import EmotionAnalyzer
 from app.core.text_processor import TextProcessor
 from app.core.text_analyzer import TextAnalyzer
+from app.core.translator import Translator
+from app.core.model_registry import registry
 from app.gui.handlers.export import export_transcription
 from app.gui.handlers.audio import start_recording, stop_recording, transcribe_with_progress, rename_audio_file
-from app.utils.config import get_styles
+from app.utils.config import get_styles, get_settings
 from app.gui.handlers.analysis import analyze_emotions, analyze_text_content, set_api_key, summarize_text, query_text
 from app.gui.handlers.theme import toggle_theme
 from app.gui.handlers.files import browse_directory, rename_transcription_file, browse_multiple_files
 from app.gui.layout.dashboard import open_new_dashboard
 from app.gui.layout.window import open_annotation_window
 from app.gui.components.setup import setup_tkdnd
+from app.gui.handlers.translation import open_translation_dashboard
+from app.gui.handlers.search import open_search_window
 import logging
 import warnings
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 import os
 from tkinterdnd2 import TkinterDnD
 import matplotlib
@@ -111,291 +112,24 @@ waveform_frame = tk.Frame(root, bg="#2b2b2b")
 waveform_frame.pack(in_=main_frame, side=tk.RIGHT, padx=5)
 visualizer = WaveformVisualizer(waveform_frame)
 text_analyzer = TextAnalyzer()
+translator = Translator()
+# Models are loaded by the registry on first use; unload the ones left idle
+model_settings = get_settings()['models']
+registry.start_idle_monitor(model_settings['idle_unload_seconds'], model_settings['idle_check_seconds'])
 
 start_button = tk.Button(
     button_container, text="Start Recording (S)", command=lambda:start_recording(Recording), **styles['button_style']
 )
 start_button.pack(pady=3)
 
-# translation code start-----------------------------------------------------------------------------------------------------------------------------------------------------------------
-MODEL_NAME = "facebook/nllb-200-distilled-600M"  # Faster version of NLLB
-device = "cuda" if torch.cuda.is_available() else "cpu"
-
-try:
-    print(f"Loading NLLB-200 model ({MODEL_NAME}) on {device}...")
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME).to(device)
-    print("Model loaded successfully!")
-except Exception as e:
-    print(f"Failed to load NLLB model: {e}")
-    model, tokenizer = None, None
-
-#  Dictionary of Supported Languages (Including Indian Languages)
-LANGUAGES = {
-    "English": "eng_Latn",
-    "French": "fra_Latn",
-    "Spanish": "spa_Latn",
-    "German": "deu_Latn",
-    "Italian": "ita_Latn",
-    "Russian": "rus_Cyrl",
-    "Chinese": "zho_Hans",
-    # Indian Languages
-    "Hindi": "hin_Deva",
-    "Bengali": "ben_Beng",
-    "Tamil": "tam_Taml",
-    "Telugu": "tel_Telu",
-    "Marathi": "mar_Deva",
-    "Gujarati": "guj_Gujr",
-    "Punjabi": "pan_Guru",
-    "Malayalam": "mal_Mlym",
-    "Kannada": "kan_Knda",
-    "Odia": "ory_Orya",
-    "Urdu": "urd_Arab",
-}
-
-#Optimized translation function
-def translate_text_nllb(text, src_lang, tgt_lang):
-    if model is None or tokenizer is None:
-        return "Error: Model not loaded."
-
-    try:
-        # Convert language names to model-specific codes
-        src_lang_code = LANGUAGES.get(src_lang, "eng_Latn")
-        tgt_lang_code = LANGUAGES.get(tgt_lang, "hin_Deva")  # Default to Hindi
-
-        print(f"Translating from {src_lang} ({src_lang_code}) → {tgt_lang} ({tgt_lang_code})")
-
-        #  Set source language in tokenizer
-        tokenizer.src_lang = src_lang_code
-
-        # Encode input text
-        inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True).to(device)
-
-        #  Get `forced_bos_token_id` correctly
-        tgt_lang_id = tokenizer.convert_tokens_to_ids(tgt_lang_code)
-
-        if tgt_lang_id is None or tgt_lang_id == tokenizer.unk_token_id:
-            print(f"Error: Invalid target language ID for {tgt_lang_code}.")
-            return "Translation failed: Invalid target language."
-
-        # Generate translation
-        with torch.no_grad():
-            translated_tokens = model.generate(**inputs, forced_bos_token_id=tgt_lang_id)
-
-        translated_text = tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
-        return translated_text
-
-    except Exception as e:
-        print(f"Translation failed: {e}")
-        return f"Translation failed: {e}"
-
-#  Translate the output_transcription.txt file
-def translate_file(src_lang, tgt_lang):
-    save_directory = os.getcwd()
-    transcription_file = os.path.join(save_directory, "output_transcription.txt")
-    translated_file = os.path.join(save_directory, f"output_transcription_{tgt_lang}.txt")
-
-    if not os.path.exists(transcription_file):
-        messagebox.showerror("Error", "No output_transcription file found. Please transcribe some audio first.")
-        return
-
-    try:
-        with open(transcription_file, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        if not content.strip():
-            messagebox.showerror("Error", "The output_transcription.txt file is empty.")
-            return
-
-        translated_text = translate_text_nllb(content, src_lang, tgt_lang)
-
-        with open(translated_file, "w", encoding="utf-8") as f:
-            f.write(translated_text)
-
-        messagebox.showinfo("Success", f"Translated file saved as output_transcription_{tgt_lang}.txt")
-
-    except Exception as e:
-        messagebox.showerror("Error", f"Translation failed: {e}")
-
-#  Asynchronous wrapper to prevent GUI from freezing
-def translate_async(src_lang, tgt_lang):
-    threading.Thread(target=lambda: translate_file(src_lang, tgt_lang), daemon=True).start()
-
-#  GUI for Translation
-def open_translation_dashboard():
-    save_directory = os.getcwd()
-    transcription_file = os.path.join(save_directory, "output_transcription.txt")
-
-    if not os.path.exists(transcription_file):
-        messagebox.showerror("Error", "No transcription file found. Please transcribe some audio first.")
-        return
-
-    # Create a new Tkinter window
-    dashboard = tk.Toplevel()
-    dashboard.title("Translate output_transcription.txt")
-    dashboard.geometry("300x300")
-
-    tk.Label(dashboard, text="Translate output_transcription.txt to:").pack(pady=10)
-
-    # Dropdown for source and target languages
-    tk.Label(dashboard, text="Source Language:").pack()
-    src_lang_var = tk.StringVar(dashboard)
-    src_lang_var.set("English")  # Default source language
-    src_lang_menu = tk.OptionMenu(dashboard, src_lang_var, *LANGUAGES.keys())
-    src_lang_menu.pack(pady=5)
-
-    tk.Label(dashboard, text="Target Language:").pack()
-    tgt_lang_var = tk.StringVar(dashboard)
-    tgt_lang_var.set("Hindi")  # Default target language
-    tgt_lang_menu = tk.OptionMenu(dashboard, tgt_lang_var, *LANGUAGES.keys())
-    tgt_lang_menu.pack(pady=5)
-
-    # Button to translate
-    translate_btn = tk.Button(dashboard, text="Translate", 
-                               command=lambda: translate_async(src_lang_var.get(), tgt_lang_var.get()))
-    translate_btn.pack(pady=10)
-
-    dashboard.mainloop()
-MODEL_NAME = "facebook/nllb-200-distilled-600M"  # Faster version of NLLB
-device = "cuda" if torch.cuda.is_available() else "cpu"
-
-try:
-    print(f"Loading NLLB-200 model ({MODEL_NAME}) on {device}...")
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME).to(device)
-    print("Model loaded successfully!")
-except Exception as e:
-    print(f"Failed to load NLLB model: {e}")
-    model, tokenizer = None, None
-
-#  Dictionary of Supported Languages (Including Indian Languages)
-LANGUAGES = {
-    "English": "eng_Latn",
-    "French": "fra_Latn",
-    "Spanish": "spa_Latn",
-    "German": "deu_Latn",
-    "Italian": "ita_Latn",
-    "Russian": "rus_Cyrl",
-    "Chinese": "zho_Hans",
-    # Indian Languages
-    "Hindi": "hin_Deva",
-    "Bengali": "ben_Beng",
-    "Tamil": "tam_Taml",
-    "Telugu": "tel_Telu",
-    "Marathi": "mar_Deva",
-    "Gujarati": "guj_Gujr",
-    "Punjabi": "pan_Guru",
-    "Malayalam": "mal_Mlym",
-    "Kannada": "kan_Knda",
-    "Odia": "ory_Orya",
-    "Urdu": "urd_Arab",
-}
-
-#  Optimized translation function
-def translate_text_nllb(text, src_lang, tgt_lang):
-    if model is None or tokenizer is None:
-        return "Error: Model not loaded."
-
-    try:
-        # Convert language names to model-specific codes
-        src_lang_code = LANGUAGES.get(src_lang, "eng_Latn")
-        tgt_lang_code = LANGUAGES.get(tgt_lang, "hin_Deva")  # Default to Hindi
-
-        print(f"Translating from {src_lang} ({src_lang_code}) → {tgt_lang} ({tgt_lang_code})")
-
-        # Set source language in tokenizer
-        tokenizer.src_lang = src_lang_code
-
-        # Encode input text
-        inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True).to(device)
-
-        #  Get `forced_bos_token_id` correctly
-        tgt_lang_id = tokenizer.convert_tokens_to_ids(tgt_lang_code)
-
-        if tgt_lang_id is None or tgt_lang_id == tokenizer.unk_token_id:
-            print(f"Error: Invalid target language ID for {tgt_lang_code}.")
-            return "Translation failed: Invalid target language."
-
-        # Generate translation
-        with torch.no_grad():
-            translated_tokens = model.generate(**inputs, forced_bos_token_id=tgt_lang_id)
-
-        translated_text = tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
-        return translated_text
-
-    except Exception as e:
-        print(f"Translation failed: {e}")
-        return f"Translation failed: {e}"
-
-# Translate the output_transcription.txt file
-def translate_file(src_lang, tgt_lang):
-    save_directory = os.getcwd()
-    transcription_file = os.path.join(save_directory, "output_transcription.txt")
-    translated_file = os.path.join(save_directory, f"output_transcription_{tgt_lang}.txt")
-
-    if not os.path.exists(transcription_file):
-        messagebox.showerror("Error", "No output_transcription file found. Please transcribe some audio first.")
-        return
-
-    try:
-        with open(transcription_file, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        if not content.strip():
-            messagebox.showerror("Error", "The output_transcription.txt file is empty.")
-            return
-
-        translated_text = translate_text_nllb(content, src_lang, tgt_lang)
-
-        with open(translated_file, "w", encoding="utf-8") as f:
-            f.write(translated_text)
-
-        messagebox.showinfo("Success", f"Translated file saved as output_transcription_{tgt_lang}.txt")
-
-    except Exception as e:
-        messagebox.showerror("Error", f"Translation failed: {e}")
-
-# Asynchronous wrapper to prevent GUI from freezing
-def translate_async(src_lang, tgt_lang):
-    threading.Thread(target=lambda: translate_file(src_lang, tgt_lang), daemon=True).start()
-
-#  GUI for Translation
-def open_translation_dashboard():
-    save_directory = os.getcwd()
-    transcription_file = os.path.join(save_directory, "output_transcription.txt")
-
-    if not os.path.exists(transcription_file):
-        messagebox.showerror("Error", "No transcription file found. Please transcribe some audio first.")
-        return
-
-    # Create a new Tkinter window
-    dashboard = tk.Toplevel()
-    dashboard.title("Translate output_transcription.txt")
-    dashboard.geometry("300x300")
-
-    tk.Label(dashboard, text="Translate output_transcription.txt to:").pack(pady=10)
-
-    # Dropdown for source and target languages
-    tk.Label(dashboard, text="Source Language:").pack()
-    src_lang_var = tk.StringVar(dashboard)
-    src_lang_var.set("English")  # Default source language
-    src_lang_menu = tk.OptionMenu(dashboard, src_lang_var, *LANGUAGES.keys())
-    src_lang_menu.pack(pady=5)
-
-    tk.Label(dashboard, text="Target Language:").pack()
-    tgt_lang_var = tk.StringVar(dashboard)
-    tgt_lang_var.set("Hindi")  # Default target language
-    tgt_lang_menu = tk.OptionMenu(dashboard, tgt_lang_var, *LANGUAGES.keys())
-    tgt_lang_menu.pack(pady=5)
-
-    # Button to translate
-    translate_btn = tk.Button(dashboard, text="Translate", 
-                               command=lambda: translate_async(src_lang_var.get(), tgt_lang_var.get()))
-    translate_btn.pack(pady=10)
-
-    dashboard.mainloop()
+# Live transcription: transcribe in windows while recording instead of after Stop
+streaming_var = tk.BooleanVar(value=False)
+streaming_check = tk.Checkbutton(
+    button_container, text="Live Transcription", variable=streaming_var,
+    bg="#2b2b2b", fg="white", selectcolor="#333333", activebackground="#2b2b2b", activeforeground="white"
+)
+streaming_check.pack(pady=3)
 
-#translation code end
 
 stop_button = tk.Button(
     button_container,
@@ -419,8 +153,8 @@ root.title("Audio Recorder & Emotion Analyzer")
 root.geometry("1000x900")
 root.configure(bg="#2b2b2b")
 # root.tk.eval('package require tkdnd')
-Recording={"save_directory":save_directory,"recorder":recorder,"visualizer":visualizer,"start_button":start_button,"stop_button":stop_button,"transcribe_button":transcribe_button,"rename_audio_button":rename_audio_button,"rename_transcription_button":rename_transcription_button,"analyze_button":analyze_button,"transcription_box":transcription_box,"log_box":log_box,'root':root,'transcriber':transcriber}
-Analysis={'recorder':recorder,'emotion_analyzer':emotion_analyzer,'text_analyzer':text_analyzer,'text_processor':text_processor,'save_directory':save_directory,'transcription_box':transcription_box,'root':root}
+Recording={"save_directory":save_directory,"recorder":recorder,"visualizer":visualizer,"start_button":start_button,"stop_button":stop_button,"transcribe_button":transcribe_button,"rename_audio_button":rename_audio_button,"rename_transcription_button":rename_transcription_button,"analyze_button":analyze_button,"transcription_box":transcription_box,"log_box":log_box,'root':root,'transcriber':transcriber,'streaming_var':streaming_var}
+Analysis={'recorder':recorder,'transcriber':transcriber,'emotion_analyzer':emotion_analyzer,'text_analyzer':text_analyzer,'text_processor':text_processor,'save_directory':save_directory,'transcription_box':transcription_box,'root':root}
 Files={"transcriber":transcriber,"transcription_box":transcription_box,"analyze_button":analyze_button,"root":root,"save_directory":save_directory}
 # Bind hotkeys
 root.bind("<d>", lambda event: browse_directory(Files))
@@ -430,6 +164,7 @@ root.bind("<t>", lambda event: transcribe_with_progress(Recording))
 root.bind("<r>", lambda event: rename_audio_file(Recording))
 root.bind("<y>", lambda event: rename_transcription_file(Files))
 root.bind("<e>", lambda event: analyze_emotions(Analysis))
+root.bind("<f>", lambda event: open_search_window(Files))
 # Export Transcription Button
 export_button = tk.Button(
     waveform_frame,
@@ -455,7 +190,7 @@ transcription_label.pack(pady=5)
 # Add hotkey label at the bottom
 hotkey_label = tk.Label(
     root,
-    text="Hotkeys:\nD - Select Directory | S - Start Recording | X - Stop Recording\nT - Transcribe | R - Rename Audio | Y - Rename Transcription | E - Analyze Emotions",
+    text="Hotkeys:\nD - Select Directory | S - Start Recording | X - Stop Recording\nT - Transcribe | R - Rename Audio | Y - Rename Transcription | E - Analyze Emotions | F - Search History",
     bg="#2b2b2b",
     fg="white",
     font=("Helvetica", 10),
@@ -465,6 +200,7 @@ hotkey_label.pack(pady=5)
 log_handler = TextBoxLogHandler(log_box)
 log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 logging.getLogger().addHandler(log_handler)
+log_handler.start(root)
 logging.getLogger().setLevel(logging.DEBUG)
 Theme={"root":root,"main_frame":main_frame,"button_container":button_container,"waveform_frame":waveform_frame,"transcription_frame":transcription_frame,"text_container":text_container,"log_box":log_box,"transcription_box":transcription_box,"transcription_label":transcription_label,"hotkey_label":hotkey_label,"control_frame":control_frame,"visualizer":visualizer,'current_theme':current_theme}
 theme_button = tk.Button(
@@ -494,6 +230,10 @@ batch_button.pack(pady=3)
 dashboard_button = tk.Button(button_container, text="Usage Dashboard", command=lambda:open_new_dashboard(save_directory,root), **styles['button_style'])
 dashboard_button.pack(pady=3)
 
+#Search History Button
+search_button = tk.Button(button_container, text="Search History (F)", command=lambda:open_search_window(Files), **styles['button_style'])
+search_button.pack(pady=3)
+
 analyze_text_button = tk.Button(button_container, text="Analyze Text", command=lambda:analyze_text_content(Analysis), bg="#4caf50", fg="white", font=("Helvetica", 9, "bold"), bd=3)
 analyze_text_button.pack(side=tk.LEFT, padx=5)
 
@@ -507,9 +247,10 @@ query_button = tk.Button(button_container, text="Ask Question", command=lambda:q
 query_button.pack(side=tk.LEFT, padx=5)
 
 Window={"root":root,"save_directory":save_directory,"transcription_box":transcription_box,"control_frame":control_frame}
+Translation={"root":root,"save_directory":save_directory,"translator":translator}
 
 # translate button
-translation_btn = tk.Button(button_container, text="Translate", command=open_translation_dashboard)
+translation_btn = tk.Button(button_container, text="Translate", command=lambda:open_translation_dashboard(Translation))
 translation_btn.pack(side=tk.LEFT, padx=5)
 
 # Annotate Transcription Button